@@ -0,0 +1,197 @@
+# benchmarks/fake_upstreams.py
+"""
+부하 테스트용 가짜 NEIS / OpenAI 서버
+- NEIS: /hub/schoolInfo, /hub/mealServiceDietInfo (학교별 조회, 교육청 기간 조회, 페이지)
+- OpenAI: /v1/chat/completions (일반, 일괄 #ITEM 형식, stream=True)
+- 서비스별 응답 지연(평균 ± 지터)과 오류 비율을 설정할 수 있습니다.
+
+실행: python benchmarks/fake_upstreams.py --port 9100 --neis-latency-ms 80 --openai-latency-ms 1500
+앱 설정: NEIS_BASE_URL=http://127.0.0.1:9100/hub OPENAI_BASE_URL=http://127.0.0.1:9100/v1
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from datetime import datetime, timedelta
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+SCHOOL_CODE_BASE = 7010000
+MENU = "잡곡밥<br/>쇠고기미역국(5.6.16)<br/>돈까스(1.2.5.6.10.13)<br/>배추김치(9)<br/>요구르트(2)"
+REVIEW = (
+    "단백질과 채소가 고르게 들어 있어 균형 잡힌 구성입니다.\n"
+    "튀김 메뉴가 있어 학생들이 좋아할 만한 식단입니다.\n"
+    "#NUTRI_RATE:4.0\n"
+    "#PREF_RATE:4.5"
+)
+
+class UpstreamProfile:
+    """서비스별 응답 지연과 오류 설정"""
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+
+    async def delay(self, scale: float = 1.0):
+        latency = max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) * scale
+        if latency:
+            await asyncio.sleep(latency / 1000)
+
+    def should_fail(self) -> bool:
+        self.requests += 1
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+def create_app(neis: UpstreamProfile, openai: UpstreamProfile, schools: int = 100) -> Starlette:
+    """가짜 NEIS / OpenAI 앱 (급식은 주말을 포함한 모든 날짜에 제공)"""
+    school_rows = [
+        {"SD_SCHUL_CODE": str(SCHOOL_CODE_BASE + i), "SCHUL_NM": f"벤치마크{i + 1}고등학교"}
+        for i in range(schools)
+    ]
+
+    def neis_result(name: str, rows: list, total: int) -> dict:
+        head = [{"list_total_count": total}, {"RESULT": {"CODE": "INFO-000", "MESSAGE": "정상 처리되었습니다."}}]
+        return {name: [{"head": head}, {"row": rows}]}
+
+    def no_data() -> dict:
+        return {"RESULT": {"CODE": "INFO-200", "MESSAGE": "해당하는 데이터가 없습니다."}}
+
+    def page(rows: list, params) -> list:
+        index = max(int(params.get('pIndex', 1)), 1)
+        size = max(int(params.get('pSize', 100)), 1)
+        return rows[(index - 1) * size:index * size]
+
+    async def school_info(request: Request):
+        await neis.delay()
+        if neis.should_fail():
+            return JSONResponse({"error": "injected"}, status_code=neis.error_status)
+        rows = page(school_rows, request.query_params)
+        return JSONResponse(neis_result("schoolInfo", rows, len(school_rows)) if rows else no_data())
+
+    async def meal_service(request: Request):
+        await neis.delay()
+        if neis.should_fail():
+            return JSONResponse({"error": "injected"}, status_code=neis.error_status)
+        params = request.query_params
+        start = params.get('MLSV_FROM_YMD') or params.get('MLSV_YMD')
+        end = params.get('MLSV_TO_YMD') or start
+        school_code = params.get('SD_SCHUL_CODE')
+        if not start:
+            return JSONResponse(no_data())
+        rows = []
+        day = datetime.strptime(start, "%Y%m%d")
+        while day.strftime("%Y%m%d") <= end:
+            for school in school_rows:
+                if school_code in (None, school["SD_SCHUL_CODE"]):
+                    rows.append({**school, "MLSV_YMD": day.strftime("%Y%m%d"), "DDISH_NM": MENU})
+            day += timedelta(days=1)
+        selected = page(rows, params)
+        return JSONResponse(neis_result("mealServiceDietInfo", selected, len(rows)) if selected else no_data())
+
+    def completion_text(messages: list) -> str:
+        prompt = messages[-1].get("content", "") if messages else ""
+        items = re.findall(r'^\[(\d+)\]', prompt, re.M)
+        if not items:
+            return REVIEW
+        return "\n".join(f"#ITEM:{item}\n{REVIEW}\n#END" for item in items)
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "gpt-4o-mini")
+        content = completion_text(body.get("messages", []))
+        if openai.should_fail():
+            await openai.delay(0.1)
+            return JSONResponse(
+                {"error": {"message": "injected error", "type": "server_error", "code": None}},
+                status_code=openai.error_status
+            )
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await openai.delay()
+            return JSONResponse({
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            })
+
+        # 스트리밍: 지연의 20%는 첫 조각까지, 나머지는 조각마다 나눠서
+        pieces = re.findall(r'.{1,8}', content, re.S)
+
+        def chunk(delta: dict, finish_reason=None) -> str:
+            data = {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        async def events():
+            await openai.delay(0.2)
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in pieces:
+                await openai.delay(0.8 / len(pieces))
+                yield chunk({"content": piece})
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def stats(request: Request):
+        return JSONResponse({
+            "neis": {"requests": neis.requests, "errors": neis.errors},
+            "openai": {"requests": openai.requests, "errors": openai.errors}
+        })
+
+    return Starlette(routes=[
+        Route("/hub/schoolInfo", school_info),
+        Route("/hub/mealServiceDietInfo", meal_service),
+        Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+        Route("/stats", stats),
+    ])
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """가짜 서버 설정 인자 (load_test.py와 같이 사용)"""
+    parser.add_argument('--schools', type=int, default=100, help="학교 수")
+    parser.add_argument('--neis-latency-ms', type=float, default=50)
+    parser.add_argument('--neis-jitter-ms', type=float, default=20)
+    parser.add_argument('--neis-error-rate', type=float, default=0.0)
+    parser.add_argument('--neis-error-status', type=int, default=500)
+    parser.add_argument('--openai-latency-ms', type=float, default=1500)
+    parser.add_argument('--openai-jitter-ms', type=float, default=500)
+    parser.add_argument('--openai-error-rate', type=float, default=0.0)
+    parser.add_argument('--openai-error-status', type=int, default=500)
+
+def app_from_args(args: argparse.Namespace) -> Starlette:
+    return create_app(
+        UpstreamProfile(args.neis_latency_ms, args.neis_jitter_ms, args.neis_error_rate, args.neis_error_status),
+        UpstreamProfile(args.openai_latency_ms, args.openai_jitter_ms, args.openai_error_rate, args.openai_error_status),
+        schools=args.schools
+    )
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="부하 테스트용 가짜 NEIS / OpenAI 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(app_from_args(args), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,70 @@
+# benchmarks/ingest_benchmark.py
+"""
+급식 정보 저장 벤치마크
+- 기존 방식: 행마다 커밋 (DELETE 저널, synchronous=FULL)
+- 저널 설정만 변경: 행마다 커밋 (WAL 저널, synchronous=NORMAL)
+- 일괄 저장: 페이지마다 한 트랜잭션 (WAL 저널, synchronous=NORMAL)
+- 저널 설정 효과와 일괄 저장 효과는 각각 같은 조건에서 하나만 바꿔 비교합니다.
+
+실행: python benchmarks/ingest_benchmark.py --schools 100 --days 30
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import Database
+
+def make_rows(schools: int, days: int):
+    return [
+        (f"202501{day + 1:02d}", f"{7000000 + school}", f"학교{school}", "밥, 국, 김치, 돈까스")
+        for day in range(days) for school in range(schools)
+    ]
+
+async def per_row(path: str, rows, journal_mode: str = 'WAL', synchronous: str = 'NORMAL') -> float:
+    db = Database(path, journal_mode=journal_mode, synchronous=synchronous)
+    await db.init_db()
+    start = time.perf_counter()
+    for row in rows:
+        await db.save_meal(*row)
+    elapsed = time.perf_counter() - start
+    await db.close()
+    return elapsed
+
+async def batched(path: str, rows, page_size: int) -> float:
+    db = Database(path)
+    await db.init_db()
+    start = time.perf_counter()
+    for i in range(0, len(rows), page_size):
+        await db.save_meals(rows[i:i + page_size])
+    elapsed = time.perf_counter() - start
+    await db.close()
+    return elapsed
+
+async def main():
+    parser = argparse.ArgumentParser(description="급식 정보 저장 벤치마크")
+    parser.add_argument('--schools', type=int, default=100)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--page-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.schools, args.days)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = await per_row(str(Path(tmp) / "legacy.db"), rows, journal_mode='DELETE', synchronous='FULL')
+        slow = await per_row(str(Path(tmp) / "per_row.db"), rows)
+        fast = await batched(str(Path(tmp) / "batched.db"), rows, args.page_size)
+
+    print(f"행 수: {len(rows)}")
+    print(f"행마다 커밋 (DELETE, FULL):  {legacy:.3f}s ({len(rows) / legacy:,.0f} rows/s)")
+    print(f"행마다 커밋 (WAL, NORMAL):   {slow:.3f}s ({len(rows) / slow:,.0f} rows/s)")
+    print(f"일괄 저장 (WAL, NORMAL):     {fast:.3f}s ({len(rows) / fast:,.0f} rows/s)")
+    print(f"저널 설정 효과 (행마다 커밋): {legacy / slow:.1f}x")
+    print(f"일괄 저장 효과 (WAL, NORMAL): {slow / fast:.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,348 @@
+# benchmarks/load_test.py
+"""
+부하 테스트 (가짜 NEIS / OpenAI 서버를 상대로 main:app 실행)
+- meal_storm: 아침 8시처럼 캐시가 비어 있는 상태에서 첫 화면(bootstrap) 요청이 한꺼번에 몰리는 경우
+- review_cards: 사용자마다 리뷰 카드 100개를 불러오는 경우 (없는 리뷰는 202 응답 후 다시 요청)
+- like_burst: N명이 날짜를 구독한 상태에서 좋아요가 몰리는 경우 (구독자에게 최종 좋아요 수가 보일 때까지의 시간 포함)
+- visit_flood: 메인 페이지 방문이 몰리는 경우
+
+시나리오마다 새 데이터베이스로 앱을 다시 시작하고, 처리량과 p50/p95/p99 응답 시간을 출력합니다.
+--baseline으로 이전 결과(--output)를 주면 p95나 처리량이 기준보다 나빠졌을 때 종료 코드 1을 반환합니다.
+
+실행: python benchmarks/load_test.py --scenarios meal_storm,visit_flood --workers 1
+필요 패키지: like_burst 시나리오는 websockets
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_upstreams import add_arguments as add_upstream_arguments
+
+ROOT = Path(__file__).resolve().parent.parent
+
+class LatencyRecorder:
+    """요청별 소요 시간과 오류 수 집계"""
+    def __init__(self, name: str, throughput: bool = True):
+        self.name = name
+        self.throughput = throughput  # 처리량 비교 대상 여부
+        self.samples: List[float] = []
+        self.errors = 0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, seconds: float, ok: bool = True):
+        self.samples.append(seconds)
+        if not ok:
+            self.errors += 1
+
+    def error(self):
+        self.errors += 1
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def summary(self) -> Dict:
+        samples = sorted(self.samples)
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return {
+            "requests": len(samples),
+            "errors": self.errors,
+            "rps": round(len(samples) / elapsed, 1) if elapsed > 0 else 0.0,
+            "p50_ms": round(percentile(samples, 50) * 1000, 1),
+            "p95_ms": round(percentile(samples, 95) * 1000, 1),
+            "p99_ms": round(percentile(samples, 99) * 1000, 1),
+            "max_ms": round(samples[-1] * 1000, 1) if samples else 0.0,
+            "throughput": self.throughput
+        }
+
+def percentile(samples: List[float], p: float) -> float:
+    """정렬된 값의 백분위수 (nearest-rank)"""
+    if not samples:
+        return 0.0
+    rank = max(1, -(-len(samples) * p // 100))
+    return samples[int(rank) - 1]
+
+async def run_load(recorder: LatencyRecorder, total: int, concurrency: int,
+                   request: Callable[[int], Awaitable[bool]]) -> LatencyRecorder:
+    """request(i)를 total번, 동시에 concurrency개씩 실행하며 소요 시간 기록"""
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                ok = await request(i)
+            except Exception:
+                ok = False
+            recorder.record(time.perf_counter() - start, ok)
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    recorder.finish()
+    return recorder
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+async def wait_ready(url: str, timeout: float = 30.0):
+    """서버가 응답할 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"서버가 시작되지 않았습니다: {url}")
+
+def start_upstreams(args: argparse.Namespace, port: int) -> subprocess.Popen:
+    """가짜 NEIS / OpenAI 서버 프로세스 시작"""
+    command = [sys.executable, str(Path(__file__).resolve().parent / "fake_upstreams.py"), "--port", str(port)]
+    for name, value in vars(args).items():
+        if name.startswith(('neis_', 'openai_')) or name == 'schools':
+            command += [f"--{name.replace('_', '-')}", str(value)]
+    return subprocess.Popen(command)
+
+def start_app(args: argparse.Namespace, port: int, upstream: str, data_dir: str) -> subprocess.Popen:
+    """새 데이터베이스로 main:app 시작 (사전 준비 비활성화, 가짜 서버 사용)"""
+    env = {
+        **os.environ,
+        "DB_PATH": str(Path(data_dir) / "school_meals.db"),
+        "WS_BROKER_PATH": str(Path(data_dir) / "broker.db"),
+        "LEADER_LOCK_PATH": str(Path(data_dir) / "leader.lock"),
+        "APP_WORKERS": str(args.workers),
+        "PREWARM_ENABLED": "0",
+        "LOG_LEVEL": "WARNING",
+        "NEIS_API_KEY": "bench",
+        "NEIS_BASE_URL": f"{upstream}/hub",
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{upstream}/v1",
+    }
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"]
+    return subprocess.Popen(command, cwd=str(ROOT), env=env)
+
+def stop(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+# 시나리오
+async def meal_storm(client: httpx.AsyncClient, args: argparse.Namespace, date: str, base_url: str) -> List[LatencyRecorder]:
+    async def request(i: int) -> bool:
+        response = await client.get(f"/api/bootstrap/{date}")
+        return response.status_code == 200 and len(response.json()["meals"]) > 0
+
+    return [await run_load(LatencyRecorder("meal_storm"), args.requests, args.concurrency, request)]
+
+async def review_cards(client: httpx.AsyncClient, args: argparse.Namespace, date: str, base_url: str) -> List[LatencyRecorder]:
+    await client.get(f"/api/meals/{date}")  # 급식 정보는 미리 저장 (측정 제외)
+    cards = LatencyRecorder("review_cards.card")
+    pages = LatencyRecorder("review_cards.page", throughput=False)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def load_card(school_code: str):
+        start = time.perf_counter()
+        deadline = start + args.timeout
+        while time.perf_counter() < deadline:
+            async with semaphore:
+                response = await client.get(f"/api/review/{date}/{school_code}")
+            if response.status_code == 200:
+                cards.record(time.perf_counter() - start)
+                return
+            if response.status_code != 202:
+                cards.record(time.perf_counter() - start, ok=False)
+                return
+            await asyncio.sleep(args.poll_interval)
+        cards.record(time.perf_counter() - start, ok=False)
+
+    async def load_page(user: int):
+        start = time.perf_counter()
+        async with semaphore:
+            response = await client.get(f"/api/reviews/{date}")
+        if response.status_code != 200:
+            pages.record(time.perf_counter() - start, ok=False)
+            return
+        result = response.json()
+        for _ in result["reviews"]:
+            cards.record(time.perf_counter() - start)
+        await asyncio.gather(*(load_card(code) for code in result["missing"][:args.cards]))
+        pages.record(time.perf_counter() - start)
+
+    await asyncio.gather(*(load_page(user) for user in range(args.users)))
+    cards.finish()
+    pages.finish()
+    return [cards, pages]
+
+async def like_burst(client: httpx.AsyncClient, args: argparse.Namespace, date: str, base_url: str) -> List[LatencyRecorder]:
+    try:
+        import websockets
+    except ImportError:
+        raise RuntimeError("like_burst 시나리오에는 websockets 패키지가 필요합니다 (pip install websockets)")
+
+    schools = (await client.get("/api/schools")).json()["schools"][:args.liked_schools]
+    codes = [school["school_code"] for school in schools]
+    final: Dict[str, int] = {}  # 학교별 성공한 좋아요 요청 수 (구독자가 받아야 하는 최종 값)
+    delivery = LatencyRecorder("like_burst.delivery", throughput=False)
+    burst_started = asyncio.Event()
+    burst_done = asyncio.Event()
+    ws_url = base_url.replace("http://", "ws://")
+
+    async def subscriber(i: int, ready: asyncio.Queue):
+        async with websockets.connect(f"{ws_url}/ws?client_id=bench-{i}", max_queue=None) as ws:
+            await ws.send(json.dumps({"type": "subscribe", "date": date}))
+            await ready.put(i)
+            seen: Dict[str, int] = {}
+            await burst_started.wait()
+            start = time.perf_counter()
+            deadline = start + args.timeout
+            while time.perf_counter() < deadline:
+                if burst_done.is_set() and all(seen.get(code, 0) >= final.get(code, 0) for code in final):
+                    delivery.record(time.perf_counter() - start)
+                    return
+                try:
+                    message = json.loads(await asyncio.wait_for(ws.recv(), 0.05))
+                except asyncio.TimeoutError:
+                    continue
+                if message.get("date") == date:
+                    for code, likes in message.get("likes", {}).items():
+                        seen[code] = max(seen.get(code, 0), likes)
+            delivery.error()
+
+    ready: asyncio.Queue = asyncio.Queue()
+    tasks = [asyncio.create_task(subscriber(i, ready)) for i in range(args.subscribers)]
+    for _ in range(args.subscribers):
+        await ready.get()
+    await asyncio.sleep(0.5)  # 구독 메시지 처리 대기
+
+    async def like(i: int) -> bool:
+        code = codes[i % len(codes)]
+        response = await client.post(f"/api/reaction/{date}/{code}/like")
+        if response.status_code != 200:
+            return False
+        final[code] = final.get(code, 0) + 1
+        return True
+
+    burst_started.set()
+    posts = await run_load(LatencyRecorder("like_burst.post"), args.likes, args.concurrency, like)
+    burst_done.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    delivery.finish()
+    return [posts, delivery]
+
+async def visit_flood(client: httpx.AsyncClient, args: argparse.Namespace, date: str, base_url: str) -> List[LatencyRecorder]:
+    async def request(i: int) -> bool:
+        return (await client.get("/")).status_code == 200
+
+    return [await run_load(LatencyRecorder("visit_flood"), args.requests, args.concurrency, request)]
+
+SCENARIOS = {
+    "meal_storm": meal_storm,
+    "review_cards": review_cards,
+    "like_burst": like_burst,
+    "visit_flood": visit_flood,
+}
+
+def print_results(results: Dict[str, Dict]):
+    print(f"\n{'시나리오':<24}{'요청':>8}{'오류':>7}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, summary in results.items():
+        print(f"{name:<26}{summary['requests']:>8}{summary['errors']:>7}{summary['rps']:>10}"
+              f"{summary['p50_ms']:>10}{summary['p95_ms']:>10}{summary['p99_ms']:>10}{summary['max_ms']:>10}")
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """기준 결과보다 p95가 늘거나 처리량이 줄어든 항목"""
+    regressions = []
+    for name, summary in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and summary["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {summary['p95_ms']}ms")
+        if summary["throughput"] and base["rps"] and summary["rps"] < base["rps"] * (1 - max_regression):
+            regressions.append(f"{name}: 처리량 {base['rps']} -> {summary['rps']} req/s")
+        if summary["errors"] > base["errors"]:
+            regressions.append(f"{name}: 오류 {base['errors']} -> {summary['errors']}")
+    return regressions
+
+async def main():
+    parser = argparse.ArgumentParser(description="가짜 NEIS / OpenAI 서버를 이용한 부하 테스트")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="실행할 시나리오 (쉼표로 구분)")
+    parser.add_argument('--workers', type=int, default=1, help="앱 워커 프로세스 수")
+    parser.add_argument('--requests', type=int, default=1000, help="meal_storm, visit_flood 요청 수")
+    parser.add_argument('--concurrency', type=int, default=100, help="동시 요청 수")
+    parser.add_argument('--users', type=int, default=10, help="review_cards 동시 사용자 수")
+    parser.add_argument('--cards', type=int, default=100, help="review_cards 사용자당 카드 수")
+    parser.add_argument('--poll-interval', type=float, default=0.25, help="review_cards 202 응답 후 다시 요청할 간격 (초)")
+    parser.add_argument('--subscribers', type=int, default=200, help="like_burst WebSocket 구독자 수")
+    parser.add_argument('--likes', type=int, default=1000, help="like_burst 좋아요 요청 수")
+    parser.add_argument('--liked-schools', type=int, default=5, help="like_burst 좋아요를 받는 학교 수")
+    parser.add_argument('--timeout', type=float, default=60.0, help="리뷰 생성, 좋아요 전달 대기 시간 (초)")
+    parser.add_argument('--date', default=datetime.now().strftime("%Y-%m-%d"), help="조회할 날짜 (YYYY-MM-DD)")
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    parser.add_argument('--baseline', help="비교할 이전 결과 JSON")
+    parser.add_argument('--max-regression', type=float, default=0.2, help="허용하는 성능 저하 비율")
+    add_upstream_arguments(parser)
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)}")
+
+    upstream_port = free_port()
+    upstream_url = f"http://127.0.0.1:{upstream_port}"
+    upstreams = start_upstreams(args, upstream_port)
+    results: Dict[str, Dict] = {}
+    try:
+        await wait_ready(f"{upstream_url}/stats")
+        for name in names:
+            with tempfile.TemporaryDirectory() as data_dir:
+                port = free_port()
+                base_url = f"http://127.0.0.1:{port}"
+                app = start_app(args, port, upstream_url, data_dir)
+                try:
+                    await wait_ready(f"{base_url}/api/dates")
+                    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+                    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+                        print(f"{name} 실행 중...")
+                        for recorder in await SCENARIOS[name](client, args, args.date, base_url):
+                            results[recorder.name] = recorder.summary()
+                finally:
+                    stop(app)
+    finally:
+        stop(upstreams)
+
+    print_results(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.max_regression)
+        if regressions:
+            print("\n성능 저하:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\n기준 결과 대비 성능 저하 없음")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+# broker.py
+
+import abc
+import aiosqlite
+import asyncio
+import json
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[Dict], None]
+
+class Broker(abc.ABC):
+    """
+    워커 프로세스 간 메시지 전달 인터페이스
+    - publish로 보낸 메시지는 보낸 워커를 포함한 모든 워커의 handler로 전달됩니다.
+    """
+    @abc.abstractmethod
+    async def start(self, handler: MessageHandler):
+        """메시지 수신 시작"""
+
+    @abc.abstractmethod
+    async def publish(self, message: Dict):
+        """모든 워커에 메시지 전달"""
+
+    async def close(self):
+        pass
+
+class MemoryBroker(Broker):
+    """단일 프로세스용 브로커 (바로 handler 호출)"""
+    def __init__(self):
+        self._handler: Optional[MessageHandler] = None
+
+    async def start(self, handler: MessageHandler):
+        self._handler = handler
+
+    async def publish(self, message: Dict):
+        if self._handler:
+            self._handler(message)
+
+class SQLiteBroker(Broker):
+    """
+    SQLite 파일을 이용한 워커 간 메시지 전달
+    - 메시지를 테이블에 추가하고, 각 워커가 poll_interval마다 새 메시지를 읽어 갑니다.
+    - 외부 서비스 없이 같은 서버의 여러 워커가 메시지를 주고받을 수 있습니다.
+    - retention초가 지난 메시지는 주기적으로 삭제합니다.
+    """
+    def __init__(self, db_path: str = 'data/broker.db', poll_interval: float = 0.05, retention: float = 60):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._handler: Optional[MessageHandler] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_id = 0
+        self._last_prune = 0.0
+
+    async def start(self, handler: MessageHandler):
+        self._handler = handler
+        self._conn = await aiosqlite.connect(self.db_path)
+        await self._conn.execute("PRAGMA journal_mode=WAL")
+        await self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        ''')
+        await self._conn.commit()
+        # 시작 이후의 메시지만 읽음
+        async with self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM messages") as cursor:
+            self._last_id = (await cursor.fetchone())[0]
+        self._task = asyncio.create_task(self._poll_loop())
+
+    async def publish(self, message: Dict):
+        await self._conn.execute(
+            "INSERT INTO messages (payload, created_at) VALUES (?, ?)",
+            (json.dumps(message), time.time())
+        )
+        await self._conn.commit()
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn:
+            await self._conn.close()
+            self._conn = None
+
+    async def _poll_loop(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"브로커 메시지 읽기 중 오류 발생: {e}")
+
+    async def poll(self):
+        """새 메시지를 읽어 handler로 전달"""
+        async with self._conn.execute(
+            "SELECT id, payload FROM messages WHERE id > ? ORDER BY id", (self._last_id,)
+        ) as cursor:
+            rows = await cursor.fetchall()
+        for message_id, payload in rows:
+            self._last_id = message_id
+            try:
+                self._handler(json.loads(payload))
+            except Exception as e:
+                logger.error(f"브로커 메시지 처리 중 오류 발생: {e}")
+
+        now = time.time()
+        if now - self._last_prune >= self.retention:
+            self._last_prune = now
+            await self._conn.execute("DELETE FROM messages WHERE created_at < ?", (now - self.retention,))
+            await self._conn.commit()
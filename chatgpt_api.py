@@ -1,11 +1,82 @@
 # chatgpt_api.py 
+import logging
 import os
+import re
+from typing import AsyncIterator, List, Optional, Tuple
 from openai import AsyncOpenAI
+from metrics import track_call
+
+logger = logging.getLogger(__name__)
+
+# 응답에서 리뷰 본문을 찾지 못한 경우의 리뷰 (공유 리뷰로 저장하지 않음)
+REVIEW_PARSE_FAILED = "메뉴 분석 결과를 생성하지 못했습니다."
 
 class GPT_Client:
     def __init__(self, api_key: str):
         self.client = AsyncOpenAI(api_key=api_key)
 
+    def _build_messages(self, menu: str) -> list:
+        """AI에 보낼 메시지 만들기"""
+        prompt = f"""
+            다음 학교 급식 메뉴에 대해 영양학적 관점과 학생 선호도 관점에서 각각 분석하고 평가하는 리뷰를 작성해주세요:
+           
+            다음을 준수해주세요.
+            리뷰는 450자 이내로 작성해주세요.
+            '이번 학교 급식 메뉴는...' , '이번 학교 급식은...' 등 사용하지 마십시고 다양한 시작어를 사용해야 합니다.
+            시작없이 바로 리뷰를 하는 방법도 가끔 사용하시도록 합니다.
+            반듯이 존칭어를 사용해야 합니다.
+            학교 점심 메뉴: {menu}
+
+            반드시 마지막에 줄바꿈을 하고 5점 만점으로 각각의 평가 점수를 다음처럼 추가해주세요.
+            #NUTRI_RATE:영양학적 평가점수
+            #PREF_RATE:학생 선호도 평가점수
+            """
+        return [
+            {"role": "system", "content": "당신은 학교 급식을 평가하는 영양 전문가입니다."},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    def _parse_score(line: str, marker: str):
+        """점수 줄 파싱 (1~5 사이로 제한, 실패 시 None)"""
+        try:
+            score = float(line.replace(marker, '').strip())
+            return min(max(score, 1.0), 5.0)
+        except:
+            return None
+
+    @classmethod
+    def parse_review(cls, content: str) -> Tuple[str, float, float]:
+        """AI 응답에서 리뷰 본문과 평가 점수 분리"""
+        review_text = content.strip()
+        review_text = review_text.replace('\n\n', '\n')
+        lines = review_text.split('\n')
+
+        # 기본 평가 점수
+        nutri_score = 3.0
+        pref_score = 3.0
+        review_lines = []
+
+        # 응답 분석
+        for line in lines:
+            if line.startswith('#NUTRI_RATE:'):
+                score = cls._parse_score(line, '#NUTRI_RATE:')
+                if score is not None:
+                    nutri_score = score
+            elif line.startswith('#PREF_RATE:'):
+                score = cls._parse_score(line, '#PREF_RATE:')
+                if score is not None:
+                    pref_score = score
+            elif line.strip():
+                review_lines.append(line.strip())
+
+        # 최종 리뷰 텍스트 만들기
+        final_review = '\n'.join(review_lines)
+        if not final_review:
+            return REVIEW_PARSE_FAILED, 3.0, 3.0
+
+        return final_review, nutri_score, pref_score
+
     async def generate_menu_review(self, menu: str):
         """메뉴 리뷰 생성"""
         # 급식 정보가 없는 경우 처리
@@ -13,70 +84,123 @@ class GPT_Client:
             return "급식 정보가 없습니다.", 0.0, 0.0
 
         try:
-            # AI에 보낼 메시지 만들기
-            prompt = f"""
-            다음 학교 급식 메뉴에 대해 영양학적 관점과 학생 선호도 관점에서 각각 분석하고 평가하는 리뷰를 작성해주세요:
+            # AI에 요청 보내기
+            with track_call('openai', 'review'):
+                response = await self.client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=self._build_messages(menu),
+                    temperature=0.7,
+                    max_tokens=500
+                )
+
+            # AI 응답 처리하기
+            return self.parse_review(response.choices[0].message.content)
+
+        except Exception as e:
+            # 오류 응답이 공유 리뷰로 저장되지 않도록 호출한 쪽에서 처리
+            logger.error(f"메뉴 분석 중 오류 발생: {str(e)}")
+            raise
+
+    def _build_batch_messages(self, menus: List[str]) -> list:
+        """여러 메뉴를 한 번에 평가하는 메시지 만들기"""
+        menu_lines = '\n'.join(f"[{i}] {menu}" for i, menu in enumerate(menus, 1))
+        prompt = f"""
+            다음 학교 급식 메뉴 {len(menus)}개에 대해 각각 영양학적 관점과 학생 선호도 관점에서 분석하고 평가하는 리뷰를 작성해주세요:
            
             다음을 준수해주세요.
-            리뷰는 450자 이내로 작성해주세요.
+            메뉴마다 리뷰는 450자 이내로 작성해주세요.
             '이번 학교 급식 메뉴는...' , '이번 학교 급식은...' 등 사용하지 마십시고 다양한 시작어를 사용해야 합니다.
             시작없이 바로 리뷰를 하는 방법도 가끔 사용하시도록 합니다.
             반듯이 존칭어를 사용해야 합니다.
-            학교 점심 메뉴: {menu}
+            학교 점심 메뉴 목록:
+{menu_lines}
 
-            반드시 마지막에 줄바꿈을 하고 5점 만점으로 각각의 평가 점수를 다음처럼 추가해주세요.
+            메뉴마다 아래 형식을 반드시 지켜주세요. 번호는 메뉴 목록의 번호입니다.
+            #ITEM:번호
+            리뷰 내용
             #NUTRI_RATE:영양학적 평가점수
             #PREF_RATE:학생 선호도 평가점수
+            #END
             """
+        return [
+            {"role": "system", "content": "당신은 학교 급식을 평가하는 영양 전문가입니다."},
+            {"role": "user", "content": prompt}
+        ]
 
-            # AI에 요청 보내기
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "당신은 학교 급식을 평가하는 영양 전문가입니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
+    def _parse_batch_review(self, content: str, count: int) -> List[Optional[Tuple[str, float, float]]]:
+        """
+        여러 메뉴 응답을 메뉴별 리뷰로 분리
+        :return: 메뉴 순서대로 (리뷰, 영양 점수, 선호도 점수), 형식이 맞지 않는 항목은 None
+        """
+        results: List[Optional[Tuple[str, float, float]]] = [None] * count
+        for match in re.finditer(r'#ITEM:\s*(\d+)\s*\n(.*?)#END', content, re.S):
+            index = int(match.group(1)) - 1
+            block = match.group(2)
+            # 점수 줄이 모두 있는 항목만 사용
+            if not (0 <= index < count) or '#NUTRI_RATE:' not in block or '#PREF_RATE:' not in block:
+                continue
+            review = self.parse_review(block)
+            if review[0] != REVIEW_PARSE_FAILED:
+                results[index] = review
+        return results
 
-            # AI 응답 처리하기
-            review_text = response.choices[0].message.content.strip()
-            review_text = review_text.replace('\n\n', '\n')
-            lines = review_text.split('\n')
-
-            # 기본 평가 점수
-            nutri_score = 3.0
-            pref_score = 3.0
-            review_lines = []
-
-            # 응답 분석
-            for line in lines:
-                if line.startswith('#NUTRI_RATE:'):
-                    try:
-                        nutri_score = float(line.replace('#NUTRI_RATE:', '').strip())
-                        nutri_score = min(max(nutri_score, 1.0), 5.0)  # 1~5 사이로 제한
-                    except:
-                        pass
-                elif line.startswith('#PREF_RATE:'):
-                    try:
-                        pref_score = float(line.replace('#PREF_RATE:', '').strip())
-                        pref_score = min(max(pref_score, 1.0), 5.0)  # 1~5 사이로 제한
-                    except:
-                        pass
-                elif line.strip():
-                    review_lines.append(line.strip())
-
-            # 최종 리뷰 텍스트 만들기
-            final_review = '\n'.join(review_lines)
-            if not final_review:
-                return "메뉴 분석 결과를 생성하지 못했습니다.", 3.0, 3.0
-
-            return final_review, nutri_score, pref_score
+    async def generate_menu_reviews(self, menus: List[str]) -> List[Optional[Tuple[str, float, float]]]:
+        """
+        여러 메뉴 리뷰를 한 번의 요청으로 생성 (대량 사전 생성용)
+        - 응답에서 분리하지 못한 메뉴는 메뉴별 요청으로 다시 생성합니다.
+        :return: 메뉴 순서대로 (리뷰, 영양 점수, 선호도 점수), 실패한 항목은 None
+        """
+        if len(menus) == 1:
+            return [await self.generate_menu_review(menus[0])]
 
+        try:
+            with track_call('openai', 'review_batch'):
+                response = await self.client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=self._build_batch_messages(menus),
+                    temperature=0.7,
+                    max_tokens=min(500 * len(menus), 4000)
+                )
+            results = self._parse_batch_review(response.choices[0].message.content, len(menus))
         except Exception as e:
-            print(f"메뉴 분석 중 오류 발생: {str(e)}")
-            return "메뉴 분석 중 오류가 발생했습니다.", 3.0, 3.0
+            logger.error(f"메뉴 일괄 분석 중 오류 발생: {str(e)}")
+            results = [None] * len(menus)
+
+        # 분리하지 못한 메뉴는 하나씩 다시 요청
+        for i, result in enumerate(results):
+            if result is None:
+                try:
+                    results[i] = await self.generate_menu_review(menus[i])
+                except Exception:
+                    results[i] = None
+        return results
+
+    async def stream_menu_review(self, menu: str) -> AsyncIterator[str]:
+        """
+        메뉴 리뷰를 생성되는 대로 조각(토큰) 단위로 반환
+        - 점수 분리와 저장은 ReviewStreamParser로 처리합니다.
+        """
+        if not menu or menu == "급식 정보 없음":
+            yield "급식 정보가 없습니다."
+            return
+
+        try:
+            # 스트리밍은 마지막 조각을 받을 때까지의 시간을 기록
+            with track_call('openai', 'review_stream'):
+                stream = await self.client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=self._build_messages(menu),
+                    temperature=0.7,
+                    max_tokens=500,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+
+        except Exception as e:
+            logger.error(f"메뉴 분석 스트리밍 중 오류 발생: {str(e)}")
+            raise
 
     def check_api_key(self):
         """API 키 확인"""
@@ -84,6 +208,63 @@ class GPT_Client:
             return False
         return True
 
+class ReviewStreamParser:
+    """
+    스트리밍 응답 파서
+    - 화면에 보여줄 본문 조각만 돌려주고, 점수 줄(#NUTRI_RATE, #PREF_RATE)은 숨깁니다.
+    - 점수 줄이 끝나는 즉시 점수를 추출합니다.
+    """
+    MARKERS = ('#NUTRI_RATE:', '#PREF_RATE:')
+
+    def __init__(self):
+        self.content = ''  # 전체 응답 (완료 후 finish에서 GPT_Client.parse_review로 최종 처리)
+        self.nutri_score: Optional[float] = None
+        self.pref_score: Optional[float] = None
+        self._line = ''  # 현재 줄
+        self._visible = False  # 현재 줄을 화면에 보여주는 중인지 여부
+        self._has_text = False  # 보여준 본문이 있는지 여부 (줄바꿈 처리용)
+
+    def feed(self, delta: str) -> str:
+        """응답 조각을 받아 화면에 보여줄 텍스트 반환"""
+        self.content += delta
+        output = []
+        for i, part in enumerate(delta.split('\n')):
+            if i > 0:
+                self._end_line()
+            if self._visible:
+                output.append(part)
+                self._line += part
+                continue
+            self._line += part
+            text = self._line.lstrip()
+            if not text:
+                continue
+            if text.startswith('#') and any(m.startswith(text) or text.startswith(m) for m in self.MARKERS):
+                # 점수 줄일 수 있으므로 줄이 끝날 때까지 보류
+                continue
+            self._visible = True
+            output.append(('\n' if self._has_text else '') + text)
+            self._has_text = True
+        return ''.join(output)
+
+    def _end_line(self):
+        """줄이 끝나면 점수 줄 파싱"""
+        line = self._line.strip()
+        if not self._visible:
+            if line.startswith('#NUTRI_RATE:'):
+                score = GPT_Client._parse_score(line, '#NUTRI_RATE:')
+                self.nutri_score = score if score is not None else self.nutri_score
+            elif line.startswith('#PREF_RATE:'):
+                score = GPT_Client._parse_score(line, '#PREF_RATE:')
+                self.pref_score = score if score is not None else self.pref_score
+        self._line = ''
+        self._visible = False
+
+    def finish(self) -> Tuple[str, float, float]:
+        """마지막 줄 처리 후 전체 응답에서 (리뷰, 영양 점수, 선호도 점수) 분리"""
+        self._end_line()
+        return GPT_Client.parse_review(self.content)
+
 class GPT_Client_API:
     """
     AI 서비스 생성을 도와주는 클래스
@@ -96,7 +277,7 @@ class GPT_Client_API:
         
         # API 키가 없으면 None 반환
         if not api_key:
-            print("OpenAI API key를 찾을 수 없습니다.")
+            logger.warning("OpenAI API key를 찾을 수 없습니다.")
             return None
             
         # API 키가 있으면 AIService 인스턴스 생성
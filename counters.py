@@ -0,0 +1,195 @@
+# counters.py
+
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FlushListener = Callable[[str, str, int], None]  # listener(날짜, 학교 코드, 좋아요 수)
+
+DURABILITY_INTERVAL = 'interval'  # flush_interval 동안의 증가분 손실 허용
+DURABILITY_SYNC = 'sync'  # 요청마다 바로 저장 (기존 동작)
+
+class CounterStore:
+    """
+    방문자 수, 좋아요 수 write-behind 카운터
+    - 증가는 메모리에 모아 두고 바로 현재 값을 반환합니다.
+    - 모인 증가분은 flush_interval마다(또는 max_pending개가 모이면, 그리고 종료 시) 한 트랜잭션으로 저장합니다.
+    - 저장된 값은 flush_interval 동안만 메모리에 두고 다시 읽어서 다른 워커의 증가분도 반영합니다.
+    - 저장 후에는 증가한 좋아요 수를 다시 읽어 모든 워커의 증가분이 합쳐진 값을 flush listener에 알립니다.
+    - durability='sync'이면 증가할 때마다 바로 저장합니다.
+    """
+    def __init__(self, db, flush_interval: float = 1.0, max_pending: int = 1000, durability: str = DURABILITY_INTERVAL):
+        if durability not in (DURABILITY_INTERVAL, DURABILITY_SYNC):
+            raise ValueError(f"지원하지 않는 durability: {durability}")
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.durability = durability
+        self._pending_visits: Dict[str, int] = {}  # 날짜별 저장되지 않은 방문자 수 증가분
+        self._pending_likes: Dict[Tuple[str, str], int] = {}  # (날짜, 학교 코드)별 저장되지 않은 좋아요 증가분
+        self._pending_count = 0
+        self._visit_base: Dict[str, int] = {}  # 날짜별 저장된 방문자 수
+        self._like_base: Dict[Tuple[str, str], int] = {}  # (날짜, 학교 코드)별 저장된 좋아요 수
+        self._total_base: Optional[int] = None  # 저장된 총 방문자 수
+        self._lock = asyncio.Lock()  # 저장된 값 읽기와 증가분 저장을 직렬화
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_listeners: List[FlushListener] = []
+        self.flushes = 0
+        self.flushed_increments = 0
+        self.failed_flushes = 0
+
+    async def start(self):
+        """주기적 저장 시작"""
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """주기적 저장 중지 및 남은 증가분 저장"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def add_flush_listener(self, listener: FlushListener):
+        """저장 후 좋아요 수 알림 등록 (listener(날짜, 학교 코드, 좋아요 수))"""
+        self._flush_listeners.append(listener)
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"카운터 저장 중 오류 발생: {e}")
+
+    async def flush(self):
+        """모인 증가분을 한 트랜잭션으로 저장 (실패하면 다음 저장 때 다시 시도)"""
+        async with self._lock:
+            visits, likes = self._pending_visits, self._pending_likes
+            count = self._pending_count
+            self._pending_visits, self._pending_likes, self._pending_count = {}, {}, 0
+            # 다음 읽기 때 저장된 값을 다시 읽음 (다른 워커의 증가분 반영)
+            self._visit_base.clear()
+            self._like_base.clear()
+            self._total_base = None
+            if visits or likes:
+                try:
+                    await self.db.add_counts(visits, likes)
+                except Exception:
+                    self.failed_flushes += 1
+                    self._restore(visits, likes, count)
+                    raise
+                self.flushes += 1
+                self.flushed_increments += count
+                if likes:
+                    await self._refresh_likes(list(likes))
+
+    async def _refresh_likes(self, keys: List[Tuple[str, str]]):
+        """저장한 좋아요 수를 다시 읽어 저장된 값으로 두고 listener에 알림 (다른 워커의 증가분 포함)"""
+        try:
+            totals = await self.db.get_likes_many(keys)
+        except Exception as e:
+            # 증가분은 이미 저장되었으므로 되돌리지 않음 (다음 읽기 때 다시 조회)
+            logger.error(f"좋아요 수 다시 읽기 중 오류 발생: {e}")
+            return
+        self._like_base.update(totals)
+        for (date_str, school_code), likes in totals.items():
+            value = likes + self._pending_likes.get((date_str, school_code), 0)
+            for listener in self._flush_listeners:
+                try:
+                    listener(date_str, school_code, value)
+                except Exception as e:
+                    logger.error(f"좋아요 수 알림 처리 중 오류 발생: {e}")
+
+    def _restore(self, visits: Dict[str, int], likes: Dict[Tuple[str, str], int], count: int):
+        """저장에 실패한 증가분을 다시 대기 상태로 되돌림"""
+        for key, delta in visits.items():
+            self._pending_visits[key] = self._pending_visits.get(key, 0) + delta
+        for key, delta in likes.items():
+            self._pending_likes[key] = self._pending_likes.get(key, 0) + delta
+        self._pending_count += count
+
+    async def _after_increment(self):
+        self._pending_count += 1
+        if self.durability == DURABILITY_SYNC:
+            await self.flush()
+        elif self._pending_count >= self.max_pending:
+            self._wake.set()
+
+    # 방문자 수
+    async def _visit_base_of(self, date_str: str) -> int:
+        if date_str not in self._visit_base:
+            async with self._lock:
+                if date_str not in self._visit_base:
+                    self._visit_base[date_str] = await self.db.get_today_visits(date_str)
+        return self._visit_base[date_str]
+
+    async def increment_visits(self, date_str: str) -> int:
+        """방문자 수 증가 후 현재 값 반환"""
+        self._pending_visits[date_str] = self._pending_visits.get(date_str, 0) + 1
+        self.db.notify_write('visits', date_str)
+        value = await self._visit_base_of(date_str) + self._pending_visits.get(date_str, 0)
+        await self._after_increment()
+        return value
+
+    async def get_visits(self, date_str: str) -> int:
+        """특정 날짜의 방문자 수 (저장되지 않은 증가분 포함)"""
+        return await self._visit_base_of(date_str) + self._pending_visits.get(date_str, 0)
+
+    async def get_total_visits(self) -> int:
+        """총 방문자 수 (저장되지 않은 증가분 포함)"""
+        if self._total_base is None:
+            async with self._lock:
+                if self._total_base is None:
+                    self._total_base = await self.db.get_total_visits()
+        return self._total_base + sum(self._pending_visits.values())
+
+    # 좋아요 수
+    async def _like_base_of(self, key: Tuple[str, str]) -> int:
+        if key not in self._like_base:
+            async with self._lock:
+                if key not in self._like_base:
+                    self._like_base[key] = await self.db.get_likes(*key)
+        return self._like_base[key]
+
+    async def increment_like(self, date_str: str, school_code: str) -> int:
+        """좋아요 수 증가 후 현재 값 반환"""
+        key = (date_str, school_code)
+        self._pending_likes[key] = self._pending_likes.get(key, 0) + 1
+        self.db.notify_write('reactions', date_str)
+        value = await self._like_base_of(key) + self._pending_likes.get(key, 0)
+        await self._after_increment()
+        return value
+
+    async def get_likes(self, date_str: str, school_code: str) -> int:
+        """특정 학교의 좋아요 수 (저장되지 않은 증가분 포함)"""
+        key = (date_str, school_code)
+        return await self._like_base_of(key) + self._pending_likes.get(key, 0)
+
+    def overlay_likes(self, date_str: str, reactions: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+        """저장된 반응 수({학교 코드: {"likes": n}})에 저장되지 않은 증가분 더하기"""
+        for (pending_date, school_code), delta in self._pending_likes.items():
+            if pending_date == date_str:
+                reaction = reactions.setdefault(school_code, {"likes": 0})
+                reaction["likes"] = reaction.get("likes", 0) + delta
+        return reactions
+
+    def stats(self) -> Dict:
+        """저장 대기 중인 증가분과 저장 횟수"""
+        return {
+            "durability": self.durability,
+            "pending_increments": self._pending_count,
+            "flushes": self.flushes,
+            "flushed_increments": self.flushed_increments,
+            "failed_flushes": self.failed_flushes
+        }
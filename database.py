@@ -2,18 +2,75 @@
 
 import aiosqlite
 import asyncio
+import contextvars
 import logging
+import re
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Dict, Tuple
+from metrics import DB_QUERY_DURATION, DB_QUERY_ERRORS, DB_SLOW_QUERIES, query_label
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 급식 정보 저장 (이미 있는 행은 rowid를 유지한 채 갱신)
+SAVE_MEAL_QUERY = '''
+    INSERT INTO meals (date, school_code, school_name, lunch_menu, school_bigrams, menu_bigrams)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (date, school_code) DO UPDATE SET
+        school_name = excluded.school_name,
+        lunch_menu = excluded.lunch_menu,
+        school_bigrams = excluded.school_bigrams,
+        menu_bigrams = excluded.menu_bigrams
+'''
+
+# 두 글자 검색어 색인(meals_bigram)의 컬럼
+BIGRAM_COLUMNS = {'lunch_menu': 'menu_bigrams', 'school_name': 'school_bigrams'}
+
+def bigram_text(text: Optional[str]) -> str:
+    """두 글자 검색어 색인용 텍스트 (단어마다 연속된 두 글자를 공백으로 나열, 중복 제외)"""
+    words = re.findall(r'[^\W_]+', text or '')
+    return ' '.join(dict.fromkeys(word[i:i + 2] for word in words for i in range(len(word) - 1)))
+
+def meal_row(date_str: str, school_code: str, school_name: str, menu: str) -> Tuple[str, ...]:
+    """SAVE_MEAL_QUERY 인자 (검색 색인용 두 글자 목록 포함)"""
+    return (date_str, school_code, school_name, menu, bigram_text(school_name), bigram_text(menu))
+
+# 현재 작업이 트랜잭션 안에서 실행 중인지 여부
+_in_transaction: contextvars.ContextVar[bool] = contextvars.ContextVar('in_transaction', default=False)
+# 트랜잭션이 커밋된 뒤 알릴 쓰기 (테이블, 날짜)
+_pending_writes: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar('pending_writes', default=None)
+
+WriteListener = Callable[[str, Optional[str]], None]
+
 class Database:
-    def __init__(self, db_path: str):
+    """
+    SQLite 데이터베이스
+    - 쓰기는 하나의 쓰기 연결(conn)에서 write lock으로 직렬화하고, 트랜잭션 밖의 쓰기는 문장마다 커밋합니다.
+    - transaction() 안의 쓰기는 한 번에 커밋하고, 오류가 발생하면 모두 롤백합니다.
+    - 조회는 읽기 전용 연결 풀(read_pool_size개)에서 실행하므로 쓰기 중에도 기다리지 않습니다 (WAL 모드).
+      트랜잭션 안의 조회는 아직 커밋하지 않은 쓰기를 보도록 쓰기 연결에서 실행합니다.
+    - 쓰기가 커밋되면 등록된 write listener에 (테이블, 날짜)를 알립니다 (응답 캐시 무효화 등).
+    - 쿼리마다 실행 시간을 기록하고, slow_query_ms를 넘긴 쿼리는 경고 로그로 남깁니다 (0이면 남기지 않음).
+    - 급식 메뉴와 학교명은 FTS5(trigram) 검색 색인(meals_fts)에 트리거로 반영합니다 (FTS5를 지원하지 않으면 LIKE 검색).
+      trigram으로 찾을 수 없는 두 글자 검색어는 두 글자 단위 색인(meals_bigram)으로 찾습니다.
+    """
+    def __init__(self, db_path: str, journal_mode: str = 'WAL', synchronous: str = 'NORMAL',
+                 cache_size: int = -16000, mmap_size: int = 134217728, read_pool_size: int = 4,
+                 slow_query_ms: float = 200):
         self.db_path = db_path
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = cache_size  # 음수이면 KiB 단위
+        self.mmap_size = mmap_size
+        self.read_pool_size = read_pool_size
+        self.slow_query_ms = slow_query_ms
         self.conn: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: Optional[asyncio.Queue] = None
+        self._write_listeners: List[WriteListener] = []
+        self.search_index = False  # FTS5 검색 색인 사용 여부
         self._ensure_db_path()
 
     def _ensure_db_path(self):
@@ -27,12 +84,45 @@ class Database:
         try:
             self.conn = await aiosqlite.connect(self.db_path)
             await self.conn.execute('PRAGMA foreign_keys = ON;')
+            await self._configure(self.conn)
             await self._create_tables()
+            await self._create_search_index()
             await self.conn.commit()
+            await self._open_readers()
             # logger.info("데이터베이스 초기화 완료.")
         except aiosqlite.Error as e:
             logger.error(f"데이터베이스 초기화 중 오류 발생: {e}")
 
+    async def _open_readers(self):
+        """읽기 전용 연결 풀 생성 (테이블 생성 후)"""
+        uri = Path(self.db_path).resolve().as_uri() + '?mode=ro'
+        self._idle_readers = asyncio.Queue()
+        for _ in range(self.read_pool_size):
+            reader = await aiosqlite.connect(uri, uri=True)
+            await reader.execute(f'PRAGMA cache_size = {int(self.cache_size)}')
+            await reader.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+            self._readers.append(reader)
+            self._idle_readers.put_nowait(reader)
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """조회에 사용할 연결 (풀이 없거나 트랜잭션 안이면 쓰기 연결)"""
+        if not self._readers or _in_transaction.get():
+            yield self.conn
+            return
+        reader = await self._idle_readers.get()
+        try:
+            yield reader
+        finally:
+            self._idle_readers.put_nowait(reader)
+
+    async def _configure(self, conn: aiosqlite.Connection):
+        """저널 모드, 동기화 수준, 캐시 크기, mmap 크기 설정"""
+        await conn.execute(f'PRAGMA journal_mode = {self.journal_mode}')
+        await conn.execute(f'PRAGMA synchronous = {self.synchronous}')
+        await conn.execute(f'PRAGMA cache_size = {int(self.cache_size)}')
+        await conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+
     async def _create_tables(self):
         """테이블 생성"""
         try:
@@ -56,6 +146,27 @@ class Database:
                     PRIMARY KEY (date, school_code)
                 )
             ''')
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS review_contents (
+                    menu_hash TEXT PRIMARY KEY,
+                    menu TEXT,
+                    review_text TEXT,
+                    nutri_score REAL,
+                    pref_score REAL,
+                    created_at REAL
+                )
+            ''')
+            # 기존 데이터베이스에 공유 리뷰 참조 컬럼 추가
+            async with self.conn.execute('PRAGMA table_info(reviews)') as cursor:
+                columns = [row[1] for row in await cursor.fetchall()]
+            if 'menu_hash' not in columns:
+                await self.conn.execute('ALTER TABLE reviews ADD COLUMN menu_hash TEXT')
+            # 기존 데이터베이스에 두 글자 검색 색인용 컬럼 추가 (값은 _create_search_index에서 채움)
+            async with self.conn.execute('PRAGMA table_info(meals)') as cursor:
+                columns = [row[1] for row in await cursor.fetchall()]
+            for column in BIGRAM_COLUMNS.values():
+                if column not in columns:
+                    await self.conn.execute(f'ALTER TABLE meals ADD COLUMN {column} TEXT')
             await self.conn.execute('''
                 CREATE TABLE IF NOT EXISTS reactions (
                     date TEXT,
@@ -70,12 +181,144 @@ class Database:
                     count INTEGER DEFAULT 0
                 )
             ''')
+            # 총 방문자 수 (visits 전체 합계를 매번 계산하지 않도록 유지)
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS visit_totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total INTEGER NOT NULL
+                )
+            ''')
+            await self.conn.execute(
+                'INSERT OR IGNORE INTO visit_totals (id, total) SELECT 1, COALESCE(SUM(count), 0) FROM visits'
+            )
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS meal_negatives (
+                    date TEXT,
+                    school_code TEXT,
+                    checked_at REAL,
+                    permanent INTEGER DEFAULT 0,
+                    PRIMARY KEY (date, school_code)
+                )
+            ''')
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS no_service_dates (
+                    date TEXT,
+                    atpt_code TEXT,
+                    checked_at REAL,
+                    permanent INTEGER DEFAULT 0,
+                    PRIMARY KEY (date, atpt_code)
+                )
+            ''')
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS schools (
+                    school_code TEXT PRIMARY KEY,
+                    school_name TEXT,
+                    atpt_code TEXT,
+                    updated_at TEXT
+                )
+            ''')
             # logger.info("테이블 생성 완료.")
         except aiosqlite.Error as e:
             logger.error(f"테이블 생성 중 오류 발생: {e}")
 
+    async def _create_search_index(self):
+        """
+        급식 메뉴 검색 색인 생성 (meals 테이블을 원본으로 하는 FTS5 trigram 색인, 두 글자 단위 색인)
+        - meals의 쓰기는 트리거로 색인에 반영합니다 (색인은 meals의 rowid로 연결).
+        - 처음 만들 때 기존 급식 정보로 색인을 채웁니다.
+        """
+        try:
+            async with self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meals_fts'"
+            ) as cursor:
+                exists = await cursor.fetchone() is not None
+            await self.conn.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS meals_fts USING fts5(
+                    lunch_menu, school_name,
+                    content = 'meals', content_rowid = 'rowid', tokenize = 'trigram'
+                )
+            ''')
+            await self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS meals_fts_insert AFTER INSERT ON meals BEGIN
+                    INSERT INTO meals_fts (rowid, lunch_menu, school_name)
+                    VALUES (new.rowid, new.lunch_menu, new.school_name);
+                END
+            ''')
+            await self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS meals_fts_delete AFTER DELETE ON meals BEGIN
+                    INSERT INTO meals_fts (meals_fts, rowid, lunch_menu, school_name)
+                    VALUES ('delete', old.rowid, old.lunch_menu, old.school_name);
+                END
+            ''')
+            await self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS meals_fts_update AFTER UPDATE ON meals BEGIN
+                    INSERT INTO meals_fts (meals_fts, rowid, lunch_menu, school_name)
+                    VALUES ('delete', old.rowid, old.lunch_menu, old.school_name);
+                    INSERT INTO meals_fts (rowid, lunch_menu, school_name)
+                    VALUES (new.rowid, new.lunch_menu, new.school_name);
+                END
+            ''')
+            # INSERT OR REPLACE로 지워지는 행도 삭제 트리거가 실행되도록 설정
+            await self.conn.execute('PRAGMA recursive_triggers = ON')
+            if not exists:
+                await self.conn.execute("INSERT INTO meals_fts (meals_fts) VALUES ('rebuild')")
+            await self._create_bigram_index()
+            self.search_index = True
+        except aiosqlite.Error as e:
+            logger.warning(f"검색 색인을 만들 수 없어 LIKE 검색을 사용합니다: {e}")
+
+    async def _create_bigram_index(self):
+        """
+        두 글자 검색어 색인 생성 (meals의 두 글자 목록 컬럼을 원본으로 하는 FTS5 unicode61 색인)
+        - 두 글자 목록은 저장할 때 bigram_text로 만들고, 처음 만들 때 기존 급식 정보의 목록을 채웁니다.
+        """
+        async with self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meals_bigram'"
+        ) as cursor:
+            exists = await cursor.fetchone() is not None
+        if not exists:
+            async with self.conn.execute(
+                "SELECT rowid, school_name, lunch_menu FROM meals WHERE menu_bigrams IS NULL"
+            ) as cursor:
+                rows = await cursor.fetchall()
+            await self.conn.executemany(
+                "UPDATE meals SET school_bigrams = ?, menu_bigrams = ? WHERE rowid = ?",
+                [(bigram_text(school_name), bigram_text(menu), rowid) for rowid, school_name, menu in rows]
+            )
+        await self.conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS meals_bigram USING fts5(
+                menu_bigrams, school_bigrams,
+                content = 'meals', content_rowid = 'rowid', tokenize = 'unicode61', detail = 'column'
+            )
+        ''')
+        await self.conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS meals_bigram_insert AFTER INSERT ON meals BEGIN
+                INSERT INTO meals_bigram (rowid, menu_bigrams, school_bigrams)
+                VALUES (new.rowid, new.menu_bigrams, new.school_bigrams);
+            END
+        ''')
+        await self.conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS meals_bigram_delete AFTER DELETE ON meals BEGIN
+                INSERT INTO meals_bigram (meals_bigram, rowid, menu_bigrams, school_bigrams)
+                VALUES ('delete', old.rowid, old.menu_bigrams, old.school_bigrams);
+            END
+        ''')
+        await self.conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS meals_bigram_update AFTER UPDATE ON meals BEGIN
+                INSERT INTO meals_bigram (meals_bigram, rowid, menu_bigrams, school_bigrams)
+                VALUES ('delete', old.rowid, old.menu_bigrams, old.school_bigrams);
+                INSERT INTO meals_bigram (rowid, menu_bigrams, school_bigrams)
+                VALUES (new.rowid, new.menu_bigrams, new.school_bigrams);
+            END
+        ''')
+        if not exists:
+            await self.conn.execute("INSERT INTO meals_bigram (meals_bigram) VALUES ('rebuild')")
+
     async def close(self):
         """데이터베이스 연결 종료"""
+        for reader in self._readers:
+            await reader.close()
+        self._readers = []
         if self.conn:
             await self.conn.close()
             # logger.info("데이터베이스 연결 종료.")
@@ -91,20 +334,112 @@ class Database:
         if not self.conn:
             logger.error("데이터베이스 연결이 초기화되지 않았습니다.")
             return []
+        start = time.perf_counter()
         try:
-            async with self.conn.execute(query, params or ()) as cursor:
-                if fetch:
-                    rows = await cursor.fetchall()
-                    logger.debug(f"쿼리 결과: {rows}")
-                    return rows
-                await self.conn.commit()
+            if fetch:
+                async with self._reader() as conn:
+                    async with conn.execute(query, params or ()) as cursor:
+                        rows = await cursor.fetchall()
+                        logger.debug(f"쿼리 결과: {rows}")
+                        return rows
+            if _in_transaction.get():
+                await self.conn.execute(query, params or ())
                 return []
+            async with self._write_lock:
+                await self.conn.execute(query, params or ())
+                await self.conn.commit()
+            return []
         except aiosqlite.Error as e:
+            DB_QUERY_ERRORS.inc(query=query_label(query))
             logger.error(f"데이터베이스 오류: {e}\n쿼리: {query}\n파라미터: {params}")
+            if _in_transaction.get():
+                # 트랜잭션 안에서는 롤백되도록 다시 발생
+                raise
             return []
         except Exception as e:
+            DB_QUERY_ERRORS.inc(query=query_label(query))
             logger.error(f"예기치 않은 오류 발생: {e}")
+            if _in_transaction.get():
+                raise
             return []
+        finally:
+            self._record_query(query, time.perf_counter() - start)
+
+    def _record_query(self, query: str, elapsed: float, rows: Optional[int] = None):
+        """쿼리 실행 시간 기록 (잠금과 연결 대기 시간 포함), 기준을 넘기면 느린 쿼리 로그"""
+        label = query_label(query)
+        DB_QUERY_DURATION.observe(elapsed, query=label)
+        if self.slow_query_ms and elapsed * 1000 >= self.slow_query_ms:
+            DB_SLOW_QUERIES.inc(query=label)
+            detail = f", 행 수: {rows}" if rows is not None else ""
+            logger.warning(f"느린 쿼리 ({elapsed * 1000:.1f}ms{detail}): {' '.join(query.split())}")
+
+    async def executemany(self, query: str, params_seq: Iterable[tuple]):
+        """
+        여러 행을 한 번에 쓰기 (트랜잭션 밖에서는 한 번만 커밋)
+        :param query: 실행할 SQL 쿼리
+        :param params_seq: 행별 쿼리 파라미터
+        """
+        params_seq = list(params_seq)
+        if not params_seq:
+            return
+        start = time.perf_counter()
+        try:
+            if _in_transaction.get():
+                await self.conn.executemany(query, params_seq)
+                return
+            async with self.transaction():
+                await self.conn.executemany(query, params_seq)
+        except Exception:
+            DB_QUERY_ERRORS.inc(query=query_label(query))
+            raise
+        finally:
+            self._record_query(query, time.perf_counter() - start, len(params_seq))
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator['Database']:
+        """
+        트랜잭션 (블록 안의 쓰기를 한 번에 커밋, 오류 시 롤백)
+        - 블록 안에서 호출한 save_* 메서드도 같은 트랜잭션에 포함됩니다.
+        - 중첩해서 사용하면 바깥 트랜잭션에 합쳐집니다.
+        """
+        if _in_transaction.get():
+            yield self
+            return
+        writes = []
+        async with self._write_lock:
+            token = _in_transaction.set(True)
+            writes_token = _pending_writes.set(writes)
+            try:
+                yield self
+                await self.conn.commit()
+            except BaseException:
+                await self.conn.rollback()
+                raise
+            finally:
+                _in_transaction.reset(token)
+                _pending_writes.reset(writes_token)
+        for table, date_str in dict.fromkeys(writes):
+            self._notify(table, date_str)
+
+    def add_write_listener(self, listener: WriteListener):
+        """쓰기 알림 등록 (listener(테이블, 날짜))"""
+        self._write_listeners.append(listener)
+
+    def notify_write(self, table: str, date_str: Optional[str] = None):
+        """쓰기 알림 (트랜잭션 안이면 커밋된 뒤에 알림)"""
+        writes = _pending_writes.get()
+        if _in_transaction.get() and writes is not None:
+            writes.append((table, date_str))
+        else:
+            self._notify(table, date_str)
+
+    def _notify(self, table: str, date_str: Optional[str]):
+        for listener in self._write_listeners:
+            try:
+                listener(table, date_str)
+            except Exception as e:
+                logger.error(f"쓰기 알림 처리 중 오류 발생: {e}")
 
     # 급식 관련 메서드
     async def get_meals(self, date_str: str) -> List[Dict[str, str]]:
@@ -117,19 +452,138 @@ class Database:
         return [{"school_code": row[0], "school_name": row[1], "lunch_menu": row[2]} for row in rows]
 
     async def save_meal(self, date_str: str, school_code: str, school_name: str, menu: str):
-        """급식 정보 저장"""
+        """급식 정보 저장 (이미 있으면 같은 행을 갱신해서 검색 색인의 rowid 유지)"""
+        await self.execute(SAVE_MEAL_QUERY, meal_row(date_str, school_code, school_name, menu))
+        self.notify_write('meals', date_str)
+
+    async def save_meals(self, meals: Iterable[Tuple[str, str, str, str]]):
+        """급식 정보 일괄 저장 ((날짜, 학교 코드, 학교명, 메뉴) 목록)"""
+        meals = list(meals)
+        await self.executemany(SAVE_MEAL_QUERY, [meal_row(*meal) for meal in meals])
+        for date_str in dict.fromkeys(meal[0] for meal in meals):
+            self.notify_write('meals', date_str)
+
+    async def search_meals(self, dish: Optional[str] = None, school: Optional[str] = None,
+                           start_date: Optional[str] = None, end_date: Optional[str] = None,
+                           limit: int = 20, offset: int = 0) -> List[Dict[str, str]]:
+        """
+        급식 메뉴 검색 (최근 날짜순)
+        :param dish: 메뉴 검색어 (공백으로 나눈 단어를 모두 포함하는 메뉴, 부분 일치)
+        :param school: 학교 코드(숫자) 또는 학교명 일부
+        :param start_date: 시작 날짜 (YYYYMMDD, 포함)
+        :param end_date: 종료 날짜 (YYYYMMDD, 포함)
+        - 세 글자 이상인 단어는 검색 색인(trigram), 두 글자 단어는 두 글자 단위 색인으로 찾고,
+          한 글자 단어(또는 색인이 없는 경우)는 LIKE로 거릅니다.
+        """
+        match_terms: Dict[str, List[str]] = {'meals_fts': [], 'meals_bigram': []}  # 색인별 MATCH 조건
+        conditions = ["m.lunch_menu != '급식 정보 없음'"]
+        params: list = []
+
+        def contains(column: str, term: str):
+            quoted = '"' + term.replace('"', '""') + '"'
+            if self.search_index and len(term) >= 3:
+                match_terms['meals_fts'].append(f'{column} : {quoted}')
+            elif self.search_index and len(term) == 2 and bigram_text(term) == term:
+                match_terms['meals_bigram'].append(f'{BIGRAM_COLUMNS[column]} : {quoted}')
+            else:
+                escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                conditions.append(f"m.{column} LIKE ? ESCAPE '\\'")
+                params.append(f'%{escaped}%')
+
+        for term in (dish or '').split():
+            contains('lunch_menu', term)
+        if school:
+            if school.isdigit():
+                conditions.append("m.school_code = ?")
+                params.append(school)
+            else:
+                contains('school_name', school.strip())
+        if start_date:
+            conditions.append("m.date >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("m.date <= ?")
+            params.append(end_date)
+
+        # 색인에서 찾은 rowid로 meals 조회 (색인을 둘 다 쓰는 경우 각 색인 검색은 한 번만 실행)
+        for table in reversed([table for table, terms in match_terms.items() if terms]):
+            conditions.insert(0, f"m.rowid IN (SELECT rowid FROM {table} WHERE {table} MATCH ?)")
+            params.insert(0, ' AND '.join(match_terms[table]))
+        rows = await self.execute(f'''
+            SELECT m.date, m.school_code, m.school_name, m.lunch_menu
+            FROM meals m
+            WHERE {' AND '.join(conditions)}
+            ORDER BY m.date DESC, m.school_name, m.school_code
+            LIMIT ? OFFSET ?
+        ''', (*params, limit, offset), fetch=True)
+        return [{"date": row[0], "school_code": row[1], "school_name": row[2], "lunch_menu": row[3]} for row in rows]
+
+    # 급식 없음(네거티브 캐시) 관련 메서드
+    async def save_meal_negatives(self, negatives: Iterable[Tuple[str, str]], permanent: bool = False):
+        """학교별 급식 없음 일괄 기록 ((날짜, 학교 코드) 목록)"""
+        checked_at = time.time()
+        await self.executemany(
+            'INSERT OR REPLACE INTO meal_negatives (date, school_code, checked_at, permanent) VALUES (?, ?, ?, ?)',
+            [(date_str, school_code, checked_at, int(permanent)) for date_str, school_code in negatives]
+        )
+
+    async def get_meal_negatives(self, date_str: str, ttl: float) -> set:
+        """유효한 급식 없음 기록이 있는 학교 코드 조회"""
+        rows = await self.execute('''
+            SELECT n.school_code
+            FROM meal_negatives n
+            JOIN meals m ON m.date = n.date AND m.school_code = n.school_code
+            WHERE n.date = ? AND m.lunch_menu = '급식 정보 없음'
+              AND (n.permanent = 1 OR n.checked_at > ?)
+        ''', (date_str, time.time() - ttl), fetch=True)
+        return {row[0] for row in rows}
+
+    async def mark_no_service_date(self, date_str: str, atpt_code: str, permanent: bool = False):
+        """급식이 없는 날짜 기록 (주말, 공휴일, 방학 등)"""
         await self.execute(
-            'INSERT OR REPLACE INTO meals (date, school_code, school_name, lunch_menu) VALUES (?, ?, ?, ?)',
-            (date_str, school_code, school_name, menu)
+            'INSERT OR REPLACE INTO no_service_dates (date, atpt_code, checked_at, permanent) VALUES (?, ?, ?, ?)',
+            (date_str, atpt_code, time.time(), int(permanent))
         )
 
+    async def is_no_service_date(self, date_str: str, atpt_code: str, ttl: float) -> bool:
+        """급식이 없는 날짜로 기록되어 있는지 확인 (TTL 이내 또는 영구)"""
+        rows = await self.execute('''
+            SELECT 1 FROM no_service_dates
+            WHERE date = ? AND atpt_code = ? AND (permanent = 1 OR checked_at > ?)
+        ''', (date_str, atpt_code, time.time() - ttl), fetch=True)
+        return bool(rows)
+
+    # 학교 목록 관련 메서드
+    async def get_schools(self, atpt_code: str) -> List[Dict[str, str]]:
+        """저장된 학교 목록 조회"""
+        rows = await self.execute(
+            'SELECT school_code, school_name, updated_at FROM schools WHERE atpt_code = ? ORDER BY school_name',
+            (atpt_code,),
+            fetch=True
+        )
+        return [{"school_code": row[0], "school_name": row[1], "updated_at": row[2]} for row in rows]
+
+    async def save_schools(self, atpt_code: str, schools: List[Dict[str, str]], updated_at: str):
+        """학교 목록 저장 (이번 갱신에 없는 학교는 삭제)"""
+        async with self.transaction():
+            await self.executemany(
+                'INSERT OR REPLACE INTO schools (school_code, school_name, atpt_code, updated_at) VALUES (?, ?, ?, ?)',
+                [(school['school_code'], school['school_name'], atpt_code, updated_at) for school in schools]
+            )
+            await self.execute(
+                'DELETE FROM schools WHERE atpt_code = ? AND updated_at < ?',
+                (atpt_code, updated_at)
+            )
+
     # 리뷰 관련 메서드
     async def get_review(self, date_str: str, school_code: str) -> Optional[Dict]:
         """리뷰 정보 조회"""
         rows = await self.execute('''
-            SELECT r.review_text, r.error_flag, r.nutri_score, r.pref_score,
+            SELECT COALESCE(c.review_text, r.review_text), r.error_flag,
+                   COALESCE(c.nutri_score, r.nutri_score), COALESCE(c.pref_score, r.pref_score),
                    COALESCE(rc.likes, 0) as likes
             FROM reviews r
+            LEFT JOIN review_contents c ON r.menu_hash = c.menu_hash
             LEFT JOIN reactions rc ON r.date = rc.date AND r.school_code = rc.school_code
             WHERE r.date = ? AND r.school_code = ?
         ''', (date_str, school_code), fetch=True)
@@ -152,6 +606,47 @@ class Database:
             }
         return None
 
+    async def get_reviews(self, date_str: str) -> Dict:
+        """
+        특정 날짜의 모든 리뷰와 반응 수 조회 (한 번의 조인 쿼리)
+        :return: reviews(학교별 리뷰), reactions(학교별 반응 수), missing(리뷰가 없는 학교 코드)
+        """
+        rows = await self.execute('''
+            SELECT m.school_code, COALESCE(c.review_text, r.review_text), r.error_flag,
+                   COALESCE(c.nutri_score, r.nutri_score), COALESCE(c.pref_score, r.pref_score),
+                   COALESCE(rc.likes, 0) as likes
+            FROM meals m
+            LEFT JOIN reviews r ON m.date = r.date AND m.school_code = r.school_code
+            LEFT JOIN review_contents c ON r.menu_hash = c.menu_hash
+            LEFT JOIN reactions rc ON m.date = rc.date AND m.school_code = rc.school_code
+            WHERE m.date = ? AND m.lunch_menu != '급식 정보 없음'
+        ''', (date_str,), fetch=True)
+
+        reviews, reactions, missing = {}, {}, []
+        for school_code, review_text, error_flag, nutri_score, pref_score, likes in rows:
+            reactions[school_code] = {"likes": likes}
+            if review_text is None or error_flag:
+                missing.append(school_code)
+                continue
+            reviews[school_code] = {
+                "review": review_text,
+                "nutri_score": float(nutri_score),
+                "pref_score": float(pref_score),
+                "reactions": {"likes": likes}
+            }
+        return {"reviews": reviews, "reactions": reactions, "missing": missing}
+
+    async def get_meals_without_review(self, date_str: str) -> List[Dict[str, str]]:
+        """리뷰가 없거나 생성에 실패한 급식 조회"""
+        rows = await self.execute('''
+            SELECT m.school_code, m.lunch_menu
+            FROM meals m
+            LEFT JOIN reviews r ON m.date = r.date AND m.school_code = r.school_code
+            WHERE m.date = ? AND m.lunch_menu != '급식 정보 없음'
+              AND (r.school_code IS NULL OR r.error_flag = 1)
+        ''', (date_str,), fetch=True)
+        return [{"school_code": row[0], "lunch_menu": row[1]} for row in rows]
+
     async def save_review(self, date_str: str, school_code: str, review_text: str, nutri_score: float, pref_score: float, error_flag: int = 0):
         """리뷰 저장"""
         await self.execute(
@@ -160,6 +655,75 @@ class Database:
             VALUES (?, ?, ?, ?, ?, ?)''',
             (date_str, school_code, review_text, nutri_score, pref_score, error_flag)
         )
+        self.notify_write('reviews', date_str)
+
+    async def save_reviews(self, reviews: Iterable[Tuple[str, str, str, float, float, int]]):
+        """리뷰 일괄 저장 ((날짜, 학교 코드, 리뷰, 영양 점수, 선호 점수, 오류 플래그) 목록)"""
+        reviews = list(reviews)
+        await self.executemany(
+            '''INSERT OR REPLACE INTO reviews
+            (date, school_code, review_text, nutri_score, pref_score, error_flag)
+            VALUES (?, ?, ?, ?, ?, ?)''',
+            reviews
+        )
+        for date_str in dict.fromkeys(review[0] for review in reviews):
+            self.notify_write('reviews', date_str)
+
+    # 공유 리뷰(메뉴 해시 기준) 관련 메서드
+    async def get_review_content(self, menu_hash: str) -> Optional[Dict]:
+        """같은 메뉴에 대해 생성된 리뷰 조회"""
+        rows = await self.execute(
+            'SELECT review_text, nutri_score, pref_score FROM review_contents WHERE menu_hash = ?',
+            (menu_hash,),
+            fetch=True
+        )
+        if rows:
+            return {"review": rows[0][0], "nutri_score": float(rows[0][1]), "pref_score": float(rows[0][2])}
+        return None
+
+    async def save_review_content(self, menu_hash: str, menu: str, review_text: str, nutri_score: float, pref_score: float):
+        """메뉴 해시 기준 리뷰 저장"""
+        await self.execute(
+            '''INSERT OR REPLACE INTO review_contents
+            (menu_hash, menu, review_text, nutri_score, pref_score, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)''',
+            (menu_hash, menu, review_text, nutri_score, pref_score, time.time())
+        )
+
+    async def save_review_link(self, date_str: str, school_code: str, menu_hash: str):
+        """학교별 리뷰를 공유 리뷰에 연결"""
+        await self.execute(
+            '''INSERT OR REPLACE INTO reviews
+            (date, school_code, review_text, nutri_score, pref_score, error_flag, menu_hash)
+            VALUES (?, ?, NULL, NULL, NULL, 0, ?)''',
+            (date_str, school_code, menu_hash)
+        )
+        self.notify_write('reviews', date_str)
+
+    async def save_review_links(self, targets: Iterable[Tuple[str, str]], menu_hash: str):
+        """여러 학교의 리뷰를 공유 리뷰에 일괄 연결 ((날짜, 학교 코드) 목록)"""
+        targets = list(targets)
+        await self.executemany(
+            '''INSERT OR REPLACE INTO reviews
+            (date, school_code, review_text, nutri_score, pref_score, error_flag, menu_hash)
+            VALUES (?, ?, NULL, NULL, NULL, 0, ?)''',
+            [(date_str, school_code, menu_hash) for date_str, school_code in targets]
+        )
+        for date_str in dict.fromkeys(date_str for date_str, _ in targets):
+            self.notify_write('reviews', date_str)
+
+    async def get_review_dedupe_stats(self) -> Dict:
+        """공유 리뷰 중복 제거 비율 조회"""
+        rows = await self.execute('''
+            SELECT (SELECT COUNT(*) FROM reviews WHERE menu_hash IS NOT NULL),
+                   (SELECT COUNT(*) FROM review_contents)
+        ''', fetch=True)
+        links, contents = rows[0] if rows else (0, 0)
+        return {
+            "linked_reviews": links,
+            "unique_reviews": contents,
+            "dedupe_ratio": round(1 - contents / links, 4) if links else 0.0
+        }
 
     # 반응 관련 메서드
     async def handle_reaction_all(self, date_str: str) -> Dict[str, Dict[str, int]]:
@@ -175,55 +739,65 @@ class Database:
             return reactions
         return {}
 
-    async def handle_reaction(self, date_str: str, school_code: str, reaction_type: str) -> Dict:
-        """반응 처리"""
-        if reaction_type not in ('like',):
-            logger.warning(f"유효하지 않은 반응 타입: {reaction_type}")
-            return {}
-
-        # 레코드가 없으면 생성
-        await self.execute(
-            'INSERT OR IGNORE INTO reactions (date, school_code, likes) VALUES (?, ?, 0)',
-            (date_str, school_code)
-        )
-
-        # 좋아요 업데이트
-        if reaction_type == 'like':
-            await self.execute(
-                'UPDATE reactions SET likes = likes + 1 WHERE date = ? AND school_code = ?',
-                (date_str, school_code)
-            )
-
-        # 업데이트된 값 조회
+    async def get_likes(self, date_str: str, school_code: str) -> int:
+        """특정 학교의 좋아요 수 조회"""
         result = await self.execute(
             'SELECT likes FROM reactions WHERE date = ? AND school_code = ?',
             (date_str, school_code),
             fetch=True
         )
-        
-        if result:
-            likes = result[0][0]
-            return {"school_code": school_code, "likes": likes}
-        return {}
-
-    # 방문자 관련 메서드
-    async def increment_visits(self, date_str: str) -> int:
-        """방문자 수 증가"""
-        await self.execute(
-            'INSERT INTO visits (date, count) VALUES (?, 1) ON CONFLICT(date) DO UPDATE SET count = count + 1',
-            (date_str,)
-        )
-        result = await self.execute('SELECT count FROM visits WHERE date = ?', (date_str,), fetch=True)
         return result[0][0] if result else 0
 
+    async def get_likes_many(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+        """여러 (날짜, 학교 코드)의 좋아요 수 조회 (없는 항목은 0)"""
+        likes = {key: 0 for key in keys}
+        keys = list(likes)
+        # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = await self.execute(
+                'SELECT date, school_code, likes FROM reactions '
+                f'WHERE (date, school_code) IN (VALUES {", ".join(["(?, ?)"] * len(chunk))})',
+                tuple(value for key in chunk for value in key),
+                fetch=True
+            )
+            for date_str, school_code, count in rows:
+                likes[(date_str, school_code)] = count
+        return likes
+
+    async def add_counts(self, visits: Dict[str, int], likes: Dict[Tuple[str, str], int]):
+        """
+        방문자 수, 좋아요 수 증가분을 한 트랜잭션으로 저장
+        :param visits: 날짜별 방문자 수 증가분
+        :param likes: (날짜, 학교 코드)별 좋아요 수 증가분
+        """
+        async with self.transaction():
+            await self.executemany(
+                'INSERT INTO visits (date, count) VALUES (?, ?) '
+                'ON CONFLICT(date) DO UPDATE SET count = count + excluded.count',
+                visits.items()
+            )
+            await self.executemany(
+                'INSERT INTO reactions (date, school_code, likes) VALUES (?, ?, ?) '
+                'ON CONFLICT(date, school_code) DO UPDATE SET likes = likes + excluded.likes',
+                [(date_str, school_code, delta) for (date_str, school_code), delta in likes.items()]
+            )
+            if visits:
+                await self.execute('UPDATE visit_totals SET total = total + ? WHERE id = 1', (sum(visits.values()),))
+            for date_str in visits:
+                self.notify_write('visits', date_str)
+            for date_str in dict.fromkeys(date_str for date_str, _ in likes):
+                self.notify_write('reactions', date_str)
+
+    # 방문자 관련 메서드
     async def get_today_visits(self, date_str: str) -> int:
         """오늘의 방문자 수 조회"""
         result = await self.execute('SELECT count FROM visits WHERE date = ?', (date_str,), fetch=True)
         return result[0][0] if result else 0
 
     async def get_total_visits(self) -> int:
-        """총 방문자 수 조회"""
-        result = await self.execute('SELECT COALESCE(SUM(count), 0) FROM visits', fetch=True)
+        """총 방문자 수 조회 (유지 중인 합계)"""
+        result = await self.execute('SELECT total FROM visit_totals WHERE id = 1', fetch=True)
         return result[0][0] if result else 0
 
     async def __aenter__(self):
@@ -0,0 +1,171 @@
+# http_cache.py
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+try:
+    import brotli  # 선택 사항 (설치된 경우에만 br 압축 사용)
+except ImportError:
+    brotli = None
+
+# 이 크기보다 작은 응답은 압축하지 않음
+MIN_COMPRESS_SIZE = 512
+
+# 미리 압축할 정적 파일 확장자
+COMPRESSIBLE_SUFFIXES = {'.js', '.css', '.html', '.md', '.json', '.svg', '.txt'}
+
+# Cache-Control 값
+NO_CACHE = "no-cache"  # 매번 ETag로 다시 확인
+IMMUTABLE = "public, max-age=31536000, immutable"  # 바뀌지 않는 응답 (지난 날짜, 버전이 붙은 정적 파일)
+
+def supported_encodings() -> Tuple[str, ...]:
+    """서버가 지원하는 압축 방식 (선호 순서)"""
+    return ('br', 'gzip') if brotli else ('gzip',)
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """gzip 또는 br 압축"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=5 if level is None else level)
+    return gzip.compress(data, compresslevel=6 if level is None else level, mtime=0)
+
+def make_etag(body: bytes) -> str:
+    """본문 해시 기반 ETag (본문이 같으면 같은 값)"""
+    return '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Accept-Encoding 헤더에서 사용할 압축 방식 선택 (q=0은 제외)"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in supported_encodings():
+        if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더가 ETag와 일치하는지 확인 (약한 비교)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return etag in tags
+
+class EncodedBody:
+    """
+    응답 본문과 ETag, 압축 결과
+    - 압축 결과는 처음 요청될 때 한 번만 만들어 둡니다.
+    """
+    __slots__ = ('body', 'etag', '_encoded', '_level')
+
+    def __init__(self, body: bytes, level: Optional[int] = None):
+        self.body = body
+        self.etag = make_etag(body)
+        self._encoded: Dict[str, bytes] = {}
+        self._level = level
+
+    def encoded(self, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """압축된 본문과 Content-Encoding (압축하지 않는 경우 원본, None)"""
+        if encoding is None or len(self.body) < MIN_COMPRESS_SIZE:
+            return self.body, None
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compress(self.body, encoding, self._level)
+        return self._encoded[encoding], encoding
+
+def encoded_response(headers: Headers, entry: EncodedBody, media_type: str,
+                     cache_control: str = NO_CACHE) -> Response:
+    """ETag/If-None-Match(304)와 압축을 처리한 응답"""
+    response_headers = {"ETag": entry.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=response_headers)
+    body, encoding = entry.encoded(choose_encoding(headers.get("accept-encoding", "")))
+    if encoding:
+        response_headers["Content-Encoding"] = encoding
+    return Response(body, media_type=media_type, headers=response_headers)
+
+def json_response(request: Request, entry: EncodedBody, cache_control: str = NO_CACHE) -> Response:
+    """직렬화된 JSON 응답 (ETag, 304, gzip/br)"""
+    return encoded_response(request.headers, entry, "application/json", cache_control)
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    미리 압축한 정적 파일 제공
+    - precompress()로 시작할 때 한 번 압축해 두고 Accept-Encoding에 따라 골라서 보냅니다.
+    - ?v=버전이 붙은 요청은 바뀌지 않는 파일로 오래 캐시하고, 그 외에는 ETag로 다시 확인합니다.
+    - 압축하지 않고 보내는 경우(작은 파일, 압축을 받지 않는 클라이언트)는 StaticFiles 기본 응답(Range 요청 지원)을 사용합니다.
+    - 파일이 바뀐 경우(수정 시각 기준) 다시 압축합니다.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._files: Dict[str, Tuple[float, EncodedBody]] = {}
+
+    def precompress(self):
+        """디렉토리의 압축 대상 파일을 모두 미리 압축"""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if Path(path).suffix in COMPRESSIBLE_SUFFIXES:
+                    self._load(path, os.stat(path))
+
+    def _load(self, full_path: str, stat_result: os.stat_result) -> EncodedBody:
+        cached = self._files.get(full_path)
+        if cached and cached[0] == stat_result.st_mtime:
+            return cached[1]
+        entry = EncodedBody(Path(full_path).read_bytes(), level=9)
+        for encoding in supported_encodings():
+            entry.encoded(encoding)
+        self._files[full_path] = (stat_result.st_mtime, entry)
+        return entry
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        full_path = str(full_path)
+        if status_code != 200 or Path(full_path).suffix not in COMPRESSIBLE_SUFFIXES:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        entry = self._load(full_path, stat_result)
+        headers = Headers(scope=scope)
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        cache_control = IMMUTABLE if query.get("v") else NO_CACHE
+        if entry.encoded(choose_encoding(headers.get("accept-encoding", "")))[1] is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+            response.headers["Cache-Control"] = cache_control
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        return encoded_response(headers, entry, media_type, cache_control)
+
+def add_asset_versions(html: str, directories: Dict[str, Path]) -> str:
+    """
+    HTML의 로컬 js/css 경로에 내용 해시 버전(?v=) 추가
+    :param directories: URL 접두어별 실제 디렉토리 (예: {"/js": templates/js})
+    """
+    def versioned(match: re.Match) -> str:
+        attr, url = match.group(1), match.group(2)
+        prefix, _, name = url[1:].partition('/')
+        directory = directories.get('/' + prefix)
+        path = directory / name if directory else None
+        if path is None or not path.is_file():
+            return match.group(0)
+        version = hashlib.blake2b(path.read_bytes(), digest_size=6).hexdigest()
+        return f'{attr}="{url}?v={version}"'
+
+    return re.sub(r'(src|href)="(/[^"?#:]+\.(?:js|css))"', versioned, html)
@@ -0,0 +1,95 @@
+# leader_election.py
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, IO, Optional
+
+try:
+    import fcntl  # Linux, macOS
+except ImportError:
+    fcntl = None
+    import msvcrt  # Windows
+
+logger = logging.getLogger(__name__)
+
+def _lock(file: IO):
+    """파일 잠금 (다른 프로세스가 잡고 있으면 OSError)"""
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+
+def _unlock(file: IO):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+class LeaderElection:
+    """
+    여러 워커 프로세스 중 하나만 백그라운드 작업을 실행하도록 리더 선출
+    - lock_path 파일에 배타적 잠금을 잡은 워커가 리더가 됩니다.
+    - 잠금은 프로세스가 종료되면 운영체제가 풀어 주므로, 남은 워커가 retry_interval마다 다시 시도해서 이어받습니다.
+    - 리더는 종료할 때까지 리더로 남습니다.
+    """
+    def __init__(self, lock_path: str, retry_interval: float = 5.0):
+        self.lock_path = lock_path
+        self.retry_interval = retry_interval
+        self.is_leader = False
+        self._file: Optional[IO] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def try_acquire(self) -> bool:
+        """잠금을 한 번 시도 (이미 리더이면 True)"""
+        if self.is_leader:
+            return True
+        Path(self.lock_path).parent.mkdir(parents=True, exist_ok=True)
+        file = open(self.lock_path, 'a+')
+        try:
+            _lock(file)
+        except OSError:
+            file.close()
+            return False
+        self._file = file
+        self.is_leader = True
+        logger.info(f"백그라운드 작업 리더로 선출되었습니다 (PID: {os.getpid()})")
+        return True
+
+    async def start(self, on_elected: Callable[[], Awaitable[None]]):
+        """리더이면 바로 on_elected 실행, 아니면 리더가 될 때까지 백그라운드에서 다시 시도"""
+        if self.try_acquire():
+            await on_elected()
+        else:
+            self._task = asyncio.create_task(self._retry_loop(on_elected))
+
+    async def close(self):
+        """다시 시도 중지 및 잠금 해제"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._file is not None:
+            try:
+                _unlock(self._file)
+            except OSError:
+                pass
+            self._file.close()
+            self._file = None
+        self.is_leader = False
+
+    async def _retry_loop(self, on_elected: Callable[[], Awaitable[None]]):
+        while True:
+            await asyncio.sleep(self.retry_interval)
+            try:
+                if self.try_acquire():
+                    await on_elected()
+                    return
+            except Exception as e:
+                logger.error(f"리더 선출 중 오류 발생: {e}")
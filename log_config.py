@@ -0,0 +1,111 @@
+# log_config.py
+
+import atexit
+import copy
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 로그 처리기를 직접 바꿀 uvicorn 로거 (uvicorn이 설정한 콘솔 출력 대신 대기열 사용)
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[QueueListener] = None
+
+class RateLimitFilter(logging.Filter):
+    """
+    반복되는 경고/오류 로그 제한
+    - 같은 위치(로거, 파일, 줄)의 경고 이상 로그는 interval초 동안 burst개까지만 남깁니다.
+    - 생략한 개수는 다음에 남기는 로그에 붙입니다.
+    """
+    def __init__(self, interval: float = 60.0, burst: int = 5, level: int = logging.WARNING):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.level = level
+        self._windows: Dict[Tuple[str, str, int], list] = {}  # 위치별 [시작 시각, 남긴 수, 생략한 수]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+            elif window[1] < self.burst:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+        if suppressed:
+            record.msg = f"{record.getMessage()} (같은 로그 {suppressed}건 생략)"
+            record.args = None
+        return True
+
+class _LoopQueueHandler(QueueHandler):
+    """
+    이벤트 루프 스레드에서는 대기열에 넣기만 하는 처리기
+    - 메시지 인자만 지금 값으로 고정하고, 포맷과 예외 추적 정보 변환은 리스너 스레드에서 합니다.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        record = copy.copy(record)
+        record.msg = message
+        record.args = None
+        return record
+
+def _route_uvicorn_loggers():
+    """uvicorn 로거가 자체 콘솔 처리기 대신 루트 로거(대기열)를 사용하도록 설정"""
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+def setup_logging(log_file: Path, level: int = logging.INFO, max_bytes: int = 5 * 1024 * 1024,
+                  backup_count: int = 5, rate_limit_interval: float = 60.0, rate_limit_burst: int = 5,
+                  per_process: bool = False) -> QueueListener:
+    """
+    대기열 기반 로깅 설정
+    - 모든 로거는 대기열에 기록만 넣고, 백그라운드 리스너가 파일(로테이션 포함)과 콘솔에 씁니다.
+    - 여러 번 호출해도 한 번만 설정합니다. (uvicorn이 로깅을 다시 설정한 경우를 위해 uvicorn 로거는 매번 연결)
+    - per_process=True이면 프로세스별 파일(예: app-1234.log)에 씁니다. (여러 워커가 한 파일을 로테이션하지 않도록)
+    """
+    global _listener
+    if _listener is not None:
+        _route_uvicorn_loggers()
+        return _listener
+
+    if per_process:
+        log_file = log_file.with_name(f"{log_file.stem}-{os.getpid()}{log_file.suffix}")
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _LoopQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(rate_limit_interval, rate_limit_burst))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+    _route_uvicorn_loggers()
+
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    # 종료 시 남은 로그를 모두 쓰고 리스너 중지
+    atexit.register(_listener.stop)
+    return _listener
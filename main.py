@@ -1,10 +1,10 @@
 # main.py
 
 import os
+import asyncio
 import uvicorn
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -12,10 +12,19 @@ from database import Database
 from neis_api import NeisService
 from chatgpt_api import GPT_Client_API
 from websocket_manager import ConnectionManager
+from broker import MemoryBroker, SQLiteBroker
+from leader_election import LeaderElection
+from single_flight import SingleFlight
+from review_service import PRIORITY_INTERACTIVE, ReviewService
+from prewarm import PrewarmScheduler
+from counters import CounterStore
+from response_cache import ResponseCache, dump_json
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as metrics_registry, MetricsMiddleware
+from http_cache import IMMUTABLE, NO_CACHE, EncodedBody, PrecompressedStaticFiles, add_asset_versions, encoded_response, json_response
 import json
 import logging
-from logging.handlers import RotatingFileHandler
-from typing import AsyncGenerator
+from log_config import setup_logging
+from typing import AsyncGenerator, Optional
 
 # 환경 변수 로드
 load_dotenv()
@@ -23,6 +32,10 @@ load_dotenv()
 # 기본 설정
 BASE_DIR = Path(__file__).resolve().parent
 
+# 워커 프로세스 수 (2 이상이면 워커 간 메시지 전달에 SQLite 브로커, 워커별 로그 파일 사용)
+# uvicorn --workers / gunicorn으로 직접 띄운 경우를 위해 WEB_CONCURRENCY도 확인
+APP_WORKERS = int(os.getenv('APP_WORKERS') or os.getenv('WEB_CONCURRENCY') or '1')
+
 # 로그 디렉토리 설정
 LOG_DIR = BASE_DIR / "logs"
 LOG_DIR.mkdir(parents=True, exist_ok=True)  # 디렉토리가 없으면 생성
@@ -30,31 +43,47 @@ LOG_DIR.mkdir(parents=True, exist_ok=True)  # 디렉토리가 없으면 생성
 # 로그 파일 경로 설정
 LOG_FILE = LOG_DIR / "app.log"
 
-# 로깅 설정
-logger = logging.getLogger("uvicorn")
-logger.setLevel(logging.INFO)
-
-# 로테이팅 파일 핸들러 설정 (파일 크기 5MB, 최대 5개 파일)
-rotating_handler = RotatingFileHandler(
+# 로깅 설정 (대기열 기반: 이벤트 루프에서는 기록만 넣고 파일 쓰기와 로테이션은 백그라운드 스레드에서 처리)
+setup_logging(
     LOG_FILE,
-    maxBytes=5*1024*1024,  # 5MB
-    backupCount=5,
-    encoding='utf-8'
+    level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO),
+    max_bytes=5*1024*1024,  # 5MB
+    backup_count=5,
+    rate_limit_interval=float(os.getenv('LOG_RATE_LIMIT_INTERVAL', '60')),
+    rate_limit_burst=int(os.getenv('LOG_RATE_LIMIT_BURST', '5')),
+    # 여러 프로세스가 같은 파일을 로테이션하면 충돌하므로 워커별 파일(app-<pid>.log) 사용
+    per_process=APP_WORKERS > 1
 )
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-rotating_handler.setFormatter(formatter)
-logger.addHandler(rotating_handler)
-
-# 콘솔 핸들러 추가 (선택 사항)
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+logger = logging.getLogger("uvicorn")
+logger.setLevel(logging.INFO)
 
 # 데이터베이스 초기화
-db = Database(str(BASE_DIR / "data" / "school_meals.db"))
+db = Database(
+    os.getenv('DB_PATH', str(BASE_DIR / "data" / "school_meals.db")),
+    journal_mode=os.getenv('DB_JOURNAL_MODE', 'WAL'),
+    synchronous=os.getenv('DB_SYNCHRONOUS', 'NORMAL'),
+    cache_size=int(os.getenv('DB_CACHE_SIZE', '-16000')),
+    mmap_size=int(os.getenv('DB_MMAP_SIZE', '134217728')),
+    read_pool_size=int(os.getenv('DB_READ_POOL_SIZE', '4')),
+    slow_query_ms=float(os.getenv('DB_SLOW_QUERY_MS', '200'))
+)
 
 # NEIS 서비스 초기화
-neis_api = NeisService(api_key=os.getenv('NEIS_API_KEY'))
+neis_api = NeisService(
+    api_key=os.getenv('NEIS_API_KEY'),
+    atpt_code=os.getenv('NEIS_ATPT_CODE', 'T10'),
+    max_concurrency=int(os.getenv('NEIS_MAX_CONCURRENCY', '10')),
+    max_retries=int(os.getenv('NEIS_MAX_RETRIES', '3')),
+    bulk=os.getenv('NEIS_BULK_INGEST', '1') == '1',
+    school_refresh_interval=float(os.getenv('SCHOOL_REFRESH_INTERVAL', '86400')),
+    negative_ttl=float(os.getenv('MEAL_NEGATIVE_TTL', '21600')),
+    negative_permanent_days=int(os.getenv('MEAL_NEGATIVE_PERMANENT_DAYS', '7')),
+    # 벤치마크용 가짜 NEIS 서버 등 다른 주소를 사용할 때 지정 (OpenAI는 OPENAI_BASE_URL)
+    base_url=os.getenv('NEIS_BASE_URL', 'https://open.neis.go.kr/hub')
+)
+
+# 급식 조회 중복 요청 합치기 (키: 날짜, 교육청 코드)
+meal_flight = SingleFlight()
 
 # AI 서비스 초기화
 ai_client = GPT_Client_API().create()
@@ -63,34 +92,159 @@ if not ai_client:
     logger.critical("AI 서비스 초기화에 실패했습니다.")
     raise RuntimeError("Failed to initialize AI service")
 
-# WebSocket 매니저 초기화
-ws_manager = ConnectionManager()
+# 방문자 수, 좋아요 수 카운터 (메모리에 모았다가 주기적으로 저장)
+counters = CounterStore(
+    db,
+    flush_interval=float(os.getenv('COUNTER_FLUSH_INTERVAL', '1')),
+    max_pending=int(os.getenv('COUNTER_MAX_PENDING', '1000')),
+    durability=os.getenv('COUNTER_DURABILITY', 'interval')
+)
+
+# 리뷰 생성 서비스 초기화 (워커 수만큼만 OpenAI 동시 요청)
+review_service = ReviewService(
+    ai_client,
+    db,
+    workers=int(os.getenv('REVIEW_WORKERS', '4')),
+    max_pending=int(os.getenv('REVIEW_MAX_PENDING', '1000')),
+    max_streams=int(os.getenv('REVIEW_MAX_STREAMS', '4')),
+    batch_size=int(os.getenv('REVIEW_BATCH_SIZE', '5')),
+    counters=counters
+)
+# 리뷰 생성 응답 대기 시간 (초과 시 202 pending 응답)
+REVIEW_WAIT_TIMEOUT = float(os.getenv('REVIEW_WAIT_TIMEOUT', '0.5'))
+
+# 급식 메뉴 검색 페이지당 최대 결과 수
+SEARCH_MAX_PAGE_SIZE = 100
+
+# 급식/리뷰 사전 준비 스케줄러 초기화
+prewarm = PrewarmScheduler(
+    neis_api,
+    db,
+    review_service,
+    interval=float(os.getenv('PREWARM_INTERVAL', '1800')),
+    review_hours=os.getenv('PREWARM_REVIEW_HOURS', '0-6'),
+    review_concurrency=int(os.getenv('PREWARM_REVIEW_CONCURRENCY', '10')),
+    meal_flight=meal_flight
+)
+
+# 자주 조회하는 API 응답 캐시 (데이터베이스 쓰기 시 무효화)
+response_cache = ResponseCache(
+    max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', '512')),
+    ttl=float(os.getenv('RESPONSE_CACHE_TTL', '60')),
+    # 리뷰 목록에는 좋아요 수와 급식 목록이 포함됨
+    dependencies={'reactions': ('reviews',), 'meals': ('reviews',)}
+)
+db.add_write_listener(response_cache.invalidate)
+
+# 워커 간 메시지 전달 방식 (워커가 2개 이상이면 SQLite 브로커 사용)
+WS_BROKER = os.getenv('WS_BROKER', 'sqlite' if APP_WORKERS > 1 else 'memory')
+
+if WS_BROKER == 'sqlite':
+    broker = SQLiteBroker(
+        db_path=os.getenv('WS_BROKER_PATH', str(BASE_DIR / "data" / "broker.db")),
+        poll_interval=float(os.getenv('WS_BROKER_POLL_INTERVAL', '0.05'))
+    )
+else:
+    broker = MemoryBroker()
+
+# WebSocket 매니저 초기화 (연결별 송신 대기열 크기, 연결 종료 기준 전송 시간)
+ws_manager = ConnectionManager(
+    queue_size=int(os.getenv('WS_QUEUE_SIZE', '100')),
+    send_timeout=float(os.getenv('WS_SEND_TIMEOUT', '10')),
+    flush_interval=float(os.getenv('WS_FLUSH_INTERVAL', '0.15')),
+    broker=broker
+)
+
+if WS_BROKER == 'sqlite':
+    # 다른 워커의 데이터베이스 쓰기도 이 워커의 응답 캐시에서 바로 지워지도록 무효화 알림 전달
+    db.add_write_listener(lambda table, date_str: ws_manager.send_to_workers(
+        {"type": "invalidate", "table": table, "date": date_str}
+    ))
+    ws_manager.add_message_handler("invalidate", lambda message: response_cache.invalidate(message["table"], message["date"]))
+
+def publish_flushed_likes(date_str: str, school_code: str, likes: int):
+    """저장 후 다시 읽은 좋아요 수(모든 워커의 증가분 포함)를 구독자에게 전달"""
+    ws_manager.publish_reaction(f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}", school_code, likes)
+
+counters.add_flush_listener(publish_flushed_likes)
+
+# 백그라운드 작업(학교 목록 갱신, 급식/리뷰 사전 준비)을 실행할 워커 선출 (워커 중 하나만 실행)
+leader = LeaderElection(
+    os.getenv('LEADER_LOCK_PATH', str(BASE_DIR / "data" / "leader.lock")),
+    retry_interval=float(os.getenv('LEADER_RETRY_INTERVAL', '5'))
+)
+
+async def start_background_jobs():
+    """리더 워커에서만 실행하는 백그라운드 작업 시작"""
+    await neis_api.directory.start_refresh(db)
+    if os.getenv('PREWARM_ENABLED', '1') == '1':
+        await prewarm.start()
 
 async def lifespan(app: FastAPI) -> AsyncGenerator:
     """
     Lifespan 이벤트 핸들러
-    - 애플리케이션 시작 시 데이터베이스 초기화
-    - 애플리케이션 종료 시 데이터베이스 연결 종료
+    - 애플리케이션 시작 시 데이터베이스 초기화, 정적 파일 압축, NEIS HTTP 클라이언트 생성, 학교 목록 로드, 카운터 저장, 리뷰 워커, WebSocket update 전송 시작
+    - 리더 워커에서만 학교 목록 갱신과 사전 준비 시작 (리더가 종료되면 다른 워커가 이어받음)
+    - 애플리케이션 종료 시 WebSocket update 전송, 사전 준비 및 리뷰 워커 중지, 남은 카운터 저장, 리더 잠금 해제, 데이터베이스 연결 및 NEIS HTTP 클라이언트 종료
     """
     try:
         # 애플리케이션 시작 시 데이터베이스 초기화
         await db.init_db()
+        for static_files in static_mounts.values():
+            static_files.precompress()
+        load_index_page()
+        is_leader = leader.try_acquire()
+        if not is_leader and isinstance(broker, MemoryBroker):
+            # 다른 워커가 리더 잠금을 잡고 있으면 여러 워커로 실행 중인 것
+            logger.warning(
+                "다른 워커 프로세스가 실행 중이지만 메모리 브로커를 사용합니다. "
+                "워커 간 좋아요/업데이트가 전달되지 않으니 APP_WORKERS 또는 WS_BROKER=sqlite를 설정하세요."
+            )
+        await neis_api.start(db, refresh_schools=is_leader)
+        await counters.start()
+        await review_service.start()
+        await ws_manager.start()
+        await leader.start(start_background_jobs)
         # logger.info("애플리케이션이 시작되었습니다.")
         yield
     finally:
         # 애플리케이션 종료 시 데이터베이스 연결 종료
+        await ws_manager.close()
+        await prewarm.close()
+        await review_service.close()
+        await counters.close()
+        await neis_api.close()
+        await leader.close()
         await db.close()
         # logger.info("애플리케이션이 종료되었습니다.")
 
 # FastAPI 앱 초기화 (Lifespan 이벤트 핸들러 사용)
 app = FastAPI(lifespan=lifespan)
+# 라우트별 요청 처리 시간 기록 (/metrics)
+app.add_middleware(MetricsMiddleware)
 
 # 정적 파일 마운트
-app.mount("/templates", StaticFiles(directory=str(BASE_DIR / "templates")), name="templates")
-app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
-app.mount("/js", StaticFiles(directory=str(BASE_DIR / "templates" / "js")), name="js")
-app.mount("/css", StaticFiles(directory=str(BASE_DIR / "static" / "css")), name="css")
-app.mount("/help", StaticFiles(directory=str(BASE_DIR / "static" / "help")), name="help")
+# 정적 파일 (시작할 때 미리 압축)
+static_mounts = {
+    "/templates": PrecompressedStaticFiles(directory=str(BASE_DIR / "templates")),
+    "/static": PrecompressedStaticFiles(directory=str(BASE_DIR / "static")),
+    "/js": PrecompressedStaticFiles(directory=str(BASE_DIR / "templates" / "js")),
+    "/css": PrecompressedStaticFiles(directory=str(BASE_DIR / "static" / "css")),
+    "/help": PrecompressedStaticFiles(directory=str(BASE_DIR / "static" / "help")),
+}
+for path, static_files in static_mounts.items():
+    app.mount(path, static_files, name=path.strip("/"))
+
+# 메인 페이지 (js/css 경로에 버전을 붙이고 미리 압축)
+index_page: Optional[EncodedBody] = None
+
+def load_index_page() -> EncodedBody:
+    global index_page
+    if index_page is None:
+        html = (BASE_DIR / "templates" / "html" / "index.html").read_text(encoding="utf-8")
+        html = add_asset_versions(html, {"/js": BASE_DIR / "templates" / "js", "/css": BASE_DIR / "static" / "css"})
+        index_page = EncodedBody(html.encode("utf-8"), level=9)
+    return index_page
 
 # WebSocket 엔드포인트 추가
 @app.websocket("/ws")
@@ -107,34 +261,52 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             data = await websocket.receive_text()
             logger.debug(f"클라이언트 {client_id}로부터 받은 데이터: {data}")
-            # 클라이언트로부터의 메시지 처리 로직이 필요한 경우 여기에 추가
+            handle_ws_message(client_id, data)
     except WebSocketDisconnect:
-        await ws_manager.disconnect(client_id)
+        await ws_manager.disconnect(client_id, websocket)
         # logger.info(f"클라이언트 {client_id}의 WebSocket 연결이 종료되었습니다.")
     except Exception as e:
-        await ws_manager.disconnect(client_id)
+        await ws_manager.disconnect(client_id, websocket)
         logger.error(f"WebSocket 연결 중 오류 발생: {e}")
 
+def handle_ws_message(client_id: str, data: str):
+    """
+    클라이언트 메시지 처리
+    - {"type": "subscribe", "date": "YYYY-MM-DD"}: 해당 날짜의 좋아요 수 변경 구독
+    - {"type": "unsubscribe", "date": "YYYY-MM-DD"}: 구독 해제
+    """
+    try:
+        message = json.loads(data)
+        topic = datetime.strptime(message.get("date", ""), "%Y-%m-%d").strftime("%Y-%m-%d")
+    except (ValueError, TypeError, AttributeError):
+        logger.debug(f"처리할 수 없는 WebSocket 메시지: {data}")
+        return
+
+    if message.get("type") == "subscribe":
+        ws_manager.subscribe(client_id, topic)
+    elif message.get("type") == "unsubscribe":
+        ws_manager.unsubscribe(client_id, topic)
+
 # API 라우트
 @app.get("/")
-async def home():
+async def home(request: Request):
     """메인 페이지"""
     today = datetime.now().strftime("%Y%m%d")
     try:
-        count = await db.increment_visits(today)
+        count = await counters.increment_visits(today)
         # logger.info(f"오늘({today})의 방문자 수가 {count}으로 증가되었습니다.")
     except Exception as e:
         logger.error(f"방문자 수 증가 중 오류 발생: {e}")
         raise HTTPException(status_code=500, detail="서버 내부 오류가 발생했습니다.")
     
-    return FileResponse(str(BASE_DIR / "templates" / "html" / "index.html"))
+    return encoded_response(request.headers, load_index_page(), "text/html", NO_CACHE)
 
 @app.get("/api/visits/today")
 async def get_today_visits():
     """오늘의 방문자 수"""
     today = datetime.now().strftime("%Y%m%d")
     try:
-        count = await db.get_today_visits(today)
+        count = await counters.get_visits(today)
         # logger.info(f"오늘({today})의 방문자 수 조회: {count}")
         return {"count": count}
     except Exception as e:
@@ -142,19 +314,14 @@ async def get_today_visits():
         raise HTTPException(status_code=500, detail="서버 내부 오류가 발생했습니다.")
 
 @app.get("/api/meals/{date}")
-async def get_meals(date: str):
-    """급식 정보 조회"""
+async def get_meals(date: str, request: Request):
+    """급식 정보 조회 (지난 날짜의 급식은 바뀌지 않으므로 오래 캐시)"""
     try:
         target_date = datetime.strptime(date, "%Y-%m-%d")
         date_str = target_date.strftime("%Y%m%d")
-
-        meals = await db.get_meals(date_str)
-        if not meals:
-            # logger.info(f"{date_str}의 급식 정보가 데이터베이스에 없으므로 NEIS API를 통해 가져옵니다.")
-            meals = await neis_api.fetch_school_meals(target_date, db)
-        
-        # logger.info(f"{date_str}의 급식 정보 조회 완료. 학교 수: {len(meals)}")
-        return meals
+        entry = await response_cache.get_or_build(('meals', date_str), lambda: load_meals(target_date))
+        past = date_str < datetime.now().strftime("%Y%m%d")
+        return json_response(request, entry, IMMUTABLE if past and entry.body != b"[]" else NO_CACHE)
     except ValueError:
         logger.warning(f"유효하지 않은 날짜 형식 요청: {date}")
         raise HTTPException(status_code=400, detail="유효하지 않은 날짜 형식입니다.")
@@ -162,8 +329,33 @@ async def get_meals(date: str):
         logger.error(f"급식 정보 조회 중 오류 발생: {e}")
         raise HTTPException(status_code=500, detail="서버 내부 오류가 발생했습니다.")
 
+async def load_meals(target_date: datetime) -> list:
+    """저장된 급식 정보 조회 (없으면 NEIS에서 가져와 저장)"""
+    date_str = target_date.strftime("%Y%m%d")
+    meals = await db.get_meals(date_str)
+    if meals or await neis_api.is_no_service_date(date_str, db):
+        # 급식이 없는 날짜(주말, 공휴일, 방학)로 기록된 경우에도 NEIS를 다시 조회하지 않음
+        meal_flight.hit()
+    else:
+        # logger.info(f"{date_str}의 급식 정보가 데이터베이스에 없으므로 NEIS API를 통해 가져옵니다.")
+        # 같은 날짜에 대한 동시 요청은 하나의 NEIS 조회 결과를 공유
+        meals = await meal_flight.do((date_str, neis_api.atpt_code), lambda: fetch_meals(target_date))
+    # logger.info(f"{date_str}의 급식 정보 조회 완료. 학교 수: {len(meals)}")
+    return meals
+
+async def fetch_meals(target_date: datetime) -> list:
+    """
+    NEIS에서 급식 정보를 가져와 저장 (single-flight 안에서 실행)
+    - 저장 여부를 확인한 뒤 직전에 끝난 조회가 이미 저장했을 수 있으므로 다시 확인합니다.
+    """
+    date_str = target_date.strftime("%Y%m%d")
+    meals = await db.get_meals(date_str)
+    if meals or await neis_api.is_no_service_date(date_str, db):
+        return meals
+    return await neis_api.fetch_school_meals(target_date, db)
+
 @app.get("/api/review/{date}/{school_code}")
-async def get_review(date: str, school_code: str):
+async def get_review(date: str, school_code: str, request: Request):
     """리뷰 조회 및 생성"""
     try:
         target_date = datetime.strptime(date, "%Y-%m-%d")
@@ -176,40 +368,19 @@ async def get_review(date: str, school_code: str):
 
             if meal and meal.get('lunch_menu'):
                 try:
-                    review_text, nutri_score, pref_score = await ai_client.generate_menu_review(meal['lunch_menu'])
-                    error_flag = 0
-                    # logger.info(f"리뷰 생성 성공: {date_str}, {school_code}")
-                except Exception as e:
-                    logger.error(f"리뷰 생성 중 오류 발생: {e}")
-                    review_text = "리뷰를 생성하는 중 오류가 발생했습니다."
-                    nutri_score = 0
-                    pref_score = 0
-                    error_flag = 1
-
-                await db.save_review(date_str, school_code, review_text, nutri_score, pref_score, error_flag)
-
-                if error_flag == 0:
-                    review = {
-                        "review": review_text,
-                        "nutri_score": nutri_score,
-                        "pref_score": pref_score,
-                        "reactions": {"likes": 0}
-                    }
-                else:
-                    review = {
-                        "review": review_text,
-                        "nutri_score": 0,
-                        "pref_score": 0,
-                        "nutri_stars": "",
-                        "pref_stars": "",
-                        "reactions": {"likes": 0}
-                    }
+                    review = await review_service.request(date_str, school_code, meal['lunch_menu'], REVIEW_WAIT_TIMEOUT)
+                except asyncio.QueueFull:
+                    logger.warning(f"리뷰 생성 대기열이 가득 찼습니다: {date_str}, {school_code}")
+                    raise HTTPException(status_code=503, detail="리뷰 생성 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+                if review is None:
+                    # 생성 중인 리뷰는 기다리지 않고 나중에 다시 요청하도록 응답
+                    return JSONResponse(status_code=202, content={"status": "pending"}, headers={"Retry-After": "2"})
             else:
                 logger.warning(f"급식 메뉴가 없어서 리뷰를 생성할 수 없습니다: {date_str}, {school_code}")
                 raise HTTPException(status_code=404, detail="리뷰를 생성할 수 없습니다.")
         
         # logger.info(f"{date_str}, {school_code}의 리뷰 조회 완료.")
-        return review
+        return json_response(request, EncodedBody(dump_json(review)))
     except ValueError:
         logger.warning(f"유효하지 않은 날짜 형식 요청: {date}")
         raise HTTPException(status_code=400, detail="유효하지 않은 날짜 형식입니다.")
@@ -219,6 +390,151 @@ async def get_review(date: str, school_code: str):
         logger.error(f"리뷰 조회 중 오류 발생: {e}")
         raise HTTPException(status_code=500, detail="서버 내부 오류가 발생했습니다.")
 
+@app.get("/api/review/{date}/{school_code}/stream")
+async def stream_review(date: str, school_code: str):
+    """리뷰 스트리밍 (Server-Sent Events: delta, scores, review)"""
+    try:
+        target_date = datetime.strptime(date, "%Y-%m-%d")
+        date_str = target_date.strftime("%Y%m%d")
+    except ValueError:
+        logger.warning(f"유효하지 않은 날짜 형식 요청: {date}")
+        raise HTTPException(status_code=400, detail="유효하지 않은 날짜 형식입니다.")
+
+    review = await db.get_review(date_str, school_code)
+    menu = None
+    if not review:
+        meals = await db.get_meals(date_str)
+        meal = next((m for m in meals if m['school_code'] == school_code), None)
+        if not meal or not meal.get('lunch_menu'):
+            logger.warning(f"급식 메뉴가 없어서 리뷰를 생성할 수 없습니다: {date_str}, {school_code}")
+            raise HTTPException(status_code=404, detail="리뷰를 생성할 수 없습니다.")
+        menu = meal['lunch_menu']
+
+    def sse(event: str, data: dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    async def events():
+        if review:
+            yield sse("review", review)
+            return
+        try:
+            async for event, data in review_service.stream(date_str, school_code, menu):
+                yield sse(event, data)
+        except asyncio.QueueFull:
+            logger.warning(f"리뷰 생성 대기열이 가득 찼습니다: {date_str}, {school_code}")
+            yield sse("error", {"detail": "리뷰 생성 요청이 많습니다. 잠시 후 다시 시도해주세요."})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/reviews/{date}")
+async def get_reviews(date: str, request: Request):
+    """특정 날짜의 모든 리뷰 및 반응 수 조회 (리뷰가 없는 학교는 missing으로 반환)"""
+    try:
+        target_date = datetime.strptime(date, "%Y-%m-%d")
+        date_str = target_date.strftime("%Y%m%d")
+        entry = await response_cache.get_or_build(('reviews', date_str), lambda: load_reviews(date_str))
+        # logger.info(f"{date_str}의 리뷰 목록 조회 완료.")
+        return json_response(request, entry)
+    except ValueError:
+        logger.warning(f"유효하지 않은 날짜 형식 요청: {date}")
+        raise HTTPException(status_code=400, detail="유효하지 않은 날짜 형식입니다.")
+    except Exception as e:
+        logger.error(f"리뷰 목록 조회 중 오류 발생: {e}")
+        raise HTTPException(status_code=500, detail="서버 내부 오류가 발생했습니다.")
+
+@app.post("/api/reviews/{date}/generate")
+async def generate_reviews(date: str, request: Request):
+    """
+    리뷰가 없는 학교의 리뷰 생성 요청 (기다리지 않고 202 응답, 결과는 /api/reviews로 확인)
+    - 요청 본문의 school_codes에 있는 학교만 생성합니다 (없으면 리뷰가 없는 모든 학교).
+    """
+    try:
+        target_date = datetime.strptime(date, "%Y-%m-%d")
+        date_str = target_date.strftime("%Y%m%d")
+    except ValueError:
+        logger.warning(f"유효하지 않은 날짜 형식 요청: {date}")
+        raise HTTPException(status_code=400, detail="유효하지 않은 날짜 형식입니다.")
+
+    try:
+        body = await request.json()
+    except ValueError:
+        body = {}
+    school_codes = body.get("school_codes") if isinstance(body, dict) else None
+
+    try:
+        meals = await db.get_meals_without_review(date_str)
+        if school_codes is not None:
+            wanted = set(school_codes)
+            meals = [meal for meal in meals if meal['school_code'] in wanted]
+        submitted = 0
+        for meal in meals:
+            try:
+                review_service.submit(date_str, meal['school_code'], meal['lunch_menu'], PRIORITY_INTERACTIVE)
+            except asyncio.QueueFull:
+                logger.warning(f"리뷰 생성 대기열이 가득 찼습니다: {date_str}, {meal['school_code']}")
+                break
+            submitted += 1
+        return JSONResponse(status_code=202, content={"pending": submitted}, headers={"Retry-After": "2"})
+    except Exception as e:
+        logger.error(f"리뷰 일괄 생성 요청 중 오류 발생: {e}")
+        raise HTTPException(status_code=500, detail="서버 내부 오류가 발생했습니다.")
+
+async def load_reviews(date_str: str) -> dict:
+    """리뷰 목록 조회 (저장되지 않은 좋아요 증가분 포함)"""
+    result = await db.get_reviews(date_str)
+    counters.overlay_likes(date_str, result["reactions"])
+    for school_code, review in result["reviews"].items():
+        review["reactions"] = result["reactions"][school_code]
+    # logger.info(f"{date_str}의 리뷰 {len(result['reviews'])}건 조회 완료. 없는 리뷰: {len(result['missing'])}건")
+    return result
+
+@app.get("/api/bootstrap/{date}")
+async def get_bootstrap(date: str, request: Request):
+    """
+    첫 화면에 필요한 데이터를 한 번에 조회
+    - 날짜 범위, 방문자 수, 급식 정보, 리뷰(점수 포함), 좋아요 수
+    - 캐시된 응답 본문을 그대로 이어 붙이고, 캐시에 없는 항목은 동시에 조회합니다.
+    """
+    try:
+        target_date = datetime.strptime(date, "%Y-%m-%d")
+        date_str = target_date.strftime("%Y%m%d")
+        now = datetime.now()
+        today = now.strftime("%Y%m%d")
+
+        async def build_dates():
+            return date_window(now)
+
+        meals_key = ('meals', date_str)
+        if response_cache.get(meals_key) is None:
+            # 급식 정보를 처음 가져오는 경우 리뷰 목록보다 먼저 저장
+            await response_cache.get_or_build(meals_key, lambda: load_meals(target_date))
+
+        dates, meals, reviews, today_visits, total_visits = await asyncio.gather(
+            response_cache.get_or_build(('dates', today), build_dates),
+            response_cache.get_or_build(meals_key, lambda: load_meals(target_date)),
+            response_cache.get_or_build(('reviews', date_str), lambda: load_reviews(date_str)),
+            counters.get_visits(today),
+            counters.get_total_visits()
+        )
+        body = b''.join([
+            b'{"dates":', dates.body,
+            b',"visits":', dump_json({"today": today_visits, "total": total_visits}),
+            b',"meals":', meals.body,
+            b',"reviews":', reviews.body,
+            b'}'
+        ])
+        return json_response(request, EncodedBody(body))
+    except ValueError:
+        logger.warning(f"유효하지 않은 날짜 형식 요청: {date}")
+        raise HTTPException(status_code=400, detail="유효하지 않은 날짜 형식입니다.")
+    except Exception as e:
+        logger.error(f"첫 화면 데이터 조회 중 오류 발생: {e}")
+        raise HTTPException(status_code=500, detail="서버 내부 오류가 발생했습니다.")
+
 @app.post("/api/reaction/{date}/{school_code}/{reaction_type}")
 async def handle_reaction(date: str, school_code: str, reaction_type: str):
     """반응 처리"""
@@ -230,19 +546,13 @@ async def handle_reaction(date: str, school_code: str, reaction_type: str):
         target_date = datetime.strptime(date, "%Y-%m-%d")
         date_str = target_date.strftime("%Y%m%d")
 
-        result = await db.handle_reaction(date_str, school_code, reaction_type)
-        
-        if result:
-            # 반응이 성공적으로 처리된 경우, 모든 클라이언트에게 업데이트 브로드캐스트
-            message = json.dumps({
-                "type": "reaction",
-                "school_code": school_code,
-                "likes": result.get("likes", 0)
-            })
-            await ws_manager.broadcast(message)
-            # logger.info(f"반응 처리 및 브로드캐스트 완료: {message}")
-        else:
-            logger.warning(f"반응 처리 실패: {date_str}, {school_code}, {reaction_type}")
+        # 좋아요 수는 메모리에서 바로 증가하고 주기적으로 저장
+        likes = await counters.increment_like(date_str, school_code)
+        result = {"school_code": school_code, "likes": likes}
+
+        # 다음 update 메시지로 해당 날짜를 보고 있는 클라이언트에게 전달
+        ws_manager.publish_reaction(target_date.strftime("%Y-%m-%d"), school_code, likes)
+        # logger.info(f"반응 처리 완료: {result}")
 
         return result
 
@@ -256,14 +566,17 @@ async def handle_reaction(date: str, school_code: str, reaction_type: str):
         raise HTTPException(status_code=500, detail="서버 내부 오류가 발생했습니다.")
 
 @app.get("/api/reactions/{date}")
-async def get_all_reactions(date: str):
+async def get_all_reactions(date: str, request: Request):
     """모든 학교의 반응 수 가져오기"""
     try:
         target_date = datetime.strptime(date, "%Y-%m-%d")
         date_str = target_date.strftime("%Y%m%d")
-        result = await db.handle_reaction_all(date_str)
+        entry = await response_cache.get_or_build(
+            ('reactions', date_str),
+            lambda: load_reactions(date_str)
+        )
         # logger.info(f"{date_str}의 모든 학교 반응 수 조회 완료.")
-        return result
+        return json_response(request, entry)
     except ValueError:
         logger.warning(f"유효하지 않은 날짜 형식 요청: {date}")
         raise HTTPException(status_code=400, detail="유효하지 않은 날짜 형식입니다.")
@@ -271,36 +584,130 @@ async def get_all_reactions(date: str):
         logger.error(f"모든 반응 수 조회 중 오류 발생: {e}")
         raise HTTPException(status_code=500, detail="서버 내부 오류가 발생했습니다.")
 
+async def load_reactions(date_str: str) -> dict:
+    """저장된 반응 수에 저장되지 않은 좋아요 증가분을 더해서 조회"""
+    return counters.overlay_likes(date_str, await db.handle_reaction_all(date_str))
+
 @app.get("/api/visits/total")
-async def get_total_visits():
+async def get_total_visits(request: Request):
     """총 방문자 수 조회"""
     try:
-        count = await db.get_total_visits()
-        # logger.info(f"총 방문자 수 조회 완료: {count}")
-        return {"count": count}
+        entry = await response_cache.get_or_build(('visits', None), load_total_visits)
+        # logger.info(f"총 방문자 수 조회 완료")
+        return json_response(request, entry)
     except Exception as e:
         logger.error(f"총 방문자 수 조회 중 오류 발생: {e}")
         raise HTTPException(status_code=500, detail="서버 내부 오류가 발생했습니다.")
 
+async def load_total_visits() -> dict:
+    return {"count": await counters.get_total_visits()}
+
+def date_window(today: datetime) -> dict:
+    """오늘 기준 전후 3일 날짜 범위"""
+    dates = [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(-3, 4)]
+    return {"dates": dates, "selected_date": today.strftime("%Y-%m-%d")}
+
 @app.get("/api/dates")
-async def get_dates():
-    """날짜 범위 조회"""
+async def get_dates(request: Request):
+    """날짜 범위 조회 (날짜가 바뀔 때까지 캐시)"""
     try:
         today = datetime.now()
-        dates = [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(-3, 4)]
-        selected_date = today.strftime("%Y-%m-%d")
-        # logger.info(f"날짜 범위 조회 완료: {dates}, 선택된 날짜: {selected_date}")
-        return {"dates": dates, "selected_date": selected_date}
+
+        async def build():
+            return date_window(today)
+
+        entry = await response_cache.get_or_build(('dates', today.strftime("%Y%m%d")), build)
+        # logger.info(f"날짜 범위 조회 완료")
+        return json_response(request, entry)
     except Exception as e:
         logger.error(f"날짜 범위 조회 중 오류 발생: {e}")
         raise HTTPException(status_code=500, detail="서버 내부 오류가 발생했습니다.")
 
+@app.get("/api/search")
+async def search_meals(request: Request, q: Optional[str] = None, school: Optional[str] = None,
+                       start: Optional[str] = None, end: Optional[str] = None,
+                       page: int = 1, page_size: int = 20):
+    """
+    급식 메뉴 검색 (최근 날짜순)
+    - q: 메뉴 검색어 (예: 돈까스, 김밥), school: 학교 코드 또는 학교명 일부
+    - 두 글자 이상인 단어는 검색 색인으로 찾고, 한 글자 단어는 전체 급식 정보를 훑으므로 느릴 수 있습니다.
+    - start, end: 날짜 범위 (YYYY-MM-DD, 포함), page, page_size: 페이지 (page_size 최대 100)
+    """
+    if page < 1 or not 1 <= page_size <= SEARCH_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail="유효하지 않은 페이지 요청입니다.")
+    if not (q and q.strip()) and not (school and school.strip()) and not (start or end):
+        raise HTTPException(status_code=400, detail="검색어, 학교 또는 날짜 범위를 지정해주세요.")
+    try:
+        start_str = datetime.strptime(start, "%Y-%m-%d").strftime("%Y%m%d") if start else None
+        end_str = datetime.strptime(end, "%Y-%m-%d").strftime("%Y%m%d") if end else None
+    except ValueError:
+        logger.warning(f"유효하지 않은 날짜 형식 요청: {start}, {end}")
+        raise HTTPException(status_code=400, detail="유효하지 않은 날짜 형식입니다.")
+
+    try:
+        # 다음 페이지가 있는지 확인하기 위해 한 건 더 조회
+        rows = await db.search_meals(
+            dish=q, school=school.strip() if school else None, start_date=start_str, end_date=end_str,
+            limit=page_size + 1, offset=(page - 1) * page_size
+        )
+        results = [
+            {**row, "date": datetime.strptime(row["date"], "%Y%m%d").strftime("%Y-%m-%d")}
+            for row in rows[:page_size]
+        ]
+        body = {"results": results, "page": page, "page_size": page_size, "has_more": len(rows) > page_size}
+        return json_response(request, EncodedBody(dump_json(body)))
+    except Exception as e:
+        logger.error(f"급식 메뉴 검색 중 오류 발생: {e}")
+        raise HTTPException(status_code=500, detail="서버 내부 오류가 발생했습니다.")
+
+@app.get("/api/schools")
+async def get_schools():
+    """학교 목록 조회 (캐시)"""
+    return {
+        "schools": neis_api.directory.schools,
+        "updated_at": neis_api.directory.updated_at.isoformat() if neis_api.directory.updated_at else None
+    }
+
+@app.get("/api/stats/meals")
+async def get_meal_stats():
+    """급식 조회 캐시 통계 (hit / miss / coalesced)"""
+    return meal_flight.stats()
+
+@app.get("/api/stats/reviews")
+async def get_review_stats():
+    """리뷰 재사용(중복 제거) 통계"""
+    return await review_service.stats()
+
+@app.get("/api/stats/cache")
+async def get_cache_stats():
+    """API 응답 캐시 통계"""
+    return response_cache.stats()
+
+@app.get("/api/stats/counters")
+async def get_counter_stats():
+    """방문자 수, 좋아요 수 카운터 저장 통계"""
+    return counters.stats()
+
+@app.get("/api/stats/ws")
+async def get_ws_stats():
+    """WebSocket 연결 및 송신 대기열 통계"""
+    return ws_manager.stats()
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus 형식 지표 (요청 처리 시간, 쿼리 시간, 외부 API 호출, WebSocket, 워커별 값)"""
+    return Response(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 if __name__ == "__main__":
     # 환경 변수에서 HOST와 PORT 가져오기 (기본값 설정)
     import socket                      # 네트워크 기능
     hostname = socket.gethostname()
     HOST = socket.gethostbyname(hostname)
     PORT = 8080
-    
-    # uvicorn 서버 실행 (자동 재시작 활성화)
-    uvicorn.run("main:app", host=HOST, port=PORT, reload=True)
+
+    if APP_WORKERS > 1:
+        # 운영 모드: 여러 워커 프로세스 실행 (자동 재시작 비활성화)
+        uvicorn.run("main:app", host=HOST, port=PORT, workers=APP_WORKERS)
+    else:
+        # uvicorn 서버 실행 (자동 재시작 활성화)
+        uvicorn.run("main:app", host=HOST, port=PORT, reload=os.getenv('APP_RELOAD', '1') == '1')
@@ -0,0 +1,283 @@
+# metrics.py
+
+import abc
+import bisect
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# 기본 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Metric(abc.ABC):
+    """
+    지표 기본 클래스
+    - labelnames에 있는 라벨을 키워드 인자로 받아 라벨 값별로 따로 기록합니다.
+    - 만들면 registry(기본: 모듈 전역 registry)에 등록됩니다.
+    """
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional['MetricsRegistry'] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} 라벨이 맞지 않습니다: {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abc.abstractmethod
+    def samples(self) -> Iterator[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """(이름, 라벨 이름, 라벨 값, 값) 목록"""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labelnames, labelvalues, value in self.samples():
+            lines.append(f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    """증가만 하는 값 (요청 수, 오류 수)"""
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        if not self.labelnames:
+            self._values[()] = 0.0
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self.labelnames, key, value
+
+class Gauge(Metric):
+    """현재 값 (연결 수 등), set_function으로 조회 시점에 값을 읽을 수도 있음"""
+    kind = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        if not self.labelnames:
+            self._values[()] = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]):
+        """라벨이 없는 지표의 값을 조회할 때마다 function으로 읽음"""
+        self._function = function
+
+    def samples(self):
+        if self._function is not None:
+            yield self.name, (), (), float(self._function())
+            return
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self.labelnames, key, value
+
+class Histogram(Metric):
+    """값의 분포 (소요 시간), 구간별 누적 개수와 합계, 개수"""
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], list] = {}  # 라벨 값별 [구간별 개수, 합계, 개수]
+        if not self.labelnames:
+            self._values[()] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """블록 실행 시간 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()]
+        bucket_labels = self.labelnames + ('le',)
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", bucket_labels, key + (_format_value(bound),), cumulative
+            yield f"{self.name}_sum", self.labelnames, key, total
+            yield f"{self.name}_count", self.labelnames, key, count
+
+class MetricsRegistry:
+    """지표 목록 (Prometheus 텍스트 형식으로 출력)"""
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"이미 등록된 지표입니다: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+# HTTP 요청
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'HTTP 요청 처리 시간 (라우트별)', ('method', 'route', 'status'))
+HTTP_REQUESTS_IN_PROGRESS = Gauge('http_requests_in_progress', '처리 중인 HTTP 요청 수')
+
+# 데이터베이스
+DB_QUERY_DURATION = Histogram('db_query_duration_seconds', '데이터베이스 쿼리 실행 시간 (쿼리 종류별)', ('query',))
+DB_QUERY_ERRORS = Counter('db_query_errors_total', '데이터베이스 쿼리 오류 수', ('query',))
+DB_SLOW_QUERIES = Counter('db_slow_queries_total', '기준 시간을 넘긴 데이터베이스 쿼리 수', ('query',))
+
+# 외부 API (NEIS, OpenAI)
+EXTERNAL_CALL_DURATION = Histogram(
+    'external_call_duration_seconds', '외부 API 호출 시간', ('service', 'operation'))
+EXTERNAL_CALL_ERRORS = Counter(
+    'external_call_errors_total', '외부 API 호출 오류 수', ('service', 'operation', 'error'))
+
+# WebSocket
+WS_CONNECTIONS = Gauge('websocket_connections', '이 워커의 WebSocket 연결 수')
+WS_BROADCAST_DURATION = Histogram(
+    'websocket_broadcast_duration_seconds', 'update 메시지를 모든 구독자의 송신 대기열에 넣는 시간')
+WS_SEND_DURATION = Histogram('websocket_send_duration_seconds', 'WebSocket 메시지 한 건 전송 시간')
+WS_DROPPED_MESSAGES = Counter('websocket_dropped_messages_total', '송신 대기열이 가득 차서 버린 메시지 수')
+
+@contextmanager
+def track_call(service: str, operation: str) -> Iterator[None]:
+    """외부 API 호출 시간과 오류 기록 (예외는 그대로 다시 발생, 취소는 오류로 세지 않음)"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        EXTERNAL_CALL_ERRORS.inc(service=service, operation=operation, error=type(e).__name__)
+        raise
+    finally:
+        EXTERNAL_CALL_DURATION.observe(time.perf_counter() - start, service=service, operation=operation)
+
+@lru_cache(maxsize=256)
+def query_label(query: str) -> str:
+    """쿼리 종류 라벨 (예: 'SELECT meals', 'INSERT OR REPLACE reviews')"""
+    statement = query.strip().split(None, 1)
+    if not statement:
+        return 'unknown'
+    verb = statement[0].upper()
+    if verb == 'INSERT':
+        match = re.match(r'\s*(INSERT(?:\s+OR\s+\w+)?)\s+INTO\s+([\w.]+)', query, re.I)
+        return f"{' '.join(match.group(1).upper().split())} {match.group(2)}" if match else verb
+    patterns = {
+        'SELECT': r'\bFROM\s+([\w.]+)',
+        'WITH': r'\bFROM\s+([\w.]+)',
+        'UPDATE': r'^\s*UPDATE\s+([\w.]+)',
+        'DELETE': r'\bFROM\s+([\w.]+)',
+        'REPLACE': r'\bINTO\s+([\w.]+)',
+    }
+    pattern = patterns.get(verb)
+    match = re.search(pattern, query, re.I) if pattern else None
+    return f"{verb} {match.group(1)}" if match else verb
+
+class MetricsMiddleware:
+    """
+    HTTP 요청 처리 시간 기록 (ASGI 미들웨어)
+    - 라우트는 경로 템플릿(예: /api/meals/{date})으로 기록해서 날짜마다 따로 늘어나지 않게 합니다.
+    - 정적 파일은 마운트 경로(예: /js)로 기록합니다.
+    - 시간은 응답 본문을 모두 보낼 때까지 잽니다 (스트리밍 응답 포함).
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=self._route_label(scope),
+                status=status
+            )
+
+    @staticmethod
+    def _route_label(scope: Scope) -> str:
+        route = scope.get("route")
+        if route is not None and getattr(route, "path", None):
+            return route.path
+        mount = scope.get("root_path", "")[len(scope.get("app_root_path", "")):]
+        return mount or "unmatched"
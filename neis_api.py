@@ -1,69 +1,172 @@
 import os
 import asyncio
+import logging
+import random
 import httpx
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 from fastapi import HTTPException
+from school_directory import SchoolDirectory
+from metrics import track_call
+
+logger = logging.getLogger(__name__)
+
+# 재시도할 HTTP 상태 코드 (요청 과다, 서버 오류)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
 
 class NeisAPI:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_concurrency: int = 10, max_retries: int = 3, timeout: float = 10.0,
+                 base_url: str = "https://open.neis.go.kr/hub"):
         self.api_key = api_key
-        self.base_url = "https://open.neis.go.kr/hub"
-        
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.client: Optional[httpx.AsyncClient] = None
+        # 동시에 진행되는 NEIS 요청 수 제한
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def open(self):
+        """연결을 재사용하는 HTTP 클라이언트 생성"""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=60
+                )
+            )
+
+    async def close(self):
+        """HTTP 클라이언트 종료"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def _request(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        NEIS API 요청 (동시 요청 수 제한 + 일시적 오류 재시도)
+        :param path: API 경로 (예: 'schoolInfo')
+        :param params: 쿼리 파라미터 (KEY, Type 제외)
+        :return: 응답 JSON
+        """
+        if self.client is None:
+            await self.open()
+
+        params = {'KEY': self.api_key, 'Type': 'json', **params}
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    # 호출 시간과 오류는 시도마다 기록 (재시도 대기 시간 제외)
+                    with track_call('neis', path):
+                        response = await self.client.get(f"{self.base_url}/{path}", params=params)
+                        if response.status_code in RETRY_STATUS_CODES:
+                            raise httpx.HTTPStatusError(
+                                f"NEIS 응답 오류: {response.status_code}",
+                                request=response.request,
+                                response=response
+                            )
+                        return response.json()
+            except (httpx.TransportError, httpx.HTTPStatusError):
+                if attempt >= self.max_retries:
+                    raise
+                # 지수 백오프 + 지터 (최대 5초)
+                await asyncio.sleep(random.uniform(0, min(5.0, 0.25 * 2 ** attempt)))
+
     async def get_schools(self, atpt_code: str = 'T10', school_type: str = '고등학교') -> List[Dict[str, Any]]:
         """학교 목록 조회"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/schoolInfo",
-                    params={
-                        'KEY': self.api_key,
-                        'Type': 'json',
-                        'pIndex': '1',
-                        'pSize': '1000',
-                        'ATPT_OFCDC_SC_CODE': atpt_code,
-                        'SCHUL_KND_SC_NM': school_type
-                    }
+        try:
+            data = await self._request('schoolInfo', {
+                'pIndex': '1',
+                'pSize': '1000',
+                'ATPT_OFCDC_SC_CODE': atpt_code,
+                'SCHUL_KND_SC_NM': school_type
+            })
+
+            if 'schoolInfo' in data:
+                schools = data['schoolInfo'][1]['row']
+                return sorted(
+                    schools,
+                    key=lambda x: self._normalize_school_name(x['SCHUL_NM'])
                 )
-                
-                data = response.json()
-                if 'schoolInfo' in data:
-                    schools = data['schoolInfo'][1]['row']
-                    return sorted(
-                        schools,
-                        key=lambda x: self._normalize_school_name(x['SCHUL_NM'])
-                    )
-                return []
-                
-            except Exception as e:
-                print(f"Error fetching schools: {str(e)}")
-                return []
-                
+            return []
+
+        except Exception as e:
+            logger.error(f"Error fetching schools: {str(e)}")
+            return []
+
     async def get_meal(self, school_code: str, date: str, atpt_code: str = 'T10') -> Optional[str]:
-        """급식 정보 조회"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/mealServiceDietInfo",
-                    params={
-                        'KEY': self.api_key,
-                        'Type': 'json',
-                        'pIndex': '1',
-                        'pSize': '100',
-                        'ATPT_OFCDC_SC_CODE': atpt_code,
-                        'SD_SCHUL_CODE': school_code,
-                        'MLSV_YMD': date
-                    }
-                )
-                
-                data = response.json()
-                if 'mealServiceDietInfo' in data:
-                    menu = data['mealServiceDietInfo'][1]['row'][0]['DDISH_NM']
-                    return self._process_menu(menu)
-                return None
-                
-            except Exception as e:
-                print(f"Error fetching meal for school {school_code}: {str(e)}")
-                return None
+        """
+        급식 정보 조회
+        :return: 메뉴 문자열 (급식이 없으면 None, 조회 실패 시 예외 발생)
+        """
+        data = await self._request('mealServiceDietInfo', {
+            'pIndex': '1',
+            'pSize': '100',
+            'ATPT_OFCDC_SC_CODE': atpt_code,
+            'SD_SCHUL_CODE': school_code,
+            'MLSV_YMD': date
+        })
+
+        if 'mealServiceDietInfo' in data:
+            menu = data['mealServiceDietInfo'][1]['row'][0]['DDISH_NM']
+            return self._process_menu(menu)
+        self._check_result(data)
+        return None
+
+    def _check_result(self, data: Dict[str, Any]):
+        """NEIS 결과 코드 확인 (INFO-200: 데이터 없음, 그 외 코드는 오류)"""
+        result = data.get('RESULT', {})
+        if result.get('CODE', 'INFO-200') != 'INFO-200':
+            raise Exception(f"NEIS error {result.get('CODE')}: {result.get('MESSAGE')}")
+
+    async def iter_office_meals(self, from_ymd: str, to_ymd: str, atpt_code: str = 'T10',
+                                page_size: int = 1000) -> AsyncIterator[List[Dict[str, str]]]:
+        """
+        교육청 전체 학교의 급식 정보를 페이지 단위로 조회
+        :param from_ymd: 시작 날짜 (YYYYMMDD)
+        :param to_ymd: 종료 날짜 (YYYYMMDD)
+        :param atpt_code: 시도교육청 코드
+        :param page_size: 페이지당 행 수 (NEIS 최대 1000)
+        :return: 페이지별 급식 목록 (date, school_code, school_name, menu)
+        """
+        page = 1
+        fetched = 0
+        while True:
+            data = await self._request('mealServiceDietInfo', {
+                'pIndex': str(page),
+                'pSize': str(page_size),
+                'ATPT_OFCDC_SC_CODE': atpt_code,
+                'MLSV_FROM_YMD': from_ymd,
+                'MLSV_TO_YMD': to_ymd
+            })
+
+            # 데이터가 없으면 'mealServiceDietInfo' 대신 RESULT만 반환됨
+            if 'mealServiceDietInfo' not in data:
+                self._check_result(data)
+                return
+
+            head, body = data['mealServiceDietInfo'][0]['head'], data['mealServiceDietInfo'][1]
+            total = int(head[0]['list_total_count'])
+            rows = body.get('row', [])
+            if not rows:
+                return
+
+            yield [
+                {
+                    "date": row['MLSV_YMD'],
+                    "school_code": row['SD_SCHUL_CODE'],
+                    "school_name": self._normalize_school_name(row['SCHUL_NM']),
+                    "menu": self._process_menu(row['DDISH_NM'])
+                }
+                for row in rows
+            ]
+
+            fetched += len(rows)
+            if fetched >= total:
+                return
+            page += 1
 
     def _normalize_school_name(self, name: str) -> str:
         """학교명 정규화"""
@@ -79,14 +182,42 @@ class NeisAPI:
     def validate_api_key(self) -> bool:
         """API 키 유효성 검증"""
         if not self.api_key:
-            print("NEIS API key is not set")
+            logger.warning("NEIS API key is not set")
             return False
         return True
 
 class NeisService:
-    def __init__(self, api_key: str):
-        self.api = NeisAPI(api_key)
-        
+    def __init__(self, api_key: str, atpt_code: str = 'T10', max_concurrency: int = 10, max_retries: int = 3,
+                 bulk: bool = True, school_refresh_interval: float = 86400,
+                 negative_ttl: float = 21600, negative_permanent_days: int = 7,
+                 base_url: str = "https://open.neis.go.kr/hub"):
+        self.api = NeisAPI(api_key, max_concurrency=max_concurrency, max_retries=max_retries, base_url=base_url)
+        self.atpt_code = atpt_code  # 시도교육청 코드
+        self.bulk = bulk  # 교육청 단위 일괄 조회 사용 여부
+        self.negative_ttl = negative_ttl  # 급식 없음 기록 유효 시간 (초)
+        self.negative_permanent_days = negative_permanent_days  # 이 일수보다 지난 날짜의 급식 없음은 영구 기록
+        # 학교 목록 캐시 (요청 처리 중에는 NEIS에 학교 목록을 요청하지 않음)
+        self.directory = SchoolDirectory(self.api, atpt_code, refresh_interval=school_refresh_interval)
+
+    async def start(self, db, refresh_schools: bool = True):
+        """NEIS HTTP 클라이언트 및 학교 목록 캐시 시작 (refresh_schools=False이면 저장된 학교 목록만 다시 읽음)"""
+        await self.api.open()
+        await self.directory.start(db, refresh_schools)
+
+    async def close(self):
+        """학교 목록 갱신 중지 및 NEIS HTTP 클라이언트 종료"""
+        await self.directory.close()
+        await self.api.close()
+
+    def _is_permanent_negative(self, date_str: str) -> bool:
+        """충분히 지난 날짜인지 확인 (급식 없음을 영구 기록)"""
+        cutoff = datetime.now() - timedelta(days=self.negative_permanent_days)
+        return date_str < cutoff.strftime("%Y%m%d")
+
+    async def is_no_service_date(self, date_str: str, db) -> bool:
+        """급식이 없는 날짜로 기록되어 있는지 확인"""
+        return await db.is_no_service_date(date_str, self.atpt_code, self.negative_ttl)
+
     async def fetch_school_meals(self, target_date, db) -> List[Dict[str, Any]]:
         """학교 급식 정보 조회 및 업데이트"""
         try:
@@ -95,37 +226,103 @@ class NeisService:
 
             date_str = target_date.strftime("%Y%m%d")
             
-            # 학교 목록 조회
-            schools = await self.api.get_schools()
+            # 학교 목록 조회 (캐시)
+            schools = self.directory.schools
             if not schools:
-                raise Exception("Failed to fetch school list")
+                raise Exception("School directory is empty")
 
-            # 각 학교의 급식 정보 조회
-            tasks = []
-            for school in schools:
-                tasks.append(self._fetch_and_save_meal(school, date_str, db))
+            if self.bulk:
+                try:
+                    await self.ingest_office_meals(db, target_date, target_date, schools)
+                    return await db.get_meals(date_str)
+                except Exception as e:
+                    logger.warning(f"Error in bulk meal ingestion, falling back to per-school requests: {str(e)}")
 
-            await asyncio.gather(*tasks)
+            # 각 학교의 급식 정보 조회 (동시 요청 수는 NeisAPI에서 제한)
+            # 급식 없음 기록이 유효한 학교는 다시 조회하지 않음
+            negatives = await db.get_meal_negatives(date_str, self.negative_ttl)
+            targets = [school for school in schools if school['school_code'] not in negatives]
+            results = await asyncio.gather(*(self._fetch_meal(school, date_str) for school in targets))
+
+            # 조회 결과를 한 트랜잭션으로 저장
+            rows, new_negatives = [], []
+            for school, (success, menu) in zip(targets, results):
+                if menu is None:
+                    menu = "급식 정보 없음"
+                    if success:
+                        new_negatives.append((date_str, school['school_code']))
+                rows.append((date_str, school['school_code'], school['school_name'], menu))
+            async with db.transaction():
+                await db.save_meals(rows)
+                await db.save_meal_negatives(new_negatives, self._is_permanent_negative(date_str))
 
             # 저장된 급식 정보 반환
-            return await db.get_meals(date_str)
+            meals = await db.get_meals(date_str)
+            if not meals and all(success for success, _ in results):
+                await db.mark_no_service_date(date_str, self.atpt_code, self._is_permanent_negative(date_str))
+            return meals
 
         except Exception as e:
-            print(f"Error in fetch_school_meals: {str(e)}")
+            logger.error(f"Error in fetch_school_meals: {str(e)}")
             raise HTTPException(status_code=500, detail="급식 정보를 가져오는데 실패했습니다.")
 
-    async def _fetch_and_save_meal(self, school: Dict[str, Any], date_str: str, db) -> None:
-        """개별 학교 급식 정보 조회 및 저장"""
+    async def ingest_office_meals(self, db, start_date: datetime, end_date: datetime,
+                                  schools: Optional[List[Dict[str, str]]] = None) -> int:
+        """
+        교육청 단위 급식 정보 일괄 수집 및 저장
+        - 기간(MLSV_FROM_YMD ~ MLSV_TO_YMD) 전체를 페이지 단위로 받아 페이지마다 한 번에 저장합니다.
+        - 급식 정보가 없는 학교/날짜는 '급식 정보 없음'으로 한 트랜잭션에 저장합니다.
+        :return: 저장된 급식 수
+        """
+        if schools is None:
+            schools = self.directory.schools
+            if not schools:
+                raise Exception("School directory is empty")
+
+        # 조회 대상 학교 (교육청 전체 결과에서 대상 학교만 저장)
+        school_names = {school['school_code']: school['school_name'] for school in schools}
+
+        saved = set()
+        meal_dates = set()
+        async for rows in self.api.iter_office_meals(
+            start_date.strftime("%Y%m%d"), end_date.strftime("%Y%m%d"), self.atpt_code
+        ):
+            batch = []
+            for row in rows:
+                key = (row['date'], row['school_code'])
+                # 하루에 여러 끼니가 있는 경우 학교별 조회와 같이 첫 번째 행만 사용
+                if row['school_code'] not in school_names or key in saved:
+                    continue
+                batch.append((row['date'], row['school_code'], school_names[row['school_code']], row['menu']))
+                saved.add(key)
+                meal_dates.add(row['date'])
+            await db.save_meals(batch)
+
+        # 급식 정보가 없는 학교/날짜 기록 (학교별 + 날짜 전체)
+        async with db.transaction():
+            day = start_date
+            while day.date() <= end_date.date():
+                date_str = day.strftime("%Y%m%d")
+                permanent = self._is_permanent_negative(date_str)
+                missing = [(date_str, school_code) for school_code in school_names if (date_str, school_code) not in saved]
+                await db.save_meals([(date_str, school_code, school_names[school_code], "급식 정보 없음")
+                                     for _, school_code in missing])
+                await db.save_meal_negatives(missing, permanent)
+                if date_str not in meal_dates:
+                    await db.mark_no_service_date(date_str, self.atpt_code, permanent)
+                day += timedelta(days=1)
+
+        return len(saved)
+
+    async def _fetch_meal(self, school: Dict[str, str], date_str: str) -> Tuple[bool, Optional[str]]:
+        """
+        개별 학교 급식 정보 조회 (저장은 호출한 쪽에서 한 번에)
+        :return: (조회 성공 여부, 메뉴) - 급식이 없거나 실패한 경우 메뉴는 None
+                 실패한 경우 급식 없음으로 기록하지 않음
+        """
         try:
-            school_name = self.api._normalize_school_name(school['SCHUL_NM'])
-            school_code = school['SD_SCHUL_CODE']
-            
-            menu = await self.api.get_meal(school_code, date_str)
-            if menu is None:
-                menu = "급식 정보 없음"
-                
-            await db.save_meal(date_str, school_code, school_name, menu)
-            
+            menu = await self.api.get_meal(school['school_code'], date_str, self.atpt_code)
+            return True, menu
         except Exception as e:
-            print(f"Error processing meal for {school_name}: {str(e)}")
-            await db.save_meal(date_str, school_code, school_name, "급식 정보 없음")
\ No newline at end of file
+            logger.error(f"Error processing meal for {school['school_name']}: {str(e)}")
+            return False, None
\ No newline at end of file
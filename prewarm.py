@@ -0,0 +1,131 @@
+# prewarm.py
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from review_service import PRIORITY_PREWARM
+from single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+class PrewarmScheduler:
+    """
+    급식/리뷰 사전 준비 스케줄러
+    - 주기적으로 오늘 기준 전후 window_days일의 급식 정보를 미리 수집합니다.
+    - 한산한 시간대(review_hours, 끝 시각은 포함하지 않음)에는 없는 AI 리뷰를 미리 생성합니다.
+    - 급식 수집은 사용자 요청과 같은 meal_flight를 거쳐 같은 날짜를 동시에 두 번 조회하지 않습니다.
+    - 사용자 요청은 대부분 저장된 데이터만 읽도록 합니다.
+    """
+    def __init__(self, neis_service, db, review_service, interval: float = 1800, window_days: int = 3,
+                 review_hours: str = '0-6', review_concurrency: int = 10,
+                 meal_flight: Optional[SingleFlight] = None):
+        self.neis_service = neis_service
+        self.db = db
+        self.review_service = review_service
+        self.interval = interval
+        self.window_days = window_days
+        self.review_hours = self._parse_hours(review_hours)
+        self.review_concurrency = review_concurrency
+        self.meal_flight = meal_flight or SingleFlight()  # 키: (날짜, 교육청 코드)
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _parse_hours(value: str) -> Tuple[int, int]:
+        """'시작-끝' 형식의 시간대 파싱 (예: '0-6'은 0시부터 6시 전까지, '22-5')"""
+        start, end = value.split('-')
+        return int(start), int(end)
+
+    def is_off_peak(self, now: datetime) -> bool:
+        """리뷰 사전 생성 시간대인지 확인 (끝 시각은 포함하지 않음, 자정을 넘는 범위 지원)"""
+        start, end = self.review_hours
+        if start <= end:
+            return start <= now.hour < end
+        return now.hour >= start or now.hour < end
+
+    def window(self, now: datetime) -> List[datetime]:
+        """사전 준비 대상 날짜 (/api/dates와 같은 범위)"""
+        today = datetime(now.year, now.month, now.day)
+        return [today + timedelta(days=i) for i in range(-self.window_days, self.window_days + 1)]
+
+    async def start(self):
+        """백그라운드 실행 시작"""
+        self._task = asyncio.create_task(self._run_loop())
+
+    async def close(self):
+        """백그라운드 실행 중지"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"사전 준비 중 오류 발생: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self):
+        """한 번 실행 (급식 수집 후 한산한 시간대이면 리뷰 생성)"""
+        now = datetime.now()
+        await self.warm_meals(now)
+        if self.is_off_peak(now):
+            await self.warm_reviews(now)
+
+    async def warm_meals(self, now: datetime):
+        """저장되지 않은 날짜의 급식 정보 수집"""
+        missing = []
+        for day in self.window(now):
+            date_str = day.strftime("%Y%m%d")
+            if await self.db.get_meals(date_str) or await self.neis_service.is_no_service_date(date_str, self.db):
+                continue
+            missing.append(day)
+
+        if not missing:
+            return
+
+        atpt_code = self.neis_service.atpt_code
+        if self.neis_service.bulk:
+            # 빠진 날짜 범위를 한 번에 수집 (수집 중인 날짜의 사용자 요청은 이 결과를 기다림)
+            keys = [(day.strftime("%Y%m%d"), atpt_code) for day in missing]
+            await self.meal_flight.do_many(keys, self._ingest_range)
+        else:
+            for day in missing:
+                await self.meal_flight.do(
+                    (day.strftime("%Y%m%d"), atpt_code),
+                    lambda day=day: self.neis_service.fetch_school_meals(day, self.db)
+                )
+        # logger.info(f"급식 사전 수집 완료: {len(missing)}일")
+
+    async def _ingest_range(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], list]:
+        """(날짜, 교육청 코드) 목록의 기간을 한 번에 수집하고 날짜별 급식 정보 반환"""
+        dates = sorted(date_str for date_str, _ in keys)
+        await self.neis_service.ingest_office_meals(
+            self.db, datetime.strptime(dates[0], "%Y%m%d"), datetime.strptime(dates[-1], "%Y%m%d")
+        )
+        return {key: await self.db.get_meals(key[0]) for key in keys}
+
+    async def warm_reviews(self, now: datetime):
+        """
+        리뷰가 없는 급식에 대해 리뷰 생성
+        - 동시에 등록하는 작업 수를 제한하고, 리뷰 서비스가 여러 메뉴를 묶어 생성합니다.
+        """
+        semaphore = asyncio.Semaphore(self.review_concurrency)
+
+        async def generate(date_str: str, meal: dict):
+            async with semaphore:
+                await self.review_service.generate(date_str, meal['school_code'], meal['lunch_menu'], PRIORITY_PREWARM)
+
+        tasks = []
+        for day in self.window(now):
+            date_str = day.strftime("%Y%m%d")
+            for meal in await self.db.get_meals_without_review(date_str):
+                tasks.append(generate(date_str, meal))
+
+        await asyncio.gather(*tasks)
+        # logger.info(f"리뷰 사전 생성 완료: {len(tasks)}건")
@@ -0,0 +1,91 @@
+# response_cache.py
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from http_cache import EncodedBody
+
+def dump_json(content: Any) -> bytes:
+    """JSONResponse와 같은 형식으로 직렬화"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+class ResponseCache:
+    """
+    직렬화된 JSON 응답 캐시 (ETag, 압축 결과 포함)
+    - 최대 max_entries개를 LRU로 유지하고, ttl초가 지난 항목은 다시 만듭니다.
+    - 키는 (테이블, 날짜) 형식이며, 데이터베이스 쓰기 알림(invalidate)으로 바로 지웁니다.
+    - 만드는 도중에 무효화된 값은 저장하지 않습니다. (무효화 횟수는 만드는 중인 키만 기록)
+    - dependencies: 다른 테이블의 데이터를 포함하는 항목 (예: 리뷰 목록에 포함된 좋아요 수)
+    """
+    def __init__(self, max_entries: int = 512, ttl: float = 60.0, dependencies: Optional[Dict[str, Tuple[str, ...]]] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.dependencies = dependencies or {}
+        self._entries: "OrderedDict[Hashable, Tuple[float, EncodedBody]]" = OrderedDict()
+        self._generations: Dict[Hashable, int] = {}  # 만드는 중인 키별 무효화 횟수
+        self._building: Dict[Hashable, int] = {}  # 키별 만드는 중인 요청 수
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[EncodedBody]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, body = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return body
+
+    def set(self, key: Hashable, body: EncodedBody, ttl: Optional[float] = None):
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_build(self, key: Hashable, build: Callable[[], Awaitable[Any]],
+                           ttl: Optional[float] = None) -> EncodedBody:
+        """캐시된 응답 반환 (없으면 build 결과를 직렬화해서 저장)"""
+        body = self.get(key)
+        if body is not None:
+            self.hits += 1
+            return body
+        self.misses += 1
+        self._building[key] = self._building.get(key, 0) + 1
+        generation = self._generations.get(key, 0)
+        try:
+            body = EncodedBody(dump_json(await build()))
+            if self._generations.get(key, 0) == generation:
+                self.set(key, body, ttl)
+        finally:
+            self._building[key] -= 1
+            if not self._building[key]:
+                del self._building[key]
+                self._generations.pop(key, None)
+        return body
+
+    def invalidate(self, table: str, date_str: Optional[str] = None):
+        """
+        데이터베이스 쓰기 알림 처리
+        - (table, date_str)와 날짜와 관계없는 (table, None) 항목을 지웁니다.
+        - table의 데이터를 포함하는 다른 테이블의 항목도 같이 지웁니다.
+        """
+        tables = (table,) + self.dependencies.get(table, ())
+        for key in {(name, key_date) for name in tables for key_date in (date_str, None)}:
+            if key in self._building:
+                self._generations[key] = self._generations.get(key, 0) + 1
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations
+        }
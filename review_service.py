@@ -0,0 +1,357 @@
+# review_service.py
+
+import asyncio
+import hashlib
+import itertools
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from chatgpt_api import REVIEW_PARSE_FAILED, ReviewStreamParser
+
+logger = logging.getLogger(__name__)
+
+# 작업 우선순위 (숫자가 작을수록 먼저 처리)
+PRIORITY_INTERACTIVE = 0  # 사용자 요청
+PRIORITY_PREWARM = 10  # 백그라운드 사전 생성
+
+def normalize_menu(menu: str) -> str:
+    """
+    메뉴 문자열 정규화 (NeisAPI._process_menu 결과 기준)
+    - 항목별 공백 정리, 빈 항목/중복 제거, 순서 정렬
+    """
+    items = {' '.join(item.split()) for item in menu.split(',')}
+    return ', '.join(sorted(item for item in items if item))
+
+def menu_hash(menu: str) -> str:
+    """정규화된 메뉴의 해시 (같은 메뉴는 같은 리뷰를 공유)"""
+    return hashlib.sha256(normalize_menu(menu).encode('utf-8')).hexdigest()
+
+class _ReviewJob:
+    """메뉴 해시 하나에 대한 리뷰 생성 작업"""
+    def __init__(self, key: str, menu: str, priority: int):
+        self.key = key
+        self.menu = menu
+        self.priority = priority
+        self.targets: Set[Tuple[str, str]] = set()  # 리뷰를 연결할 (날짜, 학교 코드)
+        self.started = False
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+class ReviewService:
+    """
+    AI 리뷰 생성 및 저장
+    - API 요청 처리와 백그라운드 사전 생성에서 같이 사용합니다.
+    - 리뷰는 메뉴 해시 기준으로 저장하고, 학교별 리뷰는 공유 리뷰를 가리킵니다.
+    - 같은 메뉴에 대한 동시 요청은 하나의 작업으로 합칩니다.
+    - 작업은 우선순위 큐에 넣고 정해진 수의 워커가 처리합니다 (사용자 요청 우선).
+    - 사전 생성 작업은 여러 메뉴를 한 번의 AI 요청으로 묶어 처리합니다.
+    - 스트리밍 생성도 워커와 같은 OpenAI 동시 요청 수(workers) 안에서 실행합니다.
+    """
+    def __init__(self, ai_client, db, workers: int = 4, max_pending: int = 1000, max_streams: int = 4,
+                 batch_size: int = 5, counters=None):
+        self.ai_client = ai_client
+        self.db = db
+        self.counters = counters  # 좋아요 수 조회 (저장되지 않은 증가분 포함)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.batch_size = batch_size  # 사전 생성 작업을 한 번의 AI 요청으로 묶는 최대 수
+        # OpenAI 동시 요청 수 (워커와 스트리밍 생성이 같이 사용하므로 합계가 workers를 넘지 않음)
+        self._ai_slots = asyncio.Semaphore(workers)
+        # 스트리밍 생성이 한 번에 차지할 수 있는 최대 수
+        self._stream_slots = asyncio.Semaphore(max_streams)
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._jobs: Dict[str, _ReviewJob] = {}  # 대기/실행 중인 작업 (메뉴 해시 기준)
+        self._tasks: List[asyncio.Task] = []
+        self._seq = itertools.count()
+        self.generated = 0  # AI로 새로 생성한 리뷰 수
+        self.reused = 0  # 같은 메뉴의 리뷰를 재사용한 수
+        self.coalesced = 0  # 진행 중인 작업에 합쳐진 요청 수
+        self.failed = 0  # 생성 실패 수
+
+    async def start(self):
+        """워커 시작"""
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        """워커 중지 (대기 중인 작업은 취소)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self._jobs.values():
+            job.future.cancel()
+        self._jobs.clear()
+
+    def submit(self, date_str: str, school_code: str, menu: str, priority: int = PRIORITY_INTERACTIVE) -> asyncio.Future:
+        """
+        리뷰 생성 작업 등록
+        - 같은 메뉴의 작업이 이미 있으면 합치고, 더 높은 우선순위로 다시 큐에 넣습니다.
+        :return: 리뷰 결과를 담을 Future
+        """
+        key = menu_hash(menu)
+        job = self._jobs.get(key)
+        if job is not None:
+            self.coalesced += 1
+            job.targets.add((date_str, school_code))
+            if priority < job.priority and not job.started:
+                job.priority = priority
+                # 이전 큐 항목은 꺼낼 때 건너뜀
+                self._queue.put_nowait((priority, next(self._seq), key))
+            return job.future
+
+        if len(self._jobs) >= self.max_pending:
+            raise asyncio.QueueFull()
+
+        job = _ReviewJob(key, menu, priority)
+        job.targets.add((date_str, school_code))
+        # 결과를 기다리는 곳이 없어도 예외가 '미확인' 경고로 남지 않도록 조회
+        job.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._jobs[key] = job
+        self._queue.put_nowait((priority, next(self._seq), key))
+        return job.future
+
+    async def generate(self, date_str: str, school_code: str, menu: str, priority: int = PRIORITY_INTERACTIVE) -> Dict:
+        """메뉴 리뷰 생성 후 저장 (완료될 때까지 대기)"""
+        review = await self._reuse(date_str, school_code, menu)
+        if review:
+            return review
+        return await self.submit(date_str, school_code, menu, priority)
+
+    async def request(self, date_str: str, school_code: str, menu: str, wait: float = 0.5) -> Optional[Dict]:
+        """
+        사용자 요청용 리뷰 조회/생성
+        - wait초 안에 끝나지 않으면 None을 반환하고 생성은 백그라운드에서 계속됩니다.
+        """
+        review = await self._reuse(date_str, school_code, menu)
+        if review:
+            return review
+        future = self.submit(date_str, school_code, menu, PRIORITY_INTERACTIVE)
+        try:
+            review = await asyncio.wait_for(asyncio.shield(future), wait)
+        except asyncio.TimeoutError:
+            return None
+        return await self._with_likes(review, date_str, school_code)
+
+    async def stream(self, date_str: str, school_code: str, menu: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        리뷰를 생성되는 대로 전달 (이벤트 이름, 데이터) 형식
+        - delta: 본문 조각, scores: 점수, review: 완성된 리뷰
+        - 같은 메뉴의 리뷰가 이미 있거나 생성 중이면 완성된 리뷰만 전달합니다.
+        - 완료되면 일반 생성과 같이 공유 리뷰로 저장합니다.
+        """
+        review = await self._reuse(date_str, school_code, menu)
+        if review:
+            yield "review", review
+            return
+
+        key = menu_hash(menu)
+        job = self._jobs.get(key)
+        if job is not None:
+            review = await self.submit(date_str, school_code, menu, PRIORITY_INTERACTIVE)
+            yield "review", await self._with_likes(review, date_str, school_code)
+            return
+
+        if len(self._jobs) >= self.max_pending:
+            raise asyncio.QueueFull()
+
+        # 워커가 같은 작업을 처리하지 않도록 실행 중 상태로 등록 (다른 요청은 이 작업에 합쳐짐)
+        job = _ReviewJob(key, menu, PRIORITY_INTERACTIVE)
+        job.targets.add((date_str, school_code))
+        job.started = True
+        job.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._jobs[key] = job
+
+        parser = ReviewStreamParser()
+        scores = (None, None)
+        failed = False
+        try:
+            async with self._stream_slots, self._ai_slots:
+                async for delta in self.ai_client.stream_menu_review(menu):
+                    text = parser.feed(delta)
+                    if text:
+                        yield "delta", {"text": text}
+                    if (parser.nutri_score, parser.pref_score) != scores:
+                        scores = (parser.nutri_score, parser.pref_score)
+                        yield "scores", {"nutri_score": parser.nutri_score, "pref_score": parser.pref_score}
+            review_text, nutri_score, pref_score = parser.finish()
+            if review_text == REVIEW_PARSE_FAILED:
+                raise ValueError("리뷰 응답을 분석하지 못했습니다.")
+        except Exception as e:
+            logger.error(f"리뷰 스트리밍 중 오류 발생: {e}")
+            failed = True
+        except BaseException:
+            # 클라이언트 연결이 끊긴 경우 워커가 이어서 생성하도록 다시 큐에 등록
+            job.started = False
+            self._queue.put_nowait((job.priority, next(self._seq), key))
+            raise
+
+        try:
+            if failed:
+                review = await self._save_failure(job)
+            else:
+                review = await self._save_success(job, review_text, nutri_score, pref_score)
+            job.future.set_result(review)
+        finally:
+            # 저장 중 취소/오류가 나도 작업이 남아 같은 메뉴의 요청이 멈추지 않도록 정리
+            self._jobs.pop(key, None)
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("리뷰 저장이 중단되었습니다."))
+        yield "review", await self._with_likes(review, date_str, school_code)
+
+    async def _reuse(self, date_str: str, school_code: str, menu: str) -> Optional[Dict]:
+        """같은 메뉴의 리뷰가 있으면 학교별 리뷰로 연결"""
+        key = menu_hash(menu)
+        content = await self.db.get_review_content(key)
+        if content:
+            self.reused += 1
+            await self.db.save_review_link(date_str, school_code, key)
+            return await self._with_likes(content, date_str, school_code)
+        return None
+
+    async def _with_likes(self, review: Dict, date_str: str, school_code: str) -> Dict:
+        """
+        학교별 현재 좋아요 수를 넣은 리뷰
+        - 공유 리뷰와 작업 결과는 여러 학교가 같이 쓰므로 likes가 0으로 들어 있습니다.
+        """
+        if self.counters is not None:
+            likes = await self.counters.get_likes(date_str, school_code)
+        else:
+            likes = await self.db.get_likes(date_str, school_code)
+        return {**review, "reactions": {"likes": likes}}
+
+    async def _worker(self):
+        """큐에서 우선순위 순으로 작업을 꺼내 처리 (사전 생성 작업은 묶어서 처리)"""
+        while True:
+            priority, _, key = await self._queue.get()
+            job = self._take(key)
+            if job is None:
+                continue
+            jobs = [job]
+            if priority >= PRIORITY_PREWARM:
+                jobs += self._take_batch(self.batch_size - 1)
+            try:
+                if len(jobs) == 1:
+                    results = [await self._run(job)]
+                else:
+                    results = await self._run_batch(jobs)
+                for job, result in zip(jobs, results):
+                    job.future.set_result(result)
+            except Exception as e:
+                for job in jobs:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+            finally:
+                for job in jobs:
+                    self._jobs.pop(job.key, None)
+
+    def _take(self, key: str) -> Optional[_ReviewJob]:
+        """대기 중인 작업을 실행 상태로 가져오기 (이미 처리 중이거나 끝난 항목은 None)"""
+        job = self._jobs.get(key)
+        if job is None or job.started:
+            return None
+        job.started = True
+        return job
+
+    def _take_batch(self, limit: int) -> List[_ReviewJob]:
+        """큐에 남은 사전 생성 작업을 최대 limit개 가져오기"""
+        jobs = []
+        while len(jobs) < limit and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item[0] < PRIORITY_PREWARM:
+                # 사용자 요청은 다른 워커가 바로 처리하도록 되돌려 놓음
+                self._queue.put_nowait(item)
+                break
+            job = self._take(item[2])
+            if job is not None:
+                jobs.append(job)
+        return jobs
+
+    async def _run(self, job: _ReviewJob) -> Dict:
+        """리뷰 생성 후 작업에 합쳐진 모든 학교에 연결"""
+        content = await self.db.get_review_content(job.key)
+        if content:
+            self.reused += len(job.targets)
+            await self.db.save_review_links(list(job.targets), job.key)
+            return {**content, "reactions": {"likes": 0}}
+
+        try:
+            async with self._ai_slots:
+                review_text, nutri_score, pref_score = await self.ai_client.generate_menu_review(job.menu)
+            # logger.info(f"리뷰 생성 성공: {job.key}")
+        except Exception as e:
+            logger.error(f"리뷰 생성 중 오류 발생: {e}")
+            return await self._save_failure(job)
+
+        if review_text == REVIEW_PARSE_FAILED:
+            # 분석하지 못한 응답은 같은 메뉴의 다른 학교가 재사용하지 않도록 실패로 기록
+            logger.warning(f"리뷰 응답을 분석하지 못했습니다: {job.key}")
+            return await self._save_failure(job)
+        return await self._save_success(job, review_text, nutri_score, pref_score)
+
+    async def _run_batch(self, jobs: List[_ReviewJob]) -> List[Dict]:
+        """여러 작업의 리뷰를 한 번의 AI 요청으로 생성"""
+        results: Dict[str, Dict] = {}
+        pending = []
+        for job in jobs:
+            content = await self.db.get_review_content(job.key)
+            if content:
+                self.reused += len(job.targets)
+                await self.db.save_review_links(list(job.targets), job.key)
+                results[job.key] = {**content, "reactions": {"likes": 0}}
+            else:
+                pending.append(job)
+
+        if pending:
+            try:
+                async with self._ai_slots:
+                    reviews = await self.ai_client.generate_menu_reviews([job.menu for job in pending])
+            except Exception as e:
+                logger.error(f"리뷰 일괄 생성 중 오류 발생: {e}")
+                reviews = [None] * len(pending)
+            for job, review in zip(pending, reviews):
+                if review and review[0] != REVIEW_PARSE_FAILED:
+                    results[job.key] = await self._save_success(job, *review)
+                else:
+                    results[job.key] = await self._save_failure(job)
+
+        return [results[job.key] for job in jobs]
+
+    async def _save_success(self, job: _ReviewJob, review_text: str, nutri_score: float, pref_score: float) -> Dict:
+        """공유 리뷰 저장 후 작업에 합쳐진 모든 학교에 연결"""
+        self.generated += 1
+        self.reused += len(job.targets) - 1
+        async with self.db.transaction():
+            await self.db.save_review_content(job.key, normalize_menu(job.menu), review_text, nutri_score, pref_score)
+            await self.db.save_review_links(list(job.targets), job.key)
+        return {
+            "review": review_text,
+            "nutri_score": nutri_score,
+            "pref_score": pref_score,
+            "reactions": {"likes": 0}
+        }
+
+    async def _save_failure(self, job: _ReviewJob) -> Dict:
+        """실패한 경우 학교별로 오류를 기록하고 다음 요청에서 다시 생성"""
+        self.failed += 1
+        review_text = "리뷰를 생성하는 중 오류가 발생했습니다."
+        await self.db.save_reviews([(date_str, school_code, review_text, 0, 0, 1) for date_str, school_code in job.targets])
+        return {
+            "review": review_text,
+            "nutri_score": 0,
+            "pref_score": 0,
+            "nutri_stars": "",
+            "pref_stars": "",
+            "reactions": {"likes": 0}
+        }
+
+    async def stats(self) -> Dict:
+        """리뷰 재사용 및 작업 큐 통계"""
+        total = self.generated + self.reused
+        return {
+            **await self.db.get_review_dedupe_stats(),
+            "generated": self.generated,
+            "reused": self.reused,
+            "reuse_ratio": round(self.reused / total, 4) if total else 0.0,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "pending": sum(1 for job in self._jobs.values() if not job.started),
+            "running": sum(1 for job in self._jobs.values() if job.started)
+        }
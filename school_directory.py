@@ -0,0 +1,139 @@
+# school_directory.py
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class SchoolDirectory:
+    """
+    학교 목록 캐시
+    - 시작 시 schools 테이블에서 목록을 읽어 메모리에 보관합니다.
+    - 백그라운드에서 주기적으로 NEIS schoolInfo를 조회해 갱신합니다.
+    - 여러 워커 중 리더가 아닌 워커는 NEIS를 조회하지 않고 리더가 저장한 목록을 주기적으로 다시 읽습니다.
+    - 요청 처리 중에는 NEIS에 학교 목록을 요청하지 않습니다.
+    """
+    # 목록이 비어 있을 때 재시도 간격 (초)
+    RETRY_INTERVAL = 60
+    # 리더가 아닌 워커가 목록이 비어 있을 때 다시 읽는 간격 (초)
+    RELOAD_INTERVAL = 5
+    # 처음 실행할 때 리더가 아닌 워커가 리더의 목록 저장을 기다리는 최대 시간 (초)
+    STARTUP_WAIT = 30
+
+    def __init__(self, api, atpt_code: str = 'T10', school_type: str = '고등학교', refresh_interval: float = 86400):
+        self.api = api
+        self.atpt_code = atpt_code
+        self.school_type = school_type
+        self.refresh_interval = refresh_interval
+        self.schools: List[Dict[str, str]] = []
+        self.updated_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.refreshing = False  # NEIS에서 직접 갱신하는지 여부 (리더 워커)
+
+    async def start(self, db, refresh: bool = True):
+        """
+        저장된 목록 로드 후 백그라운드 갱신 시작
+        - refresh=False이면 NEIS를 조회하지 않고 저장된 목록을 다시 읽기만 합니다.
+        """
+        if not await self.load(db):
+            if refresh:
+                # 처음 실행하는 경우에만 시작 시점에 NEIS에서 목록을 가져옴
+                await self.refresh(db)
+            else:
+                await self._wait_for_leader(db)
+        self.refreshing = refresh
+        self._task = asyncio.create_task(self._refresh_loop(db) if refresh else self._reload_loop(db))
+
+    async def start_refresh(self, db):
+        """NEIS 갱신으로 전환 (리더를 이어받은 경우)"""
+        if self.refreshing:
+            return
+        await self.close()
+        self.refreshing = True
+        self._task = asyncio.create_task(self._refresh_loop(db))
+
+    async def load(self, db) -> bool:
+        """저장된 목록 읽기 (다른 워커가 갱신한 경우 True)"""
+        rows = await db.get_schools(self.atpt_code)
+        if not rows:
+            return False
+        updated_at = datetime.fromisoformat(max(row['updated_at'] for row in rows))
+        if self.updated_at and updated_at <= self.updated_at:
+            return False
+        self.schools = [{"school_code": row['school_code'], "school_name": row['school_name']} for row in rows]
+        self.updated_at = updated_at
+        return True
+
+    async def close(self):
+        """백그라운드 갱신 중지"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def refresh(self, db) -> bool:
+        """NEIS에서 학교 목록을 다시 가져와 저장"""
+        schools = await self.api.get_schools(self.atpt_code, self.school_type)
+        if not schools:
+            logger.warning(f"학교 목록 갱신 실패: {self.atpt_code}")
+            return False
+
+        updated_at = datetime.now()
+        self.schools = [
+            {
+                "school_code": school['SD_SCHUL_CODE'],
+                "school_name": self.api._normalize_school_name(school['SCHUL_NM'])
+            }
+            for school in schools
+        ]
+        self.updated_at = updated_at
+        await db.save_schools(self.atpt_code, self.schools, updated_at.isoformat())
+        return True
+
+    async def _refresh_loop(self, db):
+        """주기적 갱신 (목록이 비어 있으면 짧은 간격으로 재시도)"""
+        while True:
+            delay = self.refresh_interval
+            if self.updated_at:
+                elapsed = (datetime.now() - self.updated_at).total_seconds()
+                delay = max(0, self.refresh_interval - elapsed)
+            if not self.schools:
+                delay = self.RETRY_INTERVAL
+            await asyncio.sleep(delay)
+            try:
+                if not await self.refresh(db):
+                    # 실패 시 다음 시도까지 재시도 간격만큼 대기
+                    await asyncio.sleep(self.RETRY_INTERVAL)
+            except Exception as e:
+                logger.error(f"학교 목록 갱신 중 오류 발생: {e}")
+                await asyncio.sleep(self.RETRY_INTERVAL)
+
+    async def _wait_for_leader(self, db):
+        """리더가 NEIS에서 가져온 목록을 저장할 때까지 대기 (최대 STARTUP_WAIT초)"""
+        deadline = asyncio.get_running_loop().time() + self.STARTUP_WAIT
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.5)
+            if await self.load(db):
+                return
+        logger.warning(f"리더 워커가 저장한 학교 목록이 없습니다: {self.atpt_code}")
+
+    async def _reload_loop(self, db):
+        """리더가 저장한 목록 다시 읽기 (리더의 다음 갱신 시각에 맞춰 읽고, 목록이 비어 있으면 짧은 간격으로 재시도)"""
+        while True:
+            delay = self.RELOAD_INTERVAL
+            if self.schools and self.updated_at:
+                elapsed = (datetime.now() - self.updated_at).total_seconds()
+                delay = max(self.RELOAD_INTERVAL, self.refresh_interval - elapsed)
+            await asyncio.sleep(delay)
+            try:
+                if not await self.load(db) and self.schools:
+                    # 리더가 아직 갱신하지 않았으면 재시도 간격만큼 대기
+                    await asyncio.sleep(self.RETRY_INTERVAL)
+            except Exception as e:
+                logger.error(f"학교 목록 다시 읽기 중 오류 발생: {e}")
+                await asyncio.sleep(self.RETRY_INTERVAL)
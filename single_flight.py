@@ -0,0 +1,100 @@
+# single_flight.py
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+class SingleFlight:
+    """
+    같은 키에 대한 동시 요청을 하나의 실행으로 합치는 클래스
+    - 첫 번째 요청(miss)만 실제 작업을 실행합니다.
+    - 실행 중에 들어온 요청(coalesced)은 같은 결과를 기다립니다.
+    - 캐시에서 바로 응답한 경우(hit)는 hit()으로 기록합니다.
+    """
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def hit(self):
+        """캐시 적중 기록"""
+        self.hits += 1
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        키별로 한 번만 fn을 실행하고 결과를 공유
+        :param key: 요청을 구분하는 키 (예: (날짜, 교육청 코드))
+        :param fn: 실제 작업을 수행하는 코루틴 함수
+        :return: fn의 결과 (예외도 모든 대기자에게 전달됨)
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # 대기 중인 요청이 취소되어도 실행 중인 작업은 계속되도록 shield 사용
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.ensure_future(fn())
+        self._inflight[key] = future
+        future.add_done_callback(lambda f: self._finish(key, f))
+        return await asyncio.shield(future)
+
+    async def do_many(self, keys: List[Hashable],
+                      fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]) -> Dict[Hashable, Any]:
+        """
+        여러 키를 한 번의 실행으로 처리하고 키별 결과를 공유 (예: 여러 날짜의 급식 일괄 수집)
+        - 이미 실행 중인 키는 그 결과를 기다리고, 나머지 키만 fn(키 목록)으로 한 번 실행합니다.
+        - 실행 중에 같은 키로 do()를 호출한 요청은 그 키의 결과를 기다립니다.
+        :param fn: 키 목록을 받아 키별 결과 dict를 반환하는 코루틴 함수
+        :return: 키별 결과 (예외는 그 키들의 모든 대기자에게 전달됨)
+        """
+        futures: Dict[Hashable, asyncio.Future] = {}
+        own = []
+        for key in dict.fromkeys(keys):
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                own.append(key)
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[key] = future
+                future.add_done_callback(lambda f, key=key: self._finish(key, f))
+            futures[key] = future
+
+        if own:
+            self.misses += 1
+            run = asyncio.ensure_future(fn(own))
+            run.add_done_callback(lambda f: self._resolve(f, {key: futures[key] for key in own}))
+
+        results = {}
+        for key, future in futures.items():
+            results[key] = await asyncio.shield(future)
+        return results
+
+    @staticmethod
+    def _resolve(run: asyncio.Future, futures: Dict[Hashable, asyncio.Future]):
+        """do_many 실행 결과를 키별 Future에 전달"""
+        for key, future in futures.items():
+            if run.cancelled():
+                future.cancel()
+            elif run.exception() is not None:
+                future.set_exception(run.exception())
+            else:
+                future.set_result(run.result().get(key))
+
+    def _finish(self, key: Hashable, future: asyncio.Future):
+        """작업 완료 시 실행 중 목록에서 제거"""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # 모든 대기자가 취소된 경우에도 예외가 '미확인' 경고로 남지 않도록 조회
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """카운터 조회"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
@@ -8,45 +8,9 @@ $(document).ready(function() {
     $loading = $('.loading');
     $dateButtons = $('#date-buttons');
     likesData = {};
-    // 날짜 버튼 초기화
-    function initializeDateButtons() {
-        const today = new Date();
-        const dates = [];
-
-        for (let i = -3; i <= 3; i++) {
-            const date = new Date(today);
-            date.setDate(today.getDate() + i);
-
-            // 주말(토,일) 제외
-            if (date.getDay() !== 0 && date.getDay() !== 6) {
-                dates.push(date.toISOString().split('T')[0]);
-            }
-        }
-
-        dates.forEach(date => {
-            const button = $('<div>')
-                .addClass('btn btn-outline-secondary date-btn')
-                .attr('data-date', date)
-                .text(new Date(date).toLocaleDateString('ko-KR', {
-                    month: 'long',
-                    day: 'numeric',
-                    weekday: 'short'
-                }));
-
-            if (date === today.toISOString().split('T')[0]) {
-                button.addClass('active');
-            }
-
-            $dateButtons.append(button);
-        });
-
-        fetchMeals(today.toISOString().split('T')[0]);
-    }
-    
 
-    
-    initializeDateButtons();
-    updateVisitCount();
+    // 첫 화면에 필요한 데이터를 한 번에 로드
+    bootstrap(new Date().toISOString().split('T')[0]);
     // 도움말 모달 내용 로드
     $.ajax({
         url: '/help/guide.md',
@@ -69,6 +33,77 @@ $(document).ready(function() {
         }
     });
 });
+// 오늘 기준 전후 3일 (서버에서 받지 못한 경우 사용)
+function localDateWindow() {
+    const today = new Date();
+    const dates = [];
+    for (let i = -3; i <= 3; i++) {
+        const date = new Date(today);
+        date.setDate(today.getDate() + i);
+        dates.push(date.toISOString().split('T')[0]);
+    }
+    return dates;
+}
+
+// 날짜 버튼 초기화
+function initializeDateButtons(dates, selectedDate) {
+    $dateButtons.empty();
+    dates.forEach(date => {
+        // 주말(토,일) 제외
+        const day = new Date(date).getUTCDay();
+        if (day === 0 || day === 6) {
+            return;
+        }
+
+        const button = $('<div>')
+            .addClass('btn btn-outline-secondary date-btn')
+            .attr('data-date', date)
+            .text(new Date(date).toLocaleDateString('ko-KR', {
+                month: 'long',
+                day: 'numeric',
+                weekday: 'short'
+            }));
+
+        if (date === selectedDate) {
+            button.addClass('active');
+        }
+
+        $dateButtons.append(button);
+    });
+}
+
+/**
+ * 첫 화면 로드 (날짜 범위, 방문자 수, 급식, 리뷰, 좋아요 수를 한 번의 요청으로)
+ * @param {string} date - 처음 보여줄 날짜 (YYYY-MM-DD)
+ */
+function bootstrap(date) {
+    $loading.css('display', 'flex');
+    currentDate = date;
+    $mealsContainer.empty();
+
+    if (typeof subscribeDate === 'function') {
+        subscribeDate(date);
+    }
+
+    $.ajax({
+        url: `/api/bootstrap/${date}`,
+        method: 'GET',
+        success: function(data) {
+            initializeDateButtons(data.dates.dates, date);
+            $('#visit-counter').text(data.visits.total);
+            renderMeals(data.meals);
+            applyReviews(date, data.reviews);
+            $loading.fadeOut();
+        },
+        error: function() {
+            // 실패하면 기존처럼 나눠서 요청
+            initializeDateButtons(localDateWindow(), date);
+            updateVisitCount();
+            fetchMeals(date);
+        }
+    });
+}
+
 function updateVisitCount() {
     $.ajax({
         url: '/api/visits/total',
@@ -86,30 +121,19 @@ function fetchMeals(date) {
     currentDate = date;
     $mealsContainer.empty();
 
+    // 이 날짜의 좋아요 수 변경만 실시간으로 받기
+    if (typeof subscribeDate === 'function') {
+        subscribeDate(date);
+    }
+
     $.ajax({
         url: `/api/meals/${date}`,
         method: 'GET',
         success: function(meals) {
-            // 학교명으로 정렬
-            meals.sort((a, b) => a.school_name.localeCompare(b.school_name, 'ko'));
+            renderMeals(meals);
 
-            meals.forEach((meal, index) => {
-                const cardHtml = createBasicCard(meal, index);
-                const $cardCol = $(cardHtml);
-                $mealsContainer.append($cardCol);
-
-                // 초기 좋아요 수를 로컬 데이터에 저장
-                likesData[meal.school_code] = 0; // 초기값 설정 (필요 시 변경)
-
-                // 리뷰 로드
-                loadReview(meal.school_code, date);
-            });
-        
-            
-            setInterval(function() {
-                
-                repositionCards('likes'); 
-            }, 30000);
+            // 날짜의 모든 리뷰를 한 번에 로드
+            loadReviews(date);
         },
         error: function(xhr, status, error) {
             console.error('Error:', error);
@@ -128,76 +152,299 @@ function fetchMeals(date) {
     });
 }
 
-function loadReview(schoolCode, date) {
+function renderMeals(meals) {
+    // 학교명으로 정렬
+    meals.sort((a, b) => a.school_name.localeCompare(b.school_name, 'ko'));
+
+    meals.forEach((meal, index) => {
+        const cardHtml = createBasicCard(meal, index);
+        const $cardCol = $(cardHtml);
+        $mealsContainer.append($cardCol);
+
+        // 초기 좋아요 수를 로컬 데이터에 저장
+        likesData[meal.school_code] = 0; // 초기값 설정 (필요 시 변경)
+    });
+
+    setInterval(function() {
+        
+        repositionCards('likes'); 
+    }, 30000);
+}
+
+// AI Review 아이콘 SVG 문자열
+const aiIconSvg = `
+<svg viewBox="0 0 70 24" xmlns="http://www.w3.org/2000/svg" style="width: 60px; height: 22px; margin-right:0px; vertical-align: -4px;">
+    <rect x="4" y="4" width="62" height="16" rx="3" fill="none" stroke="#4A90E2" stroke-width="1.5"/>
+    <text x="35" y="15.5" font-family="Arial" font-size="10" fill="#4A90E2" text-anchor="middle" font-weight="bold">AI Review</text>
+</svg>`;
+
+function loadReviews(date) {
+    // 날짜의 리뷰와 좋아요 수를 한 번의 요청으로 가져오고, 없는 리뷰만 학교별로 요청
+    $.ajax({
+        url: `/api/reviews/${date}`,
+        method: 'GET',
+        success: function(result) {
+            applyReviews(date, result);
+        },
+        error: function() {
+            // 일괄 조회 실패 시 학교별로 요청
+            $mealsContainer.find('.card').each(function() {
+                loadReview($(this).attr('id').replace('school-', ''), date);
+            });
+        }
+    });
+}
+
+/**
+ * 리뷰 목록 결과 반영 (좋아요 수, 리뷰, 없는 리뷰는 생성 요청)
+ * @param {string} date - 날짜 (YYYY-MM-DD)
+ * @param {Object} result - {reviews, reactions, missing}
+ */
+function applyReviews(date, result) {
+    if (date !== currentDate) return;
+
+    $.each(result.reactions, function(schoolCode, reactions) {
+        likesData[schoolCode] = reactions.likes || 0;
+        update_count_ReactionUI($(`#school-${schoolCode}`), reactions.likes || 0);
+    });
+
+    $.each(result.reviews, function(schoolCode, review) {
+        renderReview(schoolCode, review);
+        $(`#school-${schoolCode}`).find('.review-loading').hide();
+    });
+    if (Object.keys(result.reviews).length > 0) {
+        repositionCards('score');
+    }
+
+    requestMissingReviews(date, result.missing);
+}
+
+// 동시에 여는 리뷰 스트림 수 (나머지는 한 번에 생성 요청 후 목록을 다시 조회)
+const MAX_REVIEW_STREAMS = 3;
+// 리뷰 목록을 다시 조회하는 최대 횟수
+const MAX_REVIEW_POLLS = 30;
+
+/**
+ * 카드가 화면에서 떨어진 거리 (화면에 보이면 0)
+ * @param {string} schoolCode - 학교 코드
+ */
+function cardDistance(schoolCode) {
+    const card = document.getElementById(`school-${schoolCode}`);
+    if (!card) return Infinity;
+    const rect = card.getBoundingClientRect();
+    if (rect.bottom < 0) return -rect.bottom;
+    if (rect.top > window.innerHeight) return rect.top - window.innerHeight;
+    return 0;
+}
+
+/**
+ * 없는 리뷰 요청
+ * - 화면에 보이는 카드부터 MAX_REVIEW_STREAMS개만 생성되는 대로 스트리밍합니다.
+ * - 나머지는 한 번의 요청으로 생성을 맡기고 리뷰 목록을 주기적으로 다시 조회합니다.
+ * @param {string} date - 날짜 (YYYY-MM-DD)
+ * @param {string[]} missing - 리뷰가 없는 학교 코드
+ */
+function requestMissingReviews(date, missing) {
+    if (missing.length === 0) return;
+
+    const streamed = window.EventSource
+        ? missing.slice().sort((a, b) => cardDistance(a) - cardDistance(b)).slice(0, MAX_REVIEW_STREAMS)
+        : [];
+    streamed.forEach(schoolCode => streamReview(schoolCode, date));
+
+    const rest = missing.filter(schoolCode => !streamed.includes(schoolCode));
+    if (rest.length === 0) return;
+
+    $.ajax({
+        url: `/api/reviews/${date}/generate`,
+        method: 'POST',
+        contentType: 'application/json',
+        data: JSON.stringify({school_codes: rest}),
+        success: function(data, status, xhr) {
+            const retryAfter = parseInt(xhr.getResponseHeader('Retry-After')) || 2;
+            pollReviews(date, rest, retryAfter);
+        },
+        error: function() {
+            // 일괄 생성 요청 실패 시 학교별로 요청
+            rest.forEach(schoolCode => loadReview(schoolCode, date));
+        }
+    });
+}
+
+/**
+ * 생성을 맡긴 리뷰가 모두 저장될 때까지 리뷰 목록 다시 조회
+ * @param {string} date - 날짜 (YYYY-MM-DD)
+ * @param {string[]} schoolCodes - 아직 리뷰를 받지 못한 학교 코드
+ * @param {number} retryAfter - 다시 조회할 간격 (초)
+ * @param {number} attempt - 조회 횟수
+ */
+function pollReviews(date, schoolCodes, retryAfter, attempt = 0) {
+    setTimeout(function() {
+        if (date !== currentDate) return;
+        $.ajax({
+            url: `/api/reviews/${date}`,
+            method: 'GET',
+            success: function(result) {
+                if (date !== currentDate) return;
+                const waiting = schoolCodes.filter(schoolCode => {
+                    const review = result.reviews[schoolCode];
+                    if (!review) return true;
+                    renderReview(schoolCode, review);
+                    $(`#school-${schoolCode}`).find('.review-loading').hide();
+                    return false;
+                });
+                if (waiting.length < schoolCodes.length) {
+                    repositionCards('score');
+                }
+                if (waiting.length === 0) return;
+                if (attempt + 1 < MAX_REVIEW_POLLS) {
+                    pollReviews(date, waiting, retryAfter, attempt + 1);
+                } else {
+                    waiting.forEach(schoolCode => {
+                        renderReview(schoolCode, null);
+                        $(`#school-${schoolCode}`).find('.review-loading').hide();
+                    });
+                }
+            },
+            error: function() {
+                // 목록 조회 실패 시 학교별로 요청
+                schoolCodes.forEach(schoolCode => loadReview(schoolCode, date));
+            }
+        });
+    }, retryAfter * 1000);
+}
+
+function renderReview(schoolCode, review) {
     const card = $(`#school-${schoolCode}`);
-    
     const cardCol = card.closest('.card-col');
     const reviewSection = card.find('.review-section');
-    const reviewLoading = card.find('.review-loading');
 
+    if (review) {
+        reviewSection.html(`
+            <div class="review-text">
+                <span class="ai-review-content">
+                    ${aiIconSvg}${review.review}
+                </span>
+            </div>
+        `);
+        
+        card.find('.nutri-score').html(createStars('nutri_score',review.nutri_score));
+        card.find('.pref-score').html(createStars('pref_score',review.pref_score));
+
+        // 총점 계산 및 저장 (리뷰 점수 합산)
+        const totalScore = (review.nutri_score || 0) + (review.pref_score || 0);
+        cardCol.data('totalScore', totalScore);
+
+        // 초기 "좋아요" 수를 로컬 데이터에 저장
+        likesData[schoolCode] = review.reactions.likes || 0;
+
+        // "좋아요" UI 업데이트
+        update_count_ReactionUI(card, review.reactions.likes);
+    } else {
+        reviewSection.html(`
+            <div class="alert alert-warning" role="alert">
+                리뷰가 존재하지 않습니다.
+            </div>
+        `);
+        cardCol.data('totalScore', 0);
+    }
+
+    // 페이지 로드 시 로컬 스토리지 확인 및 버튼 상태 업데이트
+    let likedSchools = JSON.parse(localStorage.getItem('likedSchools')) || [];
+    if (likedSchools.includes(schoolCode)) {
+        card.find('.reaction-btn')
+            .removeClass('text-muted')
+            .addClass('text-primary disabled')
+            .attr('aria-disabled', 'true')
+            .off('click')
+            .css('pointer-events', 'none');
+    }
+}
+
+function streamReview(schoolCode, date) {
+    const card = $(`#school-${schoolCode}`);
+    const reviewSection = card.find('.review-section');
+    const source = new EventSource(`/api/review/${date}/${schoolCode}/stream`);
+    let $content = null;
+    let done = false;
+
+    source.addEventListener('delta', function(event) {
+        if (date !== currentDate) {
+            source.close();
+            return;
+        }
+        const data = JSON.parse(event.data);
+        if (!$content) {
+            // 첫 조각이 도착하면 로딩 표시를 본문으로 교체
+            reviewSection.html(`
+                <div class="review-text">
+                    <span class="ai-review-content">${aiIconSvg}</span>
+                </div>
+            `);
+            $content = reviewSection.find('.ai-review-content');
+        }
+        $content.append(document.createTextNode(data.text));
+    });
+
+    source.addEventListener('scores', function(event) {
+        const data = JSON.parse(event.data);
+        if (data.nutri_score !== null) {
+            card.find('.nutri-score').html(createStars('nutri_score', data.nutri_score));
+        }
+        if (data.pref_score !== null) {
+            card.find('.pref-score').html(createStars('pref_score', data.pref_score));
+        }
+    });
+
+    source.addEventListener('review', function(event) {
+        done = true;
+        source.close();
+        if (date !== currentDate) return;
+        renderReview(schoolCode, JSON.parse(event.data));
+        repositionCards('score');
+    });
+
+    source.onerror = function() {
+        // 스트리밍 실패 시 일반 요청으로 다시 시도
+        source.close();
+        if (!done && date === currentDate) {
+            loadReview(schoolCode, date);
+        }
+    };
+}
 
-    // const aiIconSvg = `
-    // <svg viewBox="0 0 24 24" xmlns="http://www.w3.org/2000/svg" style="width: 20px; height: 22px; margin-right: 0px; vertical-align: -3px;">
-    //     <rect x="4" y="6" width="16" height="12" rx="3" fill="none" stroke="#4A90E2" stroke-width="1.5"/>
-    //     <text x="12" y="15.5" font-family="Arial" font-size="8" fill="#4A90E2" text-anchor="middle" font-weight="bold">AI</text>
-    // </svg>
-    // `;
-    // AI Review 아이콘 SVG 문자열
-    const aiIconSvg = `
-    <svg viewBox="0 0 70 24" xmlns="http://www.w3.org/2000/svg" style="width: 60px; height: 22px; margin-right:0px; vertical-align: -4px;">
-        <rect x="4" y="4" width="62" height="16" rx="3" fill="none" stroke="#4A90E2" stroke-width="1.5"/>
-        <text x="35" y="15.5" font-family="Arial" font-size="10" fill="#4A90E2" text-anchor="middle" font-weight="bold">AI Review</text>
-    </svg>`;
+function loadReview(schoolCode, date, attempt = 0) {
+    const card = $(`#school-${schoolCode}`);
     
+    const cardCol = card.closest('.card-col');
+    const reviewSection = card.find('.review-section');
+    const reviewLoading = card.find('.review-loading');
+    let pending = false;
+
     reviewLoading.show();
     
     $.ajax({
         url: `/api/review/${date}/${schoolCode}`,
         method: 'GET',
-        success: function(review) {
-            const schoolName = $(`#school-${schoolCode}>.card-header`).text();
-            
+        success: function(review, status, xhr) {
+            // 리뷰 생성 중(202)이면 잠시 후 다시 요청 (최대 30회)
+            if (xhr.status === 202 && attempt < 30) {
+                pending = true;
+                const retryAfter = parseInt(xhr.getResponseHeader('Retry-After')) || 2;
+                setTimeout(function() {
+                    if (date === currentDate) {
+                        loadReview(schoolCode, date, attempt + 1);
+                    }
+                }, retryAfter * 1000);
+                return;
+            }
+            if (xhr.status === 202) {
+                review = null;
+            }
+            renderReview(schoolCode, review);
             if (review) {
-                reviewSection.html(`
-                    <div class="review-text">
-                        <span class="ai-review-content">
-                            ${aiIconSvg}${review.review}
-                        </span>
-                    </div>
-                `);
-                
-                card.find('.nutri-score').html(createStars('nutri_score',review.nutri_score));
-                card.find('.pref-score').html(createStars('pref_score',review.pref_score));
-
-                // 총점 계산 및 저장 (리뷰 점수 합산)
-                const totalScore = (review.nutri_score || 0) + (review.pref_score || 0);
-                cardCol.data('totalScore', totalScore);
-
-                // 초기 "좋아요" 수를 로컬 데이터에 저장
-                likesData[schoolCode] = review.reactions.likes || 0;
-
-                // "좋아요" UI 업데이트
-                update_count_ReactionUI(card, review.reactions.likes);
                 // 처음 로드 시 총점 순서 재정렬
                 repositionCards('score');
-            } else {
-                reviewSection.html(`
-                    <div class="alert alert-warning" role="alert">
-                        리뷰가 존재하지 않습니다.
-                    </div>
-                `);
-                cardCol.data('totalScore', 0);
-            }
-
-            // 페이지 로드 시 로컬 스토리지 확인 및 버튼 상태 업데이트
-            let likedSchools = JSON.parse(localStorage.getItem('likedSchools')) || [];
-            if (likedSchools.includes(schoolCode)) {
-                card.find('.reaction-btn')
-                    .removeClass('text-muted')
-                    .addClass('text-primary disabled')
-                    .attr('aria-disabled', 'true')
-                    .off('click')
-                    .css('pointer-events', 'none');
             }
         },
         error: function(xhr, status, error) {
@@ -209,7 +456,9 @@ function loadReview(schoolCode, date) {
             cardCol.data('totalScore', 0);
         },
         complete: function() {
-            reviewLoading.hide();
+            if (!pending) {
+                reviewLoading.hide();
+            }
         }
     });
     
@@ -1,6 +1,7 @@
 // WebSocket.js
 let socket; // WebSocket 객체를 전역 변수로 선언
 let reconnectInterval = 5000; // 초기 재접속 시도 간격 (밀리초)
+let subscribedDate = null; // 좋아요 수 변경을 구독 중인 날짜
 
 $(document).ready(function() {
     // 웹소켓 연결 초기화
@@ -46,6 +47,10 @@ function connectWebSocket() {
         console.log('WebSocket 연결됨');
         // 연결이 성공하면 재접속 간격 초기화
         reconnectInterval = 5000;
+        // 보고 있는 날짜 다시 구독
+        if (subscribedDate) {
+            socket.send(JSON.stringify({ type: 'subscribe', date: subscribedDate }));
+        }
     };
 
     // WebSocket 에러 처리 핸들러
@@ -78,6 +83,23 @@ function connectWebSocket() {
     return socket;
 }
 
+/**
+ * 보고 있는 날짜의 좋아요 수 변경만 받도록 구독 변경
+ * @param {string} date - 구독할 날짜 (YYYY-MM-DD)
+ */
+function subscribeDate(date) {
+    const previous = subscribedDate;
+    subscribedDate = date;
+    if (!socket || socket.readyState !== WebSocket.OPEN) {
+        // 연결되면 onopen에서 구독
+        return;
+    }
+    if (previous && previous !== date) {
+        socket.send(JSON.stringify({ type: 'unsubscribe', date: previous }));
+    }
+    socket.send(JSON.stringify({ type: 'subscribe', date: date }));
+}
+
 function generateUUID() {
     // UUID 생성 (보안 강화된 방식)
     return ([1e7]+-1e3+-4e3+-8e3+-1e11).replace(/[018]/g, function(c) {
@@ -91,14 +113,17 @@ function generateUUID() {
  */
 function handleWebSocketMessage(data) {
     switch(data.type) {
-        case 'connection_count':
-            // 접속자 수 업데이트 UI 처리
-            $('#connection-count').text(data.count);
-            break;
-        case 'reaction':
-            // 좋아요 수 업데이트 UI 처리
-            const card = $(`#school-${data.school_code}`);
-            update_count_ReactionUI(card, data.likes);
+        case 'update':
+            // 일정 시간 동안 모인 접속자 수, 좋아요 수 변경 처리
+            if (data.count !== undefined) {
+                $('#connection-count').text(data.count);
+            }
+            if (data.date && data.date !== currentDate) {
+                break;
+            }
+            $.each(data.likes || {}, function(schoolCode, likes) {
+                update_count_ReactionUI($(`#school-${schoolCode}`), likes);
+            });
             break;
         default:
             console.warn('알 수 없는 메시지 타입:', data.type);
@@ -0,0 +1,47 @@
+# test_chatgpt_api.py
+
+from chatgpt_api import REVIEW_PARSE_FAILED, GPT_Client, ReviewStreamParser
+
+def feed_all(parser: ReviewStreamParser, pieces) -> str:
+    return ''.join(parser.feed(piece) for piece in pieces)
+
+def test_parse_review_splits_text_and_scores():
+    content = "단백질이 풍부합니다.\n\n채소가 조금 부족합니다.\n#NUTRI_RATE:4.5\n#PREF_RATE:7"
+    assert GPT_Client.parse_review(content) == ("단백질이 풍부합니다.\n채소가 조금 부족합니다.", 4.5, 5.0)
+
+def test_parse_review_without_text_is_failure():
+    assert GPT_Client.parse_review("#NUTRI_RATE:4\n#PREF_RATE:4")[0] == REVIEW_PARSE_FAILED
+
+def test_stream_parser_hides_score_lines_split_across_chunks():
+    parser = ReviewStreamParser()
+    text = feed_all(parser, ["균형 잡힌", " 식단입니다.\n#NU", "TRI_RA", "TE:4.0\n#PREF_RATE:", "3.5"])
+    assert text == "균형 잡힌 식단입니다."
+    assert parser.nutri_score == 4.0
+    assert parser.pref_score is None
+    assert parser.finish() == ("균형 잡힌 식단입니다.", 4.0, 3.5)
+    assert parser.pref_score == 3.5
+
+def test_stream_parser_shows_lines_that_only_start_with_hash():
+    parser = ReviewStreamParser()
+    text = feed_all(parser, ["#오늘의", " 추천\n", "두 번째 줄\n"])
+    assert text == "#오늘의 추천\n두 번째 줄"
+    assert parser.finish()[0] == "#오늘의 추천\n두 번째 줄"
+
+def parse_batch(content: str, count: int):
+    return GPT_Client.__new__(GPT_Client)._parse_batch_review(content, count)
+
+def test_batch_review_is_split_by_item_number():
+    content = (
+        "#ITEM:2\n두 번째 리뷰입니다.\n#NUTRI_RATE:3\n#PREF_RATE:4\n#END\n"
+        "#ITEM: 1\n첫 번째 리뷰입니다.\n#NUTRI_RATE:5\n#PREF_RATE:2\n#END"
+    )
+    assert parse_batch(content, 2) == [("첫 번째 리뷰입니다.", 5.0, 2.0), ("두 번째 리뷰입니다.", 3.0, 4.0)]
+
+def test_batch_items_without_scores_text_or_valid_number_are_none():
+    content = (
+        "#ITEM:1\n점수가 없는 리뷰\n#END\n"
+        "#ITEM:2\n#NUTRI_RATE:3\n#PREF_RATE:4\n#END\n"
+        "#ITEM:9\n범위 밖\n#NUTRI_RATE:3\n#PREF_RATE:4\n#END\n"
+        "#ITEM:3\n끝 표시가 없는 리뷰\n#NUTRI_RATE:3\n#PREF_RATE:4"
+    )
+    assert parse_batch(content, 3) == [None, None, None]
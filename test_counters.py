@@ -0,0 +1,87 @@
+# test_counters.py
+
+import asyncio
+
+from counters import DURABILITY_SYNC, CounterStore
+from database import Database
+
+def run(db_path, scenario):
+    async def main():
+        db = Database(db_path)
+        await db.init_db()
+        try:
+            return await scenario(db)
+        finally:
+            await db.close()
+    return asyncio.run(main())
+
+def test_increments_are_saved_on_flush(tmp_path):
+    async def scenario(db):
+        counters = CounterStore(db, flush_interval=60)
+        flushed = []
+        counters.add_flush_listener(lambda *args: flushed.append(args))
+        values = [await counters.increment_like("20261019", "1") for _ in range(3)]
+        await counters.increment_visits("20261019")
+        before = await db.get_likes("20261019", "1")
+        await counters.flush()
+        return values, before, await db.get_likes("20261019", "1"), await db.get_total_visits(), flushed, counters.stats()
+
+    values, before, after, visits, flushed, stats = run(str(tmp_path / "counters.db"), scenario)
+    assert values == [1, 2, 3]
+    assert (before, after, visits) == (0, 3, 1)
+    assert flushed == [("20261019", "1", 3)]
+    assert stats["pending_increments"] == 0 and stats["flushed_increments"] == 4
+
+def test_flush_reports_totals_from_every_worker(tmp_path):
+    async def scenario(db):
+        first, second = CounterStore(db, flush_interval=60), CounterStore(db, flush_interval=60)
+        flushed = []
+        second.add_flush_listener(lambda *args: flushed.append(args))
+        for _ in range(2):
+            await first.increment_like("20261019", "1")
+        await second.increment_like("20261019", "1")
+        await first.flush()
+        await second.flush()
+        stale = await first.get_likes("20261019", "1")
+        await first.flush()  # 저장된 값은 다음 저장 주기에 다시 읽음
+        return flushed, stale, await first.get_likes("20261019", "1")
+
+    flushed, stale, likes = run(str(tmp_path / "counters.db"), scenario)
+    assert flushed == [("20261019", "1", 3)]
+    assert (stale, likes) == (2, 3)
+
+def test_failed_flush_keeps_increments_for_the_next_flush(tmp_path):
+    async def scenario(db):
+        counters = CounterStore(db, flush_interval=60)
+        await counters.increment_like("20261019", "1")
+        add_counts = db.add_counts
+
+        async def failing(*args):
+            raise RuntimeError("disk full")
+
+        db.add_counts = failing
+        try:
+            await counters.flush()
+        except RuntimeError:
+            pass
+        db.add_counts = add_counts
+        pending = await counters.get_likes("20261019", "1")
+        await counters.flush()
+        return pending, await db.get_likes("20261019", "1"), counters.stats()
+
+    pending, saved, stats = run(str(tmp_path / "counters.db"), scenario)
+    assert pending == 1
+    assert saved == 1
+    assert stats["failed_flushes"] == 1 and stats["pending_increments"] == 0
+
+def test_close_and_sync_durability_save_without_waiting(tmp_path):
+    async def scenario(db):
+        interval = CounterStore(db, flush_interval=60)
+        await interval.start()
+        await interval.increment_like("20261019", "1")
+        await interval.close()
+        sync = CounterStore(db, durability=DURABILITY_SYNC)
+        await sync.increment_like("20261019", "2")
+        return await db.get_likes("20261019", "1"), await db.get_likes("20261019", "2")
+
+    assert run(str(tmp_path / "counters.db"), scenario) == (1, 1)
@@ -0,0 +1,75 @@
+# test_database.py
+
+import asyncio
+import sqlite3
+
+from database import Database, bigram_text
+
+MEALS = [
+    ("20261019", "1", "한빛고등학교", "참치김밥, 쇠고기미역국, 배추김치"),
+    ("20261020", "1", "한빛고등학교", "현미밥, 된장국, 돈까스"),
+    ("20261020", "2", "서울중학교", "김밥, 라면, 단무지"),
+]
+
+def search(db_path, **kwargs):
+    async def scenario():
+        db = Database(db_path)
+        await db.init_db()
+        try:
+            await db.save_meals(MEALS)
+            return db.search_index, await db.search_meals(**kwargs)
+        finally:
+            await db.close()
+
+    search_index, rows = asyncio.run(scenario())
+    assert search_index
+    return [(row["date"], row["school_code"]) for row in rows]
+
+def test_bigram_text_lists_pairs_per_word():
+    assert bigram_text("참치김밥, 밥(5.6)") == "참치 치김 김밥"
+
+def test_trigram_search_matches_inside_compound_names(tmp_path):
+    assert search(str(tmp_path / "meals.db"), dish="미역국") == [("20261019", "1")]
+
+def test_two_letter_terms_use_bigram_index(tmp_path):
+    db_path = str(tmp_path / "meals.db")
+    assert search(db_path, dish="김밥") == [("20261020", "2"), ("20261019", "1")]
+    assert search(db_path, dish="김밥 라면") == [("20261020", "2")]
+    assert search(db_path, dish="김밥", school="한빛") == [("20261019", "1")]
+
+def test_one_letter_terms_use_like(tmp_path):
+    assert search(str(tmp_path / "meals.db"), dish="국", school="한빛고") == [("20261020", "1"), ("20261019", "1")]
+
+def test_existing_meals_are_indexed_on_upgrade(tmp_path):
+    db_path = str(tmp_path / "meals.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE meals (date TEXT, school_code TEXT, school_name TEXT, lunch_menu TEXT, "
+                     "PRIMARY KEY (date, school_code))")
+        conn.execute("INSERT INTO meals VALUES ('20261001', '3', '바다초등학교', '비빔밥, 미소국')")
+    assert search(db_path, dish="미소") == [("20261001", "3")]
+
+def test_transaction_rolls_back_and_skips_notifications_on_error(tmp_path):
+    async def scenario():
+        db = Database(str(tmp_path / "meals.db"))
+        await db.init_db()
+        notified = []
+        db.add_write_listener(lambda table, date_str: notified.append((table, date_str)))
+        try:
+            try:
+                async with db.transaction():
+                    await db.save_meals(MEALS[:1])
+                    assert notified == []  # 커밋 전에는 알리지 않음
+                    raise RuntimeError("neis down")
+            except RuntimeError:
+                pass
+            rolled_back = await db.get_meals("20261019"), list(notified)
+            async with db.transaction():
+                await db.save_meals(MEALS[:1])
+            return rolled_back, await db.get_meals("20261019"), notified
+        finally:
+            await db.close()
+
+    (rolled_back_meals, rolled_back_notified), meals, notified = asyncio.run(scenario())
+    assert rolled_back_meals == [] and rolled_back_notified == []
+    assert [meal["school_code"] for meal in meals] == ["1"]
+    assert notified == [("meals", "20261019")]
@@ -0,0 +1,66 @@
+# test_prewarm.py
+
+import asyncio
+from datetime import datetime, timedelta
+
+from prewarm import PrewarmScheduler
+from single_flight import SingleFlight
+
+class FakeNeis:
+    atpt_code = 'T10'
+    bulk = True
+
+    def __init__(self):
+        self.ranges = []
+
+    async def is_no_service_date(self, date_str, db):
+        return False
+
+    async def ingest_office_meals(self, db, start, end):
+        self.ranges.append((start.strftime("%Y%m%d"), end.strftime("%Y%m%d")))
+        await asyncio.sleep(0.01)
+        day = start
+        while day <= end:
+            db.meals[day.strftime("%Y%m%d")] = [{"school_code": "1"}]
+            day += timedelta(days=1)
+
+class FakeDB:
+    def __init__(self):
+        self.meals = {}
+
+    async def get_meals(self, date_str):
+        return self.meals.get(date_str, [])
+
+def at_hour(hour: int) -> datetime:
+    return datetime(2026, 10, 19, hour)
+
+def test_review_hours_end_is_exclusive():
+    scheduler = PrewarmScheduler(None, None, None, review_hours='0-6')
+    assert scheduler.is_off_peak(at_hour(0))
+    assert scheduler.is_off_peak(at_hour(5))
+    assert not scheduler.is_off_peak(at_hour(6))
+
+def test_review_hours_across_midnight():
+    scheduler = PrewarmScheduler(None, None, None, review_hours='22-5')
+    assert scheduler.is_off_peak(at_hour(23))
+    assert scheduler.is_off_peak(at_hour(4))
+    assert not scheduler.is_off_peak(at_hour(5))
+    assert not scheduler.is_off_peak(at_hour(12))
+
+def test_bulk_ingest_is_shared_with_user_requests():
+    async def scenario():
+        neis, db, flight = FakeNeis(), FakeDB(), SingleFlight()
+        scheduler = PrewarmScheduler(neis, db, None, window_days=1, meal_flight=flight)
+        warm = asyncio.create_task(scheduler.warm_meals(at_hour(12)))
+        await asyncio.sleep(0)
+
+        async def fetch():
+            raise AssertionError("사전 수집 중인 날짜를 다시 조회함")
+
+        meals = await flight.do(("20261019", 'T10'), fetch)
+        await warm
+        return neis.ranges, meals
+
+    ranges, meals = asyncio.run(scenario())
+    assert ranges == [("20261018", "20261020")]
+    assert meals == [{"school_code": "1"}]
@@ -0,0 +1,52 @@
+# test_response_cache.py
+
+import asyncio
+
+from response_cache import ResponseCache
+
+def build(value):
+    async def load():
+        return value
+    return load
+
+def test_invalidate_removes_date_and_dependent_entries():
+    async def scenario():
+        cache = ResponseCache(dependencies={'reactions': ('reviews',)})
+        for key in (('reactions', '20261019'), ('reviews', '20261019'), ('reviews', '20261020'), ('visits', None)):
+            await cache.get_or_build(key, build(key[0]))
+        cache.invalidate('reactions', '20261019')
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert cache.get(('reactions', '20261019')) is None
+    assert cache.get(('reviews', '20261019')) is None
+    assert cache.get(('reviews', '20261020')) is not None
+    assert cache.get(('visits', None)) is not None
+    assert cache.invalidations == 2
+
+def test_value_invalidated_while_building_is_not_stored():
+    async def scenario():
+        cache = ResponseCache()
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return {"likes": 1}
+
+        task = asyncio.create_task(cache.get_or_build(('reactions', '20261019'), load))
+        await asyncio.sleep(0)
+        cache.invalidate('reactions', '20261019')
+        release.set()
+        body = await task
+        return cache, body
+
+    cache, body = asyncio.run(scenario())
+    assert body.body == b'{"likes":1}'
+    assert cache.get(('reactions', '20261019')) is None
+    assert cache._generations == {} and cache._building == {}
+
+def test_invalidate_without_builds_keeps_no_generations():
+    cache = ResponseCache()
+    for day in range(100):
+        cache.invalidate('reactions', f"2026{day:04d}")
+    assert cache._generations == {}
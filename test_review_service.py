@@ -0,0 +1,123 @@
+# test_review_service.py
+
+import asyncio
+
+from chatgpt_api import REVIEW_PARSE_FAILED
+from review_service import ReviewService, menu_hash, normalize_menu
+
+class FakeAI:
+    def __init__(self, review):
+        self.review = review
+        self.calls = 0
+
+    async def generate_menu_review(self, menu):
+        self.calls += 1
+        return self.review
+
+class FakeDB:
+    def __init__(self):
+        self.contents = {}
+        self.links = {}
+        self.failures = []
+
+    def transaction(self):
+        return _NullTransaction()
+
+    async def get_review_content(self, key):
+        return self.contents.get(key)
+
+    async def save_review_content(self, key, menu, review_text, nutri_score, pref_score):
+        self.contents[key] = {"review": review_text, "nutri_score": nutri_score, "pref_score": pref_score}
+
+    async def save_review_link(self, date_str, school_code, key):
+        self.links[(date_str, school_code)] = key
+
+    async def save_review_links(self, targets, key):
+        for target in targets:
+            self.links[target] = key
+
+    async def save_reviews(self, rows):
+        self.failures.extend(rows)
+
+    async def get_likes(self, date_str, school_code):
+        return 0
+
+class _NullTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+def run_service(ai, db, calls):
+    async def scenario():
+        service = ReviewService(ai, db, workers=1)
+        await service.start()
+        try:
+            return [await service.generate(*call) for call in calls]
+        finally:
+            await service.close()
+    return asyncio.run(scenario())
+
+def test_normalize_menu_ignores_order_duplicates_and_spacing():
+    assert normalize_menu("국 ,  밥, 국,,김치") == "국, 김치, 밥"
+    assert menu_hash("밥, 국") == menu_hash("국,밥")
+
+def test_generated_review_is_reused_for_same_menu():
+    ai, db = FakeAI(("균형 잡힌 식단입니다.", 4.0, 4.5)), FakeDB()
+    first, second = run_service(ai, db, [("20261019", "1", "밥, 국"), ("20261020", "2", "국, 밥")])
+    assert ai.calls == 1
+    assert first["review"] == second["review"] == "균형 잡힌 식단입니다."
+    assert db.links == {("20261019", "1"): menu_hash("밥, 국"), ("20261020", "2"): menu_hash("밥, 국")}
+
+def test_unparsable_review_is_not_shared():
+    ai, db = FakeAI((REVIEW_PARSE_FAILED, 3.0, 3.0)), FakeDB()
+    run_service(ai, db, [("20261019", "1", "밥, 국"), ("20261020", "2", "밥, 국")])
+    assert db.contents == {}
+    assert ai.calls == 2
+    assert [row[:2] for row in db.failures] == [("20261019", "1"), ("20261020", "2")]
+    assert all(row[5] == 1 for row in db.failures)
+
+class SlowAI:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def _enter(self):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+
+    async def generate_menu_review(self, menu):
+        await self._enter()
+        self.active -= 1
+        return ("리뷰", 4.0, 4.0)
+
+    async def stream_menu_review(self, menu):
+        await self._enter()
+        try:
+            yield "리뷰\n#NUTRI_RATE:4\n#PREF_RATE:4"
+        finally:
+            self.active -= 1
+
+def test_streams_share_the_worker_concurrency_limit():
+    async def scenario():
+        ai = SlowAI()
+        service = ReviewService(ai, FakeDB(), workers=2, max_streams=2)
+        await service.start()
+
+        async def stream(i):
+            return [event async for event in service.stream("20261019", str(i), f"스트림{i}")]
+
+        try:
+            results = await asyncio.gather(
+                *(service.generate("20261019", str(i), f"메뉴{i}") for i in range(4)),
+                *(stream(i) for i in range(4))
+            )
+        finally:
+            await service.close()
+        return ai.peak, results
+
+    peak, results = asyncio.run(scenario())
+    assert peak <= 2
+    assert all(events[-1][0] == "review" for events in results[4:])
@@ -0,0 +1,138 @@
+# test_single_flight.py
+
+import asyncio
+
+import pytest
+
+from single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "meals"
+
+        tasks = [asyncio.create_task(flight.do("key", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert results == ["meals"] * 5
+    assert flight.stats() == {"hits": 0, "misses": 1, "coalesced": 4, "in_flight": 0}
+
+def test_error_is_passed_to_every_waiter():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            raise RuntimeError("neis down")
+
+        tasks = [asyncio.create_task(flight.do("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        return flight, await asyncio.gather(*tasks, return_exceptions=True)
+
+    flight, results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["in_flight"] == 0
+
+def test_key_runs_again_after_completion():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        return await flight.do("key", fetch), await flight.do("key", fetch)
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+def test_cancelled_waiter_does_not_cancel_execution():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "meals"
+
+        first = asyncio.create_task(flight.do("key", fetch))
+        second = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "meals"
+
+def test_do_many_shares_results_with_single_key_waiters():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def ingest(keys):
+            calls.append(keys)
+            await release.wait()
+            return {key: f"meals-{key}" for key in keys}
+
+        bulk = asyncio.create_task(flight.do_many(["a", "b"], ingest))
+        await asyncio.sleep(0)
+
+        async def fetch():
+            calls.append("single")
+            return "unused"
+
+        single = asyncio.create_task(flight.do("b", fetch))
+        await asyncio.sleep(0)
+        release.set()
+        return calls, await bulk, await single, flight.stats()
+
+    calls, bulk, single, stats = asyncio.run(scenario())
+    assert calls == [["a", "b"]]
+    assert bulk == {"a": "meals-a", "b": "meals-b"}
+    assert single == "meals-b"
+    assert stats["in_flight"] == 0
+
+def test_do_many_only_runs_keys_not_in_flight():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "from-single"
+
+        single = asyncio.create_task(flight.do("a", fetch))
+        await asyncio.sleep(0)
+        ran = []
+
+        async def ingest(keys):
+            ran.extend(keys)
+            return {key: "from-bulk" for key in keys}
+
+        bulk = asyncio.create_task(flight.do_many(["a", "b"], ingest))
+        await asyncio.sleep(0)
+        release.set()
+        return ran, await bulk, await single
+
+    ran, bulk, single = asyncio.run(scenario())
+    assert ran == ["b"]
+    assert bulk == {"a": "from-single", "b": "from-bulk"}
+    assert single == "from-single"
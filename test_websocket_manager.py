@@ -0,0 +1,120 @@
+# test_websocket_manager.py
+
+import asyncio
+import json
+
+from broker import MemoryBroker
+from websocket_manager import ConnectionManager
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed = None
+        self.release = asyncio.Event()
+        if not delay:
+            self.release.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        await self.release.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(message))
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed = code
+
+def test_full_queue_drops_oldest_messages():
+    async def scenario():
+        manager = ConnectionManager(queue_size=2)
+        websocket = FakeWebSocket()
+        websocket.release.clear()  # 송신이 막힌 느린 클라이언트
+        await manager.connect(websocket, "slow")
+        await asyncio.sleep(0)
+        client = manager._clients["slow"]
+        for i in range(5):
+            manager._enqueue(client, json.dumps({"n": i}))
+        websocket.release.set()
+        await asyncio.sleep(0.01)
+        stats = manager.stats()
+        await manager.disconnect("slow")
+        return websocket.sent, client.dropped, stats
+
+    sent, dropped, stats = asyncio.run(scenario())
+    assert sent == [{"n": 3}, {"n": 4}]
+    assert dropped == 3
+    assert stats["dropped_messages"] == 3
+
+def test_slow_send_disconnects_client():
+    async def scenario():
+        manager = ConnectionManager(send_timeout=0.01)
+        slow, fast = FakeWebSocket(delay=1.0), FakeWebSocket()
+        await manager.connect(slow, "slow")
+        await manager.connect(fast, "fast")
+        manager._enqueue(manager._clients["slow"], json.dumps({"type": "update"}))
+        await asyncio.sleep(0.05)
+        connected = set(manager.active_connections)
+        stats = manager.stats()
+        await manager.disconnect("fast")
+        return slow.closed, connected, stats
+
+    closed, connected, stats = asyncio.run(scenario())
+    assert closed == 1013
+    assert connected == {"fast"}
+    assert stats["slow_disconnects"] == 1
+
+def test_updates_are_coalesced_and_scoped_to_topic():
+    async def scenario():
+        manager = ConnectionManager()
+        await manager.start()
+        viewer, other = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(viewer, "viewer")
+        await manager.connect(other, "other")
+        manager.subscribe("viewer", "2026-10-19")
+        manager.subscribe("other", "2026-10-20")
+        await manager.flush()
+        for likes in (1, 2, 3):
+            manager.publish_reaction("2026-10-19", "1", likes)
+        await manager.flush()
+        await asyncio.sleep(0.01)
+        await manager.close()
+        return viewer.sent, other.sent
+
+    viewer, other = asyncio.run(scenario())
+    assert viewer[-1] == {"type": "update", "date": "2026-10-19", "likes": {"1": 3}}
+    assert all("likes" not in message for message in other)
+
+class SharedBroker(MemoryBroker):
+    """같은 프로세스 안에서 여러 매니저(워커)에 메시지를 전달하는 브로커"""
+    def __init__(self):
+        super().__init__()
+        self.handlers = []
+
+    async def start(self, handler):
+        self.handlers.append(handler)
+
+    async def publish(self, message):
+        for handler in self.handlers:
+            handler(message)
+
+def test_messages_are_handled_only_by_other_workers():
+    async def scenario():
+        broker = SharedBroker()
+        sender, receiver = ConnectionManager(broker=broker), ConnectionManager(broker=broker)
+        received = {sender: [], receiver: []}
+        for manager in (sender, receiver):
+            await manager.start()
+            manager.add_message_handler("invalidate", received[manager].append)
+        sender.send_to_workers({"type": "invalidate", "table": "reactions", "date": "20261019"})
+        sender.send_to_workers({"type": "invalidate", "table": "reactions", "date": "20261019"})
+        await sender.flush()
+        for manager in (sender, receiver):
+            await manager.close()
+        return received[sender], received[receiver]
+
+    own, other = asyncio.run(scenario())
+    assert own == []
+    assert [(message["table"], message["date"]) for message in other] == [("reactions", "20261019")]
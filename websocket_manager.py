@@ -1,42 +1,357 @@
 from fastapi import WebSocket
-from typing import Dict
+from typing import Dict, List, Optional, Set, Tuple
+from broker import Broker, MemoryBroker, MessageHandler
+from metrics import WS_BROADCAST_DURATION, WS_CONNECTIONS, WS_DROPPED_MESSAGES, WS_SEND_DURATION
+import asyncio
 import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+class _Client:
+    """연결별 송신 대기열과 송신 작업"""
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = 0  # 대기열이 가득 차서 버린 메시지 수
+        self.topics: Set[str] = set()  # 구독 중인 주제 (날짜)
 
 class ConnectionManager:
-    def __init__(self):
+    """
+    WebSocket 연결 관리
+    - 연결마다 크기가 제한된 송신 대기열과 전용 송신 작업을 둡니다.
+    - update 메시지는 대기열에 넣기만 하므로 느린 클라이언트가 다른 클라이언트를 막지 않습니다.
+    - 대기열이 가득 차면 오래된 메시지부터 버리고, 한 번의 전송이 send_timeout을 넘기면 연결을 끊습니다.
+    - 접속자 수와 좋아요 수 변경은 flush_interval 동안 모았다가 한 번의 update 메시지로 보냅니다.
+    - 좋아요 수는 해당 주제(날짜)를 구독한 클라이언트에게만 보냅니다.
+    - 좋아요 수와 워커별 접속자 수는 broker를 거쳐 모든 워커 프로세스에 전달됩니다.
+    - 좋아요 수는 요청마다 브로커에 쓰지 않고 flush_interval 동안 모았다가 한 메시지로 보냅니다.
+    - 좋아요 수는 늦게 도착한 이전 값으로 줄어들지 않도록 지금까지 받은 값보다 클 때만 보냅니다.
+    - send_to_workers로 다른 워커에 보낸 메시지는 add_message_handler로 등록한 함수가 처리합니다. (예: 응답 캐시 무효화)
+    """
+    # 클라이언트당 최대 구독 주제 수
+    MAX_TOPICS = 7
+
+    def __init__(self, queue_size: int = 100, send_timeout: float = 10.0, flush_interval: float = 0.15,
+                 broker: Optional[Broker] = None, heartbeat_interval: float = 20.0):
         self.active_connections: Dict[str, WebSocket] = {}
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.flush_interval = flush_interval
+        self.broker = broker or MemoryBroker()
+        self.worker_id = f"{os.getpid()}-{id(self):x}"
+        self.heartbeat_interval = heartbeat_interval
+        self._worker_counts: Dict[str, Tuple[int, float]] = {}  # 다른 워커의 접속자 수와 받은 시각
+        self._count_dirty = False  # 이 워커의 접속자 수를 다른 워커에 알려야 하는지 여부
+        self._last_heartbeat = 0.0
+        self._clients: Dict[str, _Client] = {}
+        self._topics: Dict[str, Set[str]] = {}  # 주제별 구독 client_id
+        self._count_changed = False  # 다음 전송에 접속자 수를 포함할지 여부
+        self._pending_likes: Dict[str, Dict[str, int]] = {}  # 다음 전송에 포함할 주제별, 학교별 좋아요 수 (최신 값)
+        self._known_likes: Dict[str, Dict[str, int]] = {}  # 구독 중인 주제별, 학교별 지금까지 받은 가장 큰 좋아요 수
+        self._outgoing_likes: Dict[str, Dict[str, int]] = {}  # 다음 전송 때 브로커로 보낼 주제별, 학교별 좋아요 수
+        self._outgoing_messages: List[Dict] = []  # 다음 전송 때 다른 워커로 보낼 메시지
+        self._message_handlers: Dict[str, MessageHandler] = {}  # 메시지 종류별 처리 함수
+        self._flush_task: Optional[asyncio.Task] = None
+        self.dropped_messages = 0
+        self.slow_disconnects = 0
+        self.flushed_updates = 0  # 보낸 update 메시지 수
+        self.coalesced_events = 0  # update 메시지로 합쳐진 변경 수
+        WS_CONNECTIONS.set_function(lambda: len(self._clients))
+
+    async def start(self):
+        """브로커 연결 및 변경 사항 모아 보내기 시작"""
+        await self.broker.start(self._on_message)
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """변경 사항 모아 보내기 중지, 송신 작업 정리 및 브로커 종료"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        for client in self._clients.values():
+            self._stop_writer(client)
+        try:
+            # 다른 워커의 접속자 수 합계에서 빠지도록 알림
+            await self.broker.publish({"type": "count", "worker": self.worker_id, "count": 0})
+        except Exception as e:
+            logger.warning(f"브로커 종료 알림 중 오류 발생: {e}")
+        await self.broker.close()
 
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
+        # 같은 client_id로 다시 연결한 경우 이전 송신 작업 정리
+        previous = self._clients.pop(client_id, None)
+        if previous:
+            self._stop_writer(previous)
+            self._unsubscribe_all(client_id, previous)
+
+        client = _Client(websocket, self.queue_size)
+        client.task = asyncio.create_task(self._writer(client_id, client))
+        self._clients[client_id] = client
         self.active_connections[client_id] = websocket
-        print(f"WebSocket 연결됨 - Client ID: {client_id}, 총 접속자: {len(self.active_connections)}")
-        await self.broadcast_connection_count()
-
-    async def disconnect(self, client_id: str):
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
-            print(f"WebSocket 연결 해제 - Client ID: {client_id}, 총 접속자: {len(self.active_connections)}")
-            await self.broadcast_connection_count()
-
-    async def broadcast(self, message: str):
-        # 딕셔너리의 복사본 생성
-        connections = dict(self.active_connections)
-        disconnected_clients = []
-        
-        for client_id, connection in connections.items():
+        logger.info(f"WebSocket 연결됨 - Client ID: {client_id}, 총 접속자: {len(self.active_connections)}")
+        self.publish_connection_count()
+
+    async def disconnect(self, client_id: str, websocket: Optional[WebSocket] = None):
+        client = self._clients.get(client_id)
+        if client is None:
+            return
+        # 이미 새 연결로 교체된 경우 새 연결은 유지
+        if websocket is not None and client.websocket is not websocket:
+            return
+        del self._clients[client_id]
+        del self.active_connections[client_id]
+        self._stop_writer(client)
+        self._unsubscribe_all(client_id, client)
+        logger.info(f"WebSocket 연결 해제 - Client ID: {client_id}, 총 접속자: {len(self.active_connections)}")
+        self.publish_connection_count()
+
+    def subscribe(self, client_id: str, topic: str) -> bool:
+        """주제(날짜) 구독"""
+        client = self._clients.get(client_id)
+        if client is None or (topic not in client.topics and len(client.topics) >= self.MAX_TOPICS):
+            return False
+        client.topics.add(topic)
+        self._topics.setdefault(topic, set()).add(client_id)
+        return True
+
+    def unsubscribe(self, client_id: str, topic: str):
+        """주제(날짜) 구독 해제"""
+        client = self._clients.get(client_id)
+        if client is not None:
+            client.topics.discard(topic)
+        subscribers = self._topics.get(topic)
+        if subscribers is not None:
+            subscribers.discard(client_id)
+            if not subscribers:
+                self._drop_topic(topic)
+
+    def _unsubscribe_all(self, client_id: str, client: _Client):
+        """연결 종료 시 모든 구독 해제"""
+        for topic in list(client.topics):
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client_id)
+                if not subscribers:
+                    self._drop_topic(topic)
+        client.topics.clear()
+
+    def _drop_topic(self, topic: str):
+        """구독자가 없는 주제 정리"""
+        del self._topics[topic]
+        self._known_likes.pop(topic, None)
+
+    def _stop_writer(self, client: _Client):
+        """송신 작업 중지 (송신 작업 안에서 호출된 경우 제외)"""
+        if client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
+
+    def _enqueue(self, client: _Client, message: str):
+        """송신 대기열에 메시지 추가 (가득 차면 가장 오래된 메시지를 버림)"""
+        try:
+            client.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            client.queue.get_nowait()
+            client.queue.put_nowait(message)
+            client.dropped += 1
+            self.dropped_messages += 1
+            WS_DROPPED_MESSAGES.inc()
+
+    async def _writer(self, client_id: str, client: _Client):
+        """연결별 송신 작업 (대기열의 메시지를 순서대로 전송)"""
+        try:
+            while True:
+                message = await client.queue.get()
+                with WS_SEND_DURATION.time():
+                    await asyncio.wait_for(client.websocket.send_text(message), self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"WebSocket 송신 지연으로 연결 종료 (Client ID: {client_id}), 버린 메시지: {client.dropped}")
+            self.slow_disconnects += 1
+            await self.disconnect(client_id, client.websocket)
+            await self._close(client.websocket)
+        except Exception as e:
+            logger.warning(f"WebSocket 전송 오류 (Client ID: {client_id}): {e}")
+            await self.disconnect(client_id, client.websocket)
+
+    async def _close(self, websocket: WebSocket):
+        """연결 닫기 (이미 닫힌 경우 무시)"""
+        try:
+            await websocket.close(code=1013, reason="Too slow")
+        except Exception:
+            pass
+
+    def connection_count(self) -> int:
+        """모든 워커의 접속자 수 합계"""
+        return len(self.active_connections) + sum(count for count, _ in self._worker_counts.values())
+
+    def publish_connection_count(self):
+        """접속자 수 변경 표시 (다음 update 메시지에 포함, 다른 워커에도 알림)"""
+        if self._count_changed:
+            self.coalesced_events += 1
+        self._count_changed = True
+        self._count_dirty = True
+
+    def publish_reaction(self, topic: str, school_code: str, likes: int):
+        """주제(날짜)별 좋아요 수 변경 표시 (다음 전송 때 모아서 모든 워커에 알림)"""
+        outgoing = self._outgoing_likes.setdefault(topic, {})
+        if school_code in outgoing:
+            self.coalesced_events += 1
+        outgoing[school_code] = max(likes, outgoing.get(school_code, 0))
+
+    def add_message_handler(self, message_type: str, handler: MessageHandler):
+        """다른 워커가 send_to_workers로 보낸 message_type 메시지 처리 함수 등록"""
+        self._message_handlers[message_type] = handler
+
+    def send_to_workers(self, message: Dict):
+        """다른 워커에 보낼 메시지 추가 (다음 전송 때 모아서 보냄, 같은 메시지는 한 번만)"""
+        message = dict(message, worker=self.worker_id)
+        if message in self._outgoing_messages:
+            self.coalesced_events += 1
+            return
+        self._outgoing_messages.append(message)
+
+    async def _publish_messages(self):
+        """모인 메시지를 브로커로 보내기 (실패하면 보내지 못한 메시지는 다음 전송 때 다시 시도)"""
+        while self._outgoing_messages:
+            await self.broker.publish(self._outgoing_messages[0])
+            self._outgoing_messages.pop(0)
+
+    async def _publish_reactions(self):
+        """모인 좋아요 수를 한 메시지로 브로커에 보내기 (실패하면 다음 전송 때 다시 시도)"""
+        if not self._outgoing_likes:
+            return
+        outgoing = self._outgoing_likes
+        self._outgoing_likes = {}
+        try:
+            await self.broker.publish({"type": "reactions", "likes": outgoing})
+        except Exception:
+            for topic, likes in outgoing.items():
+                current = self._outgoing_likes.setdefault(topic, {})
+                for school_code, value in likes.items():
+                    current[school_code] = max(value, current.get(school_code, 0))
+            raise
+
+    def _on_message(self, message: Dict):
+        """브로커로부터 받은 메시지 처리"""
+        if message.get("type") == "reactions":
+            for topic, likes in message["likes"].items():
+                if topic not in self._topics:
+                    # 이 워커에 구독자가 없는 주제는 보내지 않음
+                    continue
+                known = self._known_likes.setdefault(topic, {})
+                pending = self._pending_likes.setdefault(topic, {})
+                for school_code, value in likes.items():
+                    if value <= known.get(school_code, -1):
+                        # 이미 보낸 값보다 작거나 같은 값 (다른 워커에서 늦게 도착한 메시지)
+                        continue
+                    known[school_code] = value
+                    if school_code in pending:
+                        self.coalesced_events += 1
+                    pending[school_code] = value
+                if not pending:
+                    del self._pending_likes[topic]
+        elif message.get("type") == "count":
+            worker = message["worker"]
+            if worker == self.worker_id:
+                return
+            previous = self._worker_counts.get(worker, (0, 0.0))[0]
+            if message["count"]:
+                self._worker_counts[worker] = (message["count"], time.time())
+            else:
+                self._worker_counts.pop(worker, None)
+            if previous != message["count"]:
+                self._count_changed = True
+        else:
+            handler = self._message_handlers.get(message.get("type"))
+            if handler and message.get("worker") != self.worker_id:
+                # 보낸 워커는 이미 처리했으므로 다른 워커에서만 처리
+                handler(message)
+
+    async def _sync_worker_count(self):
+        """이 워커의 접속자 수를 다른 워커에 알리고, 소식이 끊긴 워커는 합계에서 제외"""
+        now = time.time()
+        if self._count_dirty or now - self._last_heartbeat >= self.heartbeat_interval:
+            self._count_dirty = False
+            self._last_heartbeat = now
+            await self.broker.publish({"type": "count", "worker": self.worker_id, "count": len(self.active_connections)})
+
+        stale = [worker for worker, (_, received_at) in self._worker_counts.items()
+                 if now - received_at > self.heartbeat_interval * 3]
+        for worker in stale:
+            del self._worker_counts[worker]
+            self._count_changed = True
+
+    async def flush(self):
+        """
+        모인 변경 사항 전송
+        - 접속자 수는 모든 클라이언트에게, 좋아요 수는 해당 주제 구독자에게만 보냅니다.
+        - 주제별 메시지는 한 번만 직렬화해서 구독자 모두에게 같이 사용합니다.
+        """
+        await self._sync_worker_count()
+        await self._publish_messages()
+        # 메모리 브로커는 바로 _on_message를 호출하므로 이번 전송에 포함됨
+        await self._publish_reactions()
+        if not self._count_changed and not self._pending_likes:
+            return
+        count = self.connection_count() if self._count_changed else None
+        pending = self._pending_likes
+        self._count_changed = False
+        self._pending_likes = {}
+        self.flushed_updates += 1
+
+        messages: Dict[tuple, str] = {}
+
+        def message(topic: Optional[str], with_count: bool) -> str:
+            key = (topic, with_count)
+            if key not in messages:
+                update = {"type": "update"}
+                if with_count:
+                    update["count"] = count
+                if topic is not None:
+                    update["date"] = topic
+                    update["likes"] = pending[topic]
+                messages[key] = json.dumps(update)
+            return messages[key]
+
+        with WS_BROADCAST_DURATION.time():
+            for client in list(self._clients.values()):
+                with_count = count is not None
+                for topic in client.topics & pending.keys():
+                    self._enqueue(client, message(topic, with_count))
+                    with_count = False
+                if with_count:
+                    self._enqueue(client, message(None, True))
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
             try:
-                await connection.send_text(message)
+                await self.flush()
             except Exception as e:
-                print(f"WebSocket 전송 오류 (Client ID: {client_id}): {e}")
-                disconnected_clients.append(client_id)
-        
-        # 끊어진 연결 정리
-        for client_id in disconnected_clients:
-            await self.disconnect(client_id)
-
-    async def broadcast_connection_count(self):
-        message = json.dumps({
-            "type": "connection_count",
-            "count": len(self.active_connections)
-        })
-        await self.broadcast(message)
\ No newline at end of file
+                logger.error(f"WebSocket update 전송 중 오류 발생: {e}")
+
+    def stats(self) -> Dict:
+        """연결 수, 송신 대기열 깊이, 버린 메시지 수"""
+        depths = [client.queue.qsize() for client in self._clients.values()]
+        return {
+            "connections": len(self._clients),
+            "total_connections": self.connection_count(),
+            "workers": len(self._worker_counts) + 1,
+            "topics": {topic: len(subscribers) for topic, subscribers in self._topics.items()},
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "dropped_messages": self.dropped_messages,
+            "slow_disconnects": self.slow_disconnects,
+            "flushed_updates": self.flushed_updates,
+            "coalesced_events": self.coalesced_events
+        }